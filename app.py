@@ -1,10 +1,30 @@
+import copy
+import io
+import time
+from collections import deque
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
 
+import batch
+import calibrate
+import engine
+import figures
+import goalseek
+import graph
+import microsim
+import montecarlo
+import optimize
+import perf
+import posterior
+import scenario
+import season
+import sensitivity
+import store
+import sweep
+
 # 페이지 설정
 st.set_page_config(
     page_title="DAU Funnel 시뮬레이터",
@@ -13,6 +33,16 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# ⏱️ 성능 패널: 켜져 있으면 이번 실행의 구간별 시간을 재고, 요청한 실행은 cProfile 로 기록한다
+perf_recorder = perf.start() if st.session_state.get("perf_panel") else None
+if "perf_profiler" in st.session_state:
+    st.session_state.perf_profiler.enable()  # st.rerun 등으로 끊긴 실행에서 이어서 기록
+elif st.session_state.pop("perf_profile_next", False):
+    st.session_state.perf_profiler = perf.start_profile()
+
+# 🖼️ 그림 캐시는 서버 공용이므로 적중/미스는 세션별로 따로 센다
+figures.track(st.session_state.setdefault("fig_tally", figures.CacheTally()))
+
 # 커스텀 CSS
 st.markdown("""
 <style>
@@ -220,16 +250,587 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# ==================== 계산 캐시 ====================
+# 같은 파라미터(key)면 엔진을 다시 돌리지 않고 캐시된 결과를 돌려준다
+_PARAM_HASH_FUNCS = {
+    engine.FunnelParams: lambda p: p.key,
+    engine.ForecastParams: lambda p: p.key,
+    montecarlo.MonteCarloSettings: lambda p: p.key,
+    scenario.ScenarioSpace: lambda p: p.key,
+    graph.FunnelGraph: lambda g: g.key,
+    season.Season: lambda s: s.key,
+    posterior.PosteriorSettings: lambda p: p.key,
+    posterior.Posterior: lambda p: p.key,
+}
+
+
+@st.cache_data(hash_funcs=_PARAM_HASH_FUNCS, max_entries=256, show_spinner=False)
+def cached_steady_state(params):
+    return engine.solve_steady_state(params)
+
+
+@st.cache_data(hash_funcs=_PARAM_HASH_FUNCS, max_entries=256, show_spinner=False)
+def cached_forecast(params):
+    return engine.run_forecast(params)
+
+
+@st.cache_data(hash_funcs=_PARAM_HASH_FUNCS, max_entries=32, show_spinner=False)
+def cached_graph_steady_state(funnel_graph, params):
+    return graph.solve_steady_state(funnel_graph, params)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def load_funnel_graph(text, fmt):
+    return graph.loads(text, fmt)
+
+
+@st.cache_data(hash_funcs=_PARAM_HASH_FUNCS, max_entries=32, show_spinner="🎲 Monte Carlo 샘플링 중...")
+def cached_fan_chart(params, settings):
+    return montecarlo.sample_forecast(params, settings)
+
+
+@st.cache_data(hash_funcs=_PARAM_HASH_FUNCS, max_entries=8, show_spinner="🧬 유저 단위 시뮬레이션 중...")
+def cached_microsim(params, seed):
+    return microsim.simulate(params, seed=seed)
+
+
+@st.cache_data(max_entries=8, show_spinner="📐 보정 중...")
+def cached_calibration(csv_bytes, current, prior_weight):
+    history = calibrate.History.from_table(pd.read_csv(io.BytesIO(csv_bytes), encoding="utf-8-sig"))
+    return history, calibrate.fit(history, current, prior_weight=prior_weight)
+
+
+@st.cache_data(hash_funcs=_PARAM_HASH_FUNCS, max_entries=4, show_spinner="🎯 사후 분포 표본 추출 중...")
+def cached_posterior(csv_bytes, current, settings):
+    history = calibrate.History.from_table(pd.read_csv(io.BytesIO(csv_bytes), encoding="utf-8-sig"))
+    return posterior.sample(history, current, settings)
+
+
+@st.cache_data(hash_funcs=_PARAM_HASH_FUNCS, max_entries=16, show_spinner="🎯 사후 예측 샘플링 중...")
+def cached_posterior_bands(samples, params, draws, seed, time_budget):
+    return posterior.predictive(samples, params, draws=draws, seed=seed, time_budget=time_budget)
+
+
+@st.cache_data(hash_funcs=_PARAM_HASH_FUNCS, max_entries=32, show_spinner=False)
+def cached_season(params, exo_ratio, schedule):
+    return season.run_season(params, exo_ratio, schedule)
+
+
+@st.cache_data(hash_funcs=_PARAM_HASH_FUNCS, max_entries=32, show_spinner=False)
+def cached_sensitivity(space, swing):
+    return sensitivity.analyze(space, swing)
+
+
+@st.cache_data(hash_funcs=_PARAM_HASH_FUNCS, max_entries=16, show_spinner="🗺️ 스윕 계산 중...")
+def cached_sweep(space, x_index, y_index, x_range, y_range, size):
+    return sweep.run_sweep(space, x_index, y_index, x_range, y_range, size)
+
+
+@st.cache_data(hash_funcs=_PARAM_HASH_FUNCS, max_entries=16, show_spinner="💰 투자 배분 탐색 중...")
+def cached_investment(space, budget, unit_cost, kpi, step, exponent):
+    return optimize.invest_content(space, budget, np.array(unit_cost), kpi=kpi, step=step, exponent=exponent)
+
+
+@st.cache_resource
+def scenario_store():
+    return store.ScenarioStore()
+
+
+# ==================== 시나리오 저장/불러오기 ====================
+# 노드별 위젯 key 접미사 (신규 비중 nw_*, 복귀 비중 rw_*, 부활 비중 sw_*)
+NODE_KEY_SUFFIX = {"경기전": "pre", "전반전": "1st", "하프타임": "half", "후반전": "2nd", "경기직후": "post"}
+RISK_KEYS = {"at_risk_dau": "risk_dau", "at_risk_wau": "risk_wau", "dead_users": "risk_dead"}
+
+
+def save_scenario(state):
+    """💾 버튼: 이름 입력칸의 이름으로 현재 설정 저장"""
+    name = st.session_state.get("store_name", "").strip()
+    try:
+        scenario_store().save(name, state)
+    except ValueError as e:
+        st.session_state.store_message = ("error", str(e))
+        return
+    st.session_state.store_message = ("success", f"'{name}' 저장됨")
+
+
+def load_scenario(name):
+    """📂 버튼: 저장된 시나리오를 사이드바 입력 전체에 반영"""
+    state = batch.complete_state(scenario_store().load(name))
+    st.session_state.endo_factors = {
+        node: copy.deepcopy(state["endo_factors"].get(node, {})) for node in engine.NODES
+    }
+    for key in list(st.session_state.keys()):
+        if key.startswith(("endo_val_", "endo_wgt_")):
+            del st.session_state[key]
+    apply_endo_factors()
+    reset_factor_grid()
+
+    st.session_state.exo_endo_ratio = float(state["exo_endo_ratio"])
+    st.session_state.exo_ratio_slider = float(state["exo_endo_ratio"])
+    st.session_state.total_new_users = int(state["total_new_users"])
+    for node, suffix in NODE_KEY_SUFFIX.items():
+        st.session_state[f"nw_{suffix}"] = float(state["new_user_weight"][node])
+        st.session_state[f"rw_{suffix}"] = float(state["re_weight"][node])
+        st.session_state[f"sw_{suffix}"] = float(state["sur_weight"][node])
+    for stage, key in RISK_KEYS.items():
+        st.session_state[key] = float(state["risk_conversion"][stage])
+    st.session_state.num_cycles = int(min(max(state["num_cycles"], 1), 50))
+    st.session_state.initial_users = int(state["initial_users"])
+    st.session_state[f"cycle_new_users_{int(state['total_new_users'])}"] = int(state["cycle_new_users"])
+    st.session_state.store_message = ("success", f"'{name}' 불러옴")
+
+
+def delete_scenario(name):
+    scenario_store().delete(name)
+    st.session_state.store_message = ("success", f"'{name}' 삭제됨")
+
+
+def apply_calibration(calibration):
+    """📐 버튼: 보정값을 사이드바 (콘텐츠 점수, 복귀/부활 비중, 리스크 전환율) 에 반영"""
+    values, unreachable = calibrate.factor_values_for_rates(
+        st.session_state.endo_factors, calibration.success_rate, st.session_state.exo_endo_ratio
+    )
+    set_endo_values(values)
+    for node, suffix in NODE_KEY_SUFFIX.items():
+        st.session_state[f"rw_{suffix}"] = calibration.re_weight[node]
+        st.session_state[f"sw_{suffix}"] = calibration.sur_weight[node]
+    for stage, key in RISK_KEYS.items():
+        st.session_state[key] = calibration.risk_conversion[stage]
+    if unreachable:
+        st.session_state.calib_message = (
+            "warning",
+            f"외생 비율 때문에 성공률을 다 맞추지 못한 노드: {', '.join(unreachable)} (콘텐츠 점수 최대)"
+        )
+    else:
+        st.session_state.calib_message = ("success", "보정값을 사이드바에 반영했습니다")
+
+
+def set_endo_values(values):
+    """{(노드, 콘텐츠): 점수} 를 세션 상태와 사이드바 슬라이더에 반영한다 (버튼 on_click 용)"""
+    for node, factors in st.session_state.endo_factors.items():
+        for idx, (name, data) in enumerate(factors.items()):
+            if (node, name) in values:
+                data["value"] = float(values[(node, name)])
+                st.session_state[f"endo_val_{node}_{idx}"] = data["value"]
+    apply_endo_factors()
+    reset_factor_grid()
+
+
+# ==================== 화면 ====================
+VIEWS = ["📈 예상치 관리", "📊 노드별 현황", "🔄 Funnel Flow", "⚠️ 리스크 관리", "📋 상세 데이터", "🗂️ 시나리오 비교"]
+VIEW_FORECAST, VIEW_NODES, VIEW_FLOW, VIEW_RISK, VIEW_DATA, VIEW_COMPARE = VIEWS
+
+# 화면별 위젯 key 접두어
+VIEW_WIDGET_KEYS = {
+    VIEW_FORECAST: (
+        "num_cycles", "initial_users", "cycle_new_users",
+        "mc_", "micro_", "season_", "sens_", "sweep_", "invest_", "route_", "goal_",
+    ),
+    VIEW_NODES: ("factor_analysis_node",),
+    VIEW_FLOW: ("flow_node",),
+    VIEW_DATA: ("calib_",),
+    VIEW_COMPARE: ("compare_",),
+}
+
+# session_state 로 값을 쓸 수 없는 위젯 (버튼, data_editor)
+_UNSETTABLE_KEYS = (
+    "invest_apply", "season_reset", "season_csv", "season_download",
+    "calib_file", "calib_apply", "calib_example",
+)
+
+
+def keep_view_widgets(view):
+    """그리지 않는 화면의 위젯 값을 유지한다
+
+    Streamlit 은 이번 실행에 나오지 않은 위젯의 상태를 지우므로, 다른 화면의 위젯 값을
+    일반 세션 값으로 다시 써 두어 화면을 오가도 설정이 남게 한다.
+    """
+    prefixes = tuple(p for v, keys in VIEW_WIDGET_KEYS.items() if v != view for p in keys)
+    for key in list(st.session_state.keys()):
+        if key.startswith(prefixes) and key not in _UNSETTABLE_KEYS:
+            st.session_state[key] = st.session_state[key]
+
+
+def kept_editor(name, data, columns, on=None, **kwargs):
+    """화면을 오가도 편집 값이 남는 data_editor (season_editor 와 같은 방식)
+
+    편집 결과를 <name>_saved 에 두고, 위젯 상태가 사라졌거나(다른 화면을 다녀옴) data 가 바뀌면
+    data 에 저장된 columns 값을 덮어 새 key 의 편집기를 띄운다. 행은 on 열(없으면 인덱스)로 맞춘다.
+    """
+    # 위젯 key 는 화면 접두어(VIEW_WIDGET_KEYS)로 시작하지 않게 한다 — keep_view_widgets 가 다시 쓸 수 없다
+    editor_key = f"grid_{name}_{st.session_state.get(f'{name}_version', 0)}"
+    if editor_key not in st.session_state or not data.equals(st.session_state.get(f"{name}_data")):
+        base = data.set_index(on) if on else data.copy()
+        saved = st.session_state.get(f"{name}_saved")
+        if saved is not None:
+            saved = saved.set_index(on) if on else saved
+            saved = saved[~saved.index.duplicated()]
+            common = base.index.intersection(saved.index)
+            base.loc[common, columns] = saved.loc[common, columns]
+        st.session_state[f"{name}_base"] = base.reset_index() if on else base
+        st.session_state[f"{name}_data"] = data
+        st.session_state[f"{name}_version"] = st.session_state.get(f"{name}_version", 0) + 1
+        editor_key = f"grid_{name}_{st.session_state[f'{name}_version']}"
+
+    edited = st.data_editor(st.session_state[f"{name}_base"], key=editor_key, **kwargs)
+    st.session_state[f"{name}_saved"] = edited
+    return edited
+
+
+# ==================== 시즌 일정 ====================
+def reset_season_schedule(new_users):
+    """일정 표를 같은 경기 반복으로 다시 만든다 (경기 수 = season_matches, 새 key 로 편집 이력 초기화)"""
+    num_matches = int(st.session_state.get("season_matches", 38))
+    st.session_state.season_base = season.Season.repeat(num_matches, new_users).to_table()
+    st.session_state.season_saved = st.session_state.season_base
+    st.session_state.season_version = st.session_state.get("season_version", 0) + 1
+
+
+def season_editor(new_users):
+    """경기별 덮어쓰기 표 — 화면을 오가도 편집한 일정(season_saved)을 원본으로 다시 띄운다"""
+    if "season_base" not in st.session_state:
+        reset_season_schedule(new_users)
+    editor_key = f"schedule_grid_{st.session_state.season_version}"
+    if editor_key not in st.session_state and not st.session_state.season_saved.equals(st.session_state.season_base):
+        st.session_state.season_base = st.session_state.season_saved
+        st.session_state.season_version += 1
+        editor_key = f"schedule_grid_{st.session_state.season_version}"
+
+    edited = st.data_editor(
+        st.session_state.season_base,
+        key=editor_key,
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        height=300,
+        column_config={
+            "경기": st.column_config.TextColumn("경기", help="비워 두면 번호로 채웁니다"),
+            "외생 점수": st.column_config.NumberColumn(
+                "외생 점수", min_value=0.0, max_value=1.0, step=0.05, default=0.0, format="%.2f",
+                help="경기 중요도·기대감 (0 = 사이드바와 같은 0점 처리)"
+            ),
+            "신규 유저": st.column_config.NumberColumn("신규 유저", min_value=0, step=100, default=new_users),
+            "휴식 사이클": st.column_config.NumberColumn(
+                "휴식 사이클", min_value=0, step=1, default=0,
+                help="경기 뒤 경기 없이 리스크 파이프라인만 도는 사이클 수 (A매치 휴식기 등)"
+            ),
+        },
+    )
+    st.session_state.season_saved = edited
+    return edited
+
+
+# ==================== 사이드바: 콘텐츠 편집기 ====================
+# 자동 반영: 마지막 편집 후 APPLY_DEBOUNCE 초가 지나면 대시보드에 반영 (APPLY_POLL 초마다 확인)
+# 폴링은 미반영 편집이 있는 동안에만 돈다 — 열어만 둔 세션은 서버에 부하를 주지 않는다
+APPLY_DEBOUNCE = 1.0
+APPLY_POLL = 0.5
+
+
+def mark_factor_edit():
+    st.session_state.factor_edit_time = time.monotonic()
+
+
+def factors_pending():
+    return st.session_state.endo_factors != st.session_state.applied_endo_factors
+
+
+def start_apply_poll():
+    """편집 fragment 에서 처음 미반영 상태가 되면 전체를 한 번 다시 실행해 factor_apply_bar 폴링을 켠다
+
+    run_every 는 전체 실행 때만 정해지므로, 폴링이 꺼진 채 편집이 생기면 이렇게 깨워야 한다.
+    이 실행은 반영된 값이 그대로라 대부분 캐시에서 끝난다. 전체 실행 중에는 factor_apply_polling 이
+    None 이라 아무것도 하지 않는다 (편집기 아래에서 폴링 여부를 정하므로 다시 실행하면 무한 반복).
+    """
+    if (st.session_state.get("factor_auto_apply", True)
+            and st.session_state.get("factor_apply_polling") is False
+            and factors_pending()):
+        st.rerun()
+
+
+def add_factor(node_name):
+    """➕ 버튼: 입력한 이름으로 콘텐츠 추가"""
+    new_factor = st.session_state.get(f"new_endo_{node_name}")
+    factors = st.session_state.endo_factors[node_name]
+    if new_factor and new_factor not in factors:
+        factors[new_factor] = {"value": 0.5, "weight": 0.1}
+        mark_factor_edit()
+
+
+def delete_factor(node_name, endo_name):
+    """🗑 버튼: 콘텐츠 삭제 (순번 key 슬라이더가 다른 콘텐츠 값을 물려받지 않도록 비움)"""
+    st.session_state.endo_factors[node_name].pop(endo_name, None)
+    for key in list(st.session_state.keys()):
+        if key.startswith((f"endo_val_{node_name}_", f"endo_wgt_{node_name}_")):
+            del st.session_state[key]
+    mark_factor_edit()
+
+
+def apply_endo_factors():
+    """편집 중인 콘텐츠 점수/가중치를 대시보드 계산용으로 확정한다"""
+    st.session_state.applied_endo_factors = copy.deepcopy(st.session_state.endo_factors)
+
+
+@st.fragment
+def node_factor_editor(node_name):
+    """노드 하나의 콘텐츠 편집기
+
+    슬라이더·추가·삭제는 이 fragment 만 다시 실행해 점수를 바로 보여 주고,
+    대시보드(success_rate)는 factor_apply_bar 가 반영할 때 다시 계산된다.
+    """
+    # 외생변수는 0점으로 고정
+    exo_score = 0.0
+
+    # === 내재변수 섹션 ===
+    st.markdown("**🎮 내재변수** (앱 콘텐츠)")
+    endo_factors = st.session_state.endo_factors[node_name]
+
+    # 새 내재변수 추가
+    col_add1, col_add2 = st.columns([3, 1])
+    with col_add1:
+        st.text_input(
+            "새 콘텐츠", 
+            placeholder="예: 🎁 신규 콘텐츠",
+            key=f"new_endo_{node_name}",
+            label_visibility="collapsed"
+        )
+    with col_add2:
+        st.button("➕", key=f"add_endo_{node_name}", help="콘텐츠 추가",
+                  on_click=add_factor, args=(node_name,))
+
+    for endo_idx, (endo_name, endo_data) in enumerate(endo_factors.items()):
+        name_col, del_col = st.columns([5, 1])
+        with name_col:
+            st.markdown(f"**{endo_name}**")
+        with del_col:
+            st.button("🗑", key=f"del_endo_{node_name}_{endo_idx}",
+                      on_click=delete_factor, args=(node_name, endo_name))
+
+        val_col, wgt_col = st.columns(2)
+        with val_col:
+            new_value = st.slider(
+                "점수",
+                0.0, 1.0,
+                float(endo_data["value"]),
+                0.05,
+                key=f"endo_val_{node_name}_{endo_idx}",
+                on_change=mark_factor_edit,
+            )
+            st.session_state.endo_factors[node_name][endo_name]["value"] = new_value
+
+        with wgt_col:
+            new_weight = st.slider(
+                "가중치",
+                0.0, 1.0,
+                float(endo_data["weight"]),
+                0.05,
+                key=f"endo_wgt_{node_name}_{endo_idx}",
+                on_change=mark_factor_edit,
+            )
+            st.session_state.endo_factors[node_name][endo_name]["weight"] = new_weight
+
+        st.markdown("---")
+
+    endo_score, endo_total_weight = engine.endo_score(endo_factors)
+
+    # 가중치 합계 체크 및 표시
+    if endo_total_weight > 1.0:
+        st.error(f"⚠️ 가중치 합계: **{endo_total_weight:.0%}** (100% 초과! 자동 정규화됨)")
+    elif endo_total_weight < 1.0:
+        st.warning(f"📊 가중치 합계: **{endo_total_weight:.0%}** (100% 미만)")
+    else:
+        st.success(f"✅ 가중치 합계: **{endo_total_weight:.0%}**")
+
+    st.info(f"내재 점수: **{endo_score:.0%}**")
+
+    # 편집 중인 값 기준 성공률 (대시보드는 반영 후 갱신)
+    exo_ratio = st.session_state.exo_endo_ratio
+    endo_ratio = 1.0 - exo_ratio
+    rate = engine.node_success_rate(endo_score, exo_ratio, exo_score)
+    st.success(f"**최종 성공률: {rate:.0%}** (내재 {endo_score:.0%} × {endo_ratio:.0%} = 최대 {endo_ratio:.0%} 중 {rate:.0%})")
+    if endo_factors != st.session_state.applied_endo_factors[node_name]:
+        st.caption("⏳ 대시보드 미반영 — 자동 반영을 기다리거나 반영 버튼을 누르세요")
+    start_apply_poll()
+
+
+# 편집 방식 (슬라이더 / 표), 콘텐츠가 이보다 많은 노드가 있으면 처음부터 표
+FACTOR_EDITOR_MODES = ["🎚️ 슬라이더", "🧮 표"]
+SLIDER_MAX_FACTORS = 12
+
+
+def reset_factor_grid():
+    """표 편집기의 원본을 현재 편집 값으로 다시 만든다 (새 key 로 편집 이력 초기화)"""
+    st.session_state.factor_grid_base = engine.factor_table(st.session_state.endo_factors)
+    st.session_state.factor_grid_version = st.session_state.get("factor_grid_version", 0) + 1
+
+
+@st.fragment
+def factor_grid_editor():
+    """모든 노드의 콘텐츠를 표 하나로 편집 — 콘텐츠가 수백 개여도 위젯은 몇 개뿐이다
+
+    data_editor 의 원본(factor_grid_base)은 가져오기/모드 전환 때만 바꾸고, 편집 결과를
+    그대로 편집 중 값(endo_factors)으로 쓴다. 노드별 점수는 표 전체를 한 번에 계산한다.
+    """
+    if "factor_grid_base" not in st.session_state:
+        reset_factor_grid()
+
+    # CSV 가져오기 (표를 그리기 전에 원본을 바꾼다)
+    uploaded = st.file_uploader("📤 콘텐츠 표 CSV 가져오기", type="csv", key="factor_csv")
+    if uploaded is not None and uploaded.file_id != st.session_state.get("factor_csv_id"):
+        st.session_state.factor_csv_id = uploaded.file_id
+        try:
+            st.session_state.endo_factors = engine.factors_from_table(
+                pd.read_csv(uploaded, encoding="utf-8-sig")
+            )
+            reset_factor_grid()
+            mark_factor_edit()
+        except (ValueError, pd.errors.ParserError, UnicodeDecodeError) as e:
+            st.error(f"⚠️ 가져오기 실패: {e}")
+
+    edited = st.data_editor(
+        st.session_state.factor_grid_base,
+        key=f"factor_grid_{st.session_state.factor_grid_version}",
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        height=320,
+        on_change=mark_factor_edit,
+        column_config={
+            "노드": st.column_config.SelectboxColumn(
+                "노드", options=list(engine.NODES), default=engine.NODES[0], required=True
+            ),
+            "콘텐츠": st.column_config.TextColumn("콘텐츠", required=True),
+            "점수": st.column_config.NumberColumn(
+                "점수", min_value=0.0, max_value=1.0, step=0.05, format="%.2f", default=0.5
+            ),
+            "가중치": st.column_config.NumberColumn(
+                "가중치", min_value=0.0, max_value=1.0, step=0.05, format="%.2f", default=0.1
+            ),
+        }
+    )
+    try:
+        st.session_state.endo_factors = engine.factors_from_table(edited)
+    except ValueError as e:
+        st.error(f"⚠️ {e}")
+        return
+
+    # 노드별 요약 (편집 중인 값 기준)
+    table = engine.factor_table(st.session_state.endo_factors)
+    exo_ratio = st.session_state.exo_endo_ratio
+    scores, total_weight, rates = engine.node_scores(table, exo_ratio)
+    summary = pd.DataFrame({
+        "노드": list(engine.NODES),
+        "콘텐츠": table["노드"].value_counts().reindex(engine.NODES, fill_value=0).to_numpy(),
+        "가중치 합계": total_weight,
+        "내재 점수": scores,
+        "성공률": rates,
+    })
+    with perf.section("Styler · 콘텐츠 요약"):
+        st.dataframe(
+            summary.style.format({"가중치 합계": "{:.0%}", "내재 점수": "{:.0%}", "성공률": "{:.0%}"}),
+            hide_index=True,
+            use_container_width=True
+        )
+    if factors_pending():
+        st.caption("⏳ 대시보드 미반영 — 자동 반영을 기다리거나 반영 버튼을 누르세요")
+    start_apply_poll()
+
+    # CSV 내보내기
+    st.download_button(
+        label="📥 콘텐츠 표 CSV 다운로드",
+        data=table.to_csv(index=False).encode('utf-8-sig'),
+        file_name="dau_funnel_factors.csv",
+        mime="text/csv",
+        use_container_width=True
+    )
+
+
+def factor_apply_bar():
+    """편집 내용 반영 — 자동 반영이면 편집이 멈춘 뒤 APPLY_DEBOUNCE 초 후 전체를 다시 실행한다"""
+    pending = factors_pending()
+    idle = time.monotonic() - st.session_state.get("factor_edit_time", 0.0)
+    if pending and st.session_state.factor_auto_apply and idle >= APPLY_DEBOUNCE:
+        apply_endo_factors()
+        st.rerun()
+    if st.button("✅ 대시보드에 반영", key="factor_apply", use_container_width=True):
+        if pending:
+            apply_endo_factors()
+            st.rerun()
+
+
+# ==================== 성능 패널 ====================
+def request_profile():
+    """🔬 버튼: 버튼이 일으킨 다음 실행 전체를 cProfile 로 기록한다"""
+    st.session_state.perf_profile_next = True
+
+
+def perf_panel(timing, history):
+    """이번 실행의 단계/구간별 시간, 최근 실행 기록, cProfile 캡처"""
+    with st.expander("⏱️ 성능 패널", expanded=True):
+        totals = [t.total * 1000 for t in history]
+        col_p1, col_p2, col_p3 = st.columns(3)
+        with col_p1:
+            st.metric("이번 실행", f"{timing.total * 1000:,.0f} ms")
+        with col_p2:
+            st.metric(f"최근 {len(totals)}회 중앙값", f"{np.median(totals):,.0f} ms")
+        with col_p3:
+            st.metric(f"최근 {len(totals)}회 최대", f"{max(totals):,.0f} ms")
+
+        col_phase, col_section = st.columns(2)
+        with col_phase:
+            st.markdown("#### 단계별 (합계 = 이번 실행)")
+            st.dataframe(
+                timing.phase_frame().style.format({"시간 (ms)": "{:,.1f}", "비율": "{:.0%}"}),
+                hide_index=True,
+                use_container_width=True
+            )
+        with col_section:
+            st.markdown("#### 세부 구간 (단계 안에 포함)")
+            st.dataframe(
+                timing.section_frame().style.format({"시간 (ms)": "{:,.1f}"}),
+                hide_index=True,
+                use_container_width=True
+            )
+
+        st.markdown(f"#### 📈 최근 실행 기록 (단계별 ms, 최대 {perf.HISTORY_SIZE}회)")
+        st.bar_chart(perf.history_frame(history))
+
+        st.markdown("#### 🔬 cProfile")
+        col_prof1, col_prof2 = st.columns(2)
+        with col_prof1:
+            st.button(
+                "🔬 다음 실행 프로파일", key="perf_profile", on_click=request_profile, use_container_width=True,
+                help="누르면 바로 이어지는 실행 전체를 cProfile 로 기록합니다"
+            )
+        capture = st.session_state.get("perf_capture")
+        if capture is not None:
+            with col_prof2:
+                st.download_button(
+                    "📥 pstats 다운로드", capture.data, file_name=capture.file_name,
+                    mime="application/octet-stream", key="perf_profile_download", use_container_width=True
+                )
+            st.caption(
+                f"{capture.created:%H:%M:%S} 실행 · 함수 호출 {capture.calls:,}회 · {capture.total:.2f}초 — "
+                f"`python -m pstats {capture.file_name}` 또는 snakeviz 로 열 수 있습니다"
+            )
+            st.dataframe(
+                capture.top.style.format({"자체 (ms)": "{:,.1f}", "누적 (ms)": "{:,.1f}"}),
+                hide_index=True,
+                use_container_width=True
+            )
+
+
 # 헤더
 st.markdown('<h1 class="main-header">⚽ DAU Funnel 시뮬레이터</h1>', unsafe_allow_html=True)
 st.markdown('<p style="text-align:center; color:#888; margin-bottom:2rem;">경기 노드별 유저 흐름 & 리스크 관리 대시보드</p>', unsafe_allow_html=True)
 
 # ==================== 사이드바: 입력 변수 ====================
+perf.phase("사이드바")
 with st.sidebar:
     st.markdown("### 🎛️ 시뮬레이션 설정")
     
     # 노드 목록 (먼저 정의)
-    nodes_list = ["경기전", "전반전", "하프타임", "후반전", "경기직후"]
+    nodes_list = list(engine.NODES)
     
     # 세션 상태 초기화 - 외생변수 (통제 불가능한 외부 요인)
     if 'exo_factors' not in st.session_state:
@@ -301,6 +902,10 @@ with st.sidebar:
             },
         }
     
+    # 대시보드에 반영된 내재변수 (편집 중인 endo_factors 의 확정본)
+    if 'applied_endo_factors' not in st.session_state:
+        apply_endo_factors()
+    
     # 외생/내재 가중치 비율
     if 'exo_endo_ratio' not in st.session_state:
         st.session_state.exo_endo_ratio = 0.4  # 외생 40%, 내재 60%
@@ -327,109 +932,61 @@ with st.sidebar:
         
         st.markdown("---")
         
-        # 노드 선택 탭
-        node_tabs = st.tabs(nodes_list)
+        # 편집 방식: 콘텐츠가 많으면 표 하나로 (위젯 수가 콘텐츠 수와 무관)
+        factor_count = max(len(f) for f in st.session_state.endo_factors.values())
+        factor_editor_mode = st.radio(
+            "편집 방식",
+            FACTOR_EDITOR_MODES,
+            index=int(factor_count > SLIDER_MAX_FACTORS),
+            horizontal=True,
+            key="factor_editor_mode",
+            on_change=reset_factor_grid
+        )
         
-        success_rate = {}
-        node_factor_details = {}  # 시각화용 저장
+        # 전체 실행: 폴링 여부는 편집기 아래에서 정한다 (start_apply_poll 은 fragment 재실행에서만 동작)
+        st.session_state.factor_apply_polling = None
+        if factor_editor_mode == FACTOR_EDITOR_MODES[0]:
+            # 노드 선택 탭 (편집은 fragment 안에서만 다시 실행)
+            node_tabs = st.tabs(nodes_list)
+            for node_tab, node_name in zip(node_tabs, nodes_list):
+                with node_tab:
+                    node_factor_editor(node_name)
+        else:
+            factor_grid_editor()
         
-        for node_idx, (node_tab, node_name) in enumerate(zip(node_tabs, nodes_list)):
-            with node_tab:
-                # 외생변수는 0점으로 고정
-                exo_score = 0.0
-                
-                # === 내재변수 섹션 ===
-                st.markdown("**🎮 내재변수** (앱 콘텐츠)")
-                endo_factors = st.session_state.endo_factors[node_name]
-                
-                # 새 내재변수 추가
-                col_add1, col_add2 = st.columns([3, 1])
-                with col_add1:
-                    new_factor = st.text_input(
-                        "새 콘텐츠", 
-                        placeholder="예: 🎁 신규 콘텐츠",
-                        key=f"new_endo_{node_name}",
-                        label_visibility="collapsed"
-                    )
-                with col_add2:
-                    if st.button("➕", key=f"add_endo_{node_name}", help="콘텐츠 추가"):
-                        if new_factor and new_factor not in endo_factors:
-                            st.session_state.endo_factors[node_name][new_factor] = {"value": 0.5, "weight": 0.1}
-                            st.rerun()
-                
-                endo_weighted_sum = 0
-                endo_total_weight = 0
-                keys_to_delete = []
-                
-                for endo_idx, (endo_name, endo_data) in enumerate(endo_factors.items()):
-                    name_col, del_col = st.columns([5, 1])
-                    with name_col:
-                        st.markdown(f"**{endo_name}**")
-                    with del_col:
-                        if st.button("🗑", key=f"del_endo_{node_name}_{endo_idx}"):
-                            keys_to_delete.append(endo_name)
-                    
-                    val_col, wgt_col = st.columns(2)
-                    with val_col:
-                        new_value = st.slider(
-                            "점수",
-                            0.0, 1.0,
-                            float(endo_data["value"]),
-                            0.05,
-                            key=f"endo_val_{node_name}_{endo_idx}",
-                        )
-                        st.session_state.endo_factors[node_name][endo_name]["value"] = new_value
-                    
-                    with wgt_col:
-                        new_weight = st.slider(
-                            "가중치",
-                            0.0, 1.0,
-                            float(endo_data["weight"]),
-                            0.05,
-                            key=f"endo_wgt_{node_name}_{endo_idx}",
-                        )
-                        st.session_state.endo_factors[node_name][endo_name]["weight"] = new_weight
-                    
-                    st.markdown("---")
-                    
-                    endo_weighted_sum += new_value * new_weight
-                    endo_total_weight += new_weight
-                
-                # 삭제 처리
-                for key in keys_to_delete:
-                    del st.session_state.endo_factors[node_name][key]
-                    st.rerun()
-                
-                # 가중치 합계 체크 및 표시
-                if endo_total_weight > 1.0:
-                    st.error(f"⚠️ 가중치 합계: **{endo_total_weight:.0%}** (100% 초과! 자동 정규화됨)")
-                elif endo_total_weight < 1.0:
-                    st.warning(f"📊 가중치 합계: **{endo_total_weight:.0%}** (100% 미만)")
-                else:
-                    st.success(f"✅ 가중치 합계: **{endo_total_weight:.0%}**")
-                
-                endo_score = endo_weighted_sum / max(endo_total_weight, 0.01)
-                st.info(f"내재 점수: **{endo_score:.0%}**")
-                
-                # === 최종 성공률 계산 ===
-                final_score = (exo_score * exo_ratio) + (endo_score * endo_ratio)
-                success_rate[node_name] = min(1.0, max(0.0, final_score))
-                
-                node_factor_details[node_name] = {
-                    "exo_factors": dict(st.session_state.exo_factors[node_name]),
-                    "endo_factors": dict(st.session_state.endo_factors[node_name]),
-                    "exo_score": exo_score,
-                    "endo_score": endo_score,
-                    "calculated_rate": final_score
-                }
-                
-                # 결과 표시
-                max_achievable = endo_ratio  # 내재로 달성 가능한 최대치
-                st.success(f"**최종 성공률: {success_rate[node_name]:.0%}** (내재 {endo_score:.0%} × {endo_ratio:.0%} = 최대 {max_achievable:.0%} 중 {success_rate[node_name]:.0%})")
+        # 편집 내용 대시보드 반영
+        st.markdown("---")
+        factor_auto_apply = st.toggle(
+            "⏱️ 자동 반영",
+            value=True,
+            key="factor_auto_apply",
+            help=f"편집이 {APPLY_DEBOUNCE:g}초 멈추면 대시보드에 반영합니다. 끄면 반영 버튼을 눌러야 합니다"
+        )
+        # 미반영 편집이 있을 때만 폴링 (없으면 편집 fragment 가 start_apply_poll 로 깨운다)
+        st.session_state.factor_apply_polling = factor_auto_apply and factors_pending()
+        st.fragment(
+            factor_apply_bar, run_every=APPLY_POLL if st.session_state.factor_apply_polling else None
+        )()
+        
+        # 대시보드는 반영된 콘텐츠 기준으로 계산 (전체 노드를 표 하나로 한 번에)
+        with perf.section("콘텐츠 점수 계산"):
+            applied_scores, _, applied_rates = engine.node_scores(
+                engine.factor_table(st.session_state.applied_endo_factors), exo_ratio
+            )
+        success_rate = dict(zip(nodes_list, applied_rates.tolist()))
+        node_factor_details = {}  # 시각화용 저장
+        for node_name, endo_score in zip(nodes_list, applied_scores.tolist()):
+            node_factor_details[node_name] = {
+                "exo_factors": dict(st.session_state.exo_factors[node_name]),
+                "endo_factors": dict(st.session_state.applied_endo_factors[node_name]),
+                "exo_score": 0.0,
+                "endo_score": endo_score,
+                "calculated_rate": endo_score * endo_ratio
+            }
     
     # 📥 신규 유저 입력
     with st.expander("📥 신규 유저 입력", expanded=False):
-        total_new_users = st.number_input("🆕 총 신규 유저 수", min_value=0, value=2100, step=100)
+        total_new_users = st.number_input("🆕 총 신규 유저 수", min_value=0, value=2100, step=100, key="total_new_users")
         
         st.markdown("**노드별 신규 유저 비중**")
         new_user_weight = {
@@ -448,10 +1005,7 @@ with st.sidebar:
             st.success(f"✅ 비중 합계: {total_weight:.0%}")
         
         # 실제 신규 유저 수 계산
-        new_users = {
-            node: int(total_new_users * (weight / total_weight)) if total_weight > 0 else 0
-            for node, weight in new_user_weight.items()
-        }
+        new_users = engine.split_new_users(total_new_users, new_user_weight)
         
         # 계산 결과 표시
         st.markdown("**📊 계산된 신규 유저 수**")
@@ -461,111 +1015,112 @@ with st.sidebar:
     # 🔄 복귀 비중
     with st.expander("🔄 복귀 비중 (Re-Weight)", expanded=False):
         re_weight = {
-            "경기전": st.slider("경기전 복귀비중", 0.0, 1.0, 0.20, 0.05),
-            "전반전": st.slider("전반전 복귀비중", 0.0, 1.0, 0.50, 0.05),
-            "하프타임": st.slider("하프타임 복귀비중", 0.0, 1.0, 0.10, 0.05),
-            "후반전": st.slider("후반전 복귀비중", 0.0, 1.0, 0.15, 0.05),
-            "경기직후": st.slider("경기직후 복귀비중", 0.0, 1.0, 0.05, 0.05),
+            "경기전": st.slider("경기전 복귀비중", 0.0, 1.0, 0.20, 0.05, key="rw_pre"),
+            "전반전": st.slider("전반전 복귀비중", 0.0, 1.0, 0.50, 0.05, key="rw_1st"),
+            "하프타임": st.slider("하프타임 복귀비중", 0.0, 1.0, 0.10, 0.05, key="rw_half"),
+            "후반전": st.slider("후반전 복귀비중", 0.0, 1.0, 0.15, 0.05, key="rw_2nd"),
+            "경기직후": st.slider("경기직후 복귀비중", 0.0, 1.0, 0.05, 0.05, key="rw_post"),
         }
     
     # 🌟 부활 비중
     with st.expander("🌟 부활 비중 (Sur-Weight)", expanded=False):
         sur_weight = {
-            "경기전": st.slider("경기전 부활비중", 0.0, 1.0, 0.10, 0.05),
-            "전반전": st.slider("전반전 부활비중", 0.0, 1.0, 0.60, 0.05),
-            "하프타임": st.slider("하프타임 부활비중", 0.0, 1.0, 0.10, 0.05),
-            "후반전": st.slider("후반전 부활비중", 0.0, 1.0, 0.15, 0.05),
-            "경기직후": st.slider("경기직후 부활비중", 0.0, 1.0, 0.05, 0.05),
+            "경기전": st.slider("경기전 부활비중", 0.0, 1.0, 0.10, 0.05, key="sw_pre"),
+            "전반전": st.slider("전반전 부활비중", 0.0, 1.0, 0.60, 0.05, key="sw_1st"),
+            "하프타임": st.slider("하프타임 부활비중", 0.0, 1.0, 0.10, 0.05, key="sw_half"),
+            "후반전": st.slider("후반전 부활비중", 0.0, 1.0, 0.15, 0.05, key="sw_2nd"),
+            "경기직후": st.slider("경기직후 부활비중", 0.0, 1.0, 0.05, 0.05, key="sw_post"),
         }
     
     # ⚠️ 리스크 관리 설정
     with st.expander("⚠️ 리스크 관리 설정", expanded=False):
         risk_conversion = {
-            "at_risk_dau": st.slider("At Risk DAU 전환율", 0.0, 1.0, 0.60, 0.05),
-            "at_risk_wau": st.slider("At Risk WAU 전환율", 0.0, 1.0, 0.30, 0.05),
-            "dead_users": st.slider("Dead Users 전환율", 0.0, 1.0, 0.10, 0.05),
+            "at_risk_dau": st.slider("At Risk DAU 전환율", 0.0, 1.0, 0.60, 0.05, key="risk_dau"),
+            "at_risk_wau": st.slider("At Risk WAU 전환율", 0.0, 1.0, 0.30, 0.05, key="risk_wau"),
+            "dead_users": st.slider("Dead Users 전환율", 0.0, 1.0, 0.10, 0.05, key="risk_dead"),
         }
     
+    # 현재 설정 (batch.py / 시나리오 저장소와 같은 키)
+    current_scenario = {
+        "endo_factors": copy.deepcopy(st.session_state.applied_endo_factors),
+        "exo_endo_ratio": float(exo_ratio),
+        "total_new_users": int(total_new_users),
+        "new_user_weight": new_user_weight,
+        "re_weight": re_weight,
+        "sur_weight": sur_weight,
+        "risk_conversion": risk_conversion,
+        "num_cycles": int(st.session_state.get("num_cycles", batch.FORECAST_DEFAULTS["num_cycles"])),
+        "initial_users": int(st.session_state.get("initial_users", batch.FORECAST_DEFAULTS["initial_users"])),
+        "cycle_new_users": int(st.session_state.get(f"cycle_new_users_{total_new_users}", total_new_users)),
+    }
+    
+    # 💾 시나리오 저장/불러오기
+    with st.expander("💾 시나리오 저장/불러오기", expanded=False):
+        st.text_input("시나리오 이름", key="store_name", placeholder="예: 2차 개편안")
+        st.button("💾 현재 설정 저장", key="store_save", on_click=save_scenario,
+                  args=(current_scenario,), use_container_width=True)
+        saved_names = scenario_store().names()
+        if saved_names:
+            store_pick = st.selectbox("저장된 시나리오", saved_names, key="store_pick")
+            col_load, col_del = st.columns(2)
+            with col_load:
+                st.button("📂 불러오기", key="store_load", on_click=load_scenario,
+                          args=(store_pick,), use_container_width=True)
+            with col_del:
+                st.button("🗑 삭제", key="store_delete", on_click=delete_scenario,
+                          args=(store_pick,), use_container_width=True)
+        else:
+            st.caption("저장된 시나리오가 없습니다")
+        if "store_message" in st.session_state:
+            level, message = st.session_state.pop("store_message")
+            getattr(st, level)(message)
+    
+    # ⏱️ 성능 패널 (디버그)
+    st.toggle(
+        "⏱️ 성능 패널",
+        key="perf_panel",
+        help="실행마다 구간별 시간(사이드바, 정상상태, 그림, Styler, CSV, 예측)을 재서 화면 아래에 보여 줍니다"
+    )
+    
     # 전역 변수용 (시각화 호환)
     global_multiplier = 1.0
     multiplier_values = {}
     content_fun = match_fun = ux_quality = push_effect = 1.0
 
 # ==================== 계산 로직 ====================
-nodes = ["경기전", "전반전", "하프타임", "후반전", "경기직후"]
+perf.phase("정상상태 계산")
+nodes = list(engine.NODES)
 
-# 초기 React Pool과 Sur Pool (순환 참조 해결을 위한 반복 계산)
-react_pool = 0
-sur_pool = 0
+funnel_params = engine.FunnelParams.from_dicts(
+    success_rate, new_users, re_weight, sur_weight, risk_conversion
+)
+with perf.section("정상상태 (Pool)"):
+    steady = cached_steady_state(funnel_params)
 
-# 5번 반복하여 수렴시킴 (순환 참조 근사)
-for iteration in range(10):
-    results = []
-    prev_success = 0  # 첫 노드는 이전 성공 = 0으로 시작 (또는 마지막 노드의 성공을 순환)
-    
-    for i, node in enumerate(nodes):
-        if i == 0:
-            # 경기전은 경기직후의 성공수를 이전유지로 받음 (순환)
-            retained = prev_success if iteration == 0 else results_prev[-1]["성공수"]
-        else:
-            retained = results[i-1]["성공수"]
-        
-        new = new_users[node]
-        react_qty = react_pool * re_weight[node]
-        resur_qty = sur_pool * sur_weight[node]
-        
-        total = retained + new + react_qty + resur_qty
-        curr = success_rate[node]
-        churn = 1 - curr
-        success = total * curr
-        at_risk = total * churn
-        
-        results.append({
-            "노드": node,
-            "이전유지": retained,
-            "신규": new,
-            "복귀비중": re_weight[node],
-            "복귀수": react_qty,
-            "부활비중": sur_weight[node],
-            "부활수": resur_qty,
-            "총활성": total,
-            "성공률": curr,
-            "이탈률": churn,
-            "성공수": success,
-            "이탈수": at_risk,
-        })
-    
-    results_prev = results
-    
-    # 리스크 관리 계산
-    total_at_risk = sum(r["이탈수"] for r in results)
-    
-    # at risk DAU
-    at_risk_dau_pool = total_at_risk
-    at_risk_dau_success = at_risk_dau_pool * risk_conversion["at_risk_dau"]
-    at_risk_dau_loss = at_risk_dau_pool * (1 - risk_conversion["at_risk_dau"])
-    
-    # at risk WAU
-    at_risk_wau_pool = at_risk_dau_loss
-    at_risk_wau_success = at_risk_wau_pool * risk_conversion["at_risk_wau"]
-    at_risk_wau_loss = at_risk_wau_pool * (1 - risk_conversion["at_risk_wau"])
-    
-    # Dead Users
-    dead_users_pool = at_risk_wau_loss
-    dead_users_success = dead_users_pool * risk_conversion["dead_users"]
-    dead_users_loss = dead_users_pool * (1 - risk_conversion["dead_users"])
-    
-    # Pool 업데이트
-    react_pool = at_risk_dau_success + at_risk_wau_success
-    sur_pool = dead_users_success
-
-df = pd.DataFrame(results)
+df = steady.table
+react_pool = steady.react_pool
+sur_pool = steady.sur_pool
+
+# 리스크 파이프라인 (정상상태 기준)
+risk = steady.risk
+at_risk_dau_pool = risk.at_risk_dau_pool
+at_risk_dau_success = risk.at_risk_dau_success
+at_risk_dau_loss = risk.at_risk_dau_loss
+at_risk_wau_pool = risk.at_risk_wau_pool
+at_risk_wau_success = risk.at_risk_wau_success
+at_risk_wau_loss = risk.at_risk_wau_loss
+dead_users_pool = risk.dead_users_pool
+dead_users_success = risk.dead_users_success
+dead_users_loss = risk.dead_users_loss
 
 # ==================== 메인 대시보드 ====================
-tab_forecast, tab1, tab2, tab3, tab4 = st.tabs(["📈 예상치 관리", "📊 노드별 현황", "🔄 Funnel Flow", "⚠️ 리스크 관리", "📋 상세 데이터"])
+# st.tabs 는 화면만 숨기고 모든 탭을 계산·전송하므로, 선택한 화면 하나만 그린다
+view = st.radio("화면", VIEWS, horizontal=True, key="view", label_visibility="collapsed")
+keep_view_widgets(view)
+perf.phase(f"화면 · {view}")
 
 # ==================== TAB 1: 노드별 현황 ====================
-with tab1:
+if view == VIEW_NODES:
     # 상단 KPI 카드
     col1, col2, col3, col4 = st.columns(4)
     
@@ -598,6 +1153,19 @@ with tab1:
             delta=f"Sur Pool: {sur_pool:,.0f}"
         )
     
+    # 정상상태 해석해 vs 기존 반복 근사
+    if steady.exact:
+        gap_retained, gap_react, gap_sur = steady.iteration_gap
+        st.caption(
+            f"🧮 순환 참조 정확해 (선형 방정식) — 기존 {engine.POOL_ITERATIONS}회 반복 근사 대비 오차: "
+            f"이전유지 {gap_retained:,.1f} · React Pool {gap_react:,.1f} · Sur Pool {gap_sur:,.1f}"
+        )
+    else:
+        st.warning(
+            f"⚠️ 현재 성공률/전환율로는 Pool 이 수렴하지 않습니다 (정상상태 없음). "
+            f"기존 {engine.POOL_ITERATIONS}회 반복 근사값을 표시합니다."
+        )
+    
     # 노드별 성공률 현황
     st.markdown("---")
     st.markdown("### 🎮 노드별 성공률 현황")
@@ -650,51 +1218,16 @@ with tab1:
             endo_weights = [f["weight"] for f in endo_factors.values()]
             endo_contributions = [v * w for v, w in zip(endo_values, endo_weights)]
             
-            fig_endo = go.Figure()
-            fig_endo.add_trace(go.Bar(
-                name='점수',
-                x=endo_names,
-                y=endo_values,
-                marker_color='#4ecdc4',
-                text=[f'{v:.0%}' for v in endo_values],
-                textposition='outside'
-            ))
-            fig_endo.add_trace(go.Bar(
-                name='가중치',
-                x=endo_names,
-                y=endo_weights,
-                marker_color='#ffe66d',
-                text=[f'{w:.0%}' for w in endo_weights],
-                textposition='outside'
-            ))
-            fig_endo.update_layout(
-                title=f"{selected_node} 콘텐츠별 점수 & 가중치",
-                barmode='group',
-                template='plotly_dark',
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                height=350,
-                yaxis=dict(range=[0, 1.2])
+            st.plotly_chart(
+                figures.endo_factors(selected_node, endo_names, endo_values, endo_weights),
+                use_container_width=True
             )
-            st.plotly_chart(fig_endo, use_container_width=True)
             
             # 기여도 파이차트
-            fig_pie = go.Figure(data=[go.Pie(
-                labels=endo_names,
-                values=endo_contributions,
-                hole=0.4,
-                textinfo='label+percent',
-                marker_colors=['#4ecdc4', '#ff6b6b', '#ffe66d', '#a06cd5', '#45b7d1', '#96ceb4', '#ff8c42', '#c084fc']
-            )])
-            
-            fig_pie.update_layout(
-                title=f"{selected_node} 콘텐츠별 성공률 기여도",
-                template='plotly_dark',
-                paper_bgcolor='rgba(0,0,0,0)',
-                height=350
+            st.plotly_chart(
+                figures.endo_contribution(selected_node, endo_names, endo_contributions),
+                use_container_width=True
             )
-            
-            st.plotly_chart(fig_pie, use_container_width=True)
     
     st.markdown("---")
     
@@ -702,70 +1235,18 @@ with tab1:
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_composition = go.Figure()
-        
-        fig_composition.add_trace(go.Bar(
-            name='이전유지',
-            x=df['노드'],
-            y=df['이전유지'],
-            marker_color='#4ecdc4'
-        ))
-        fig_composition.add_trace(go.Bar(
-            name='신규',
-            x=df['노드'],
-            y=df['신규'],
-            marker_color='#ff6b6b'
-        ))
-        fig_composition.add_trace(go.Bar(
-            name='복귀수',
-            x=df['노드'],
-            y=df['복귀수'],
-            marker_color='#ffe66d'
-        ))
-        fig_composition.add_trace(go.Bar(
-            name='부활수',
-            x=df['노드'],
-            y=df['부활수'],
-            marker_color='#a06cd5'
-        ))
-        
-        fig_composition.update_layout(
-            title="노드별 유저 구성",
-            barmode='stack',
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            height=400
+        st.plotly_chart(
+            figures.node_composition(
+                df['노드'], df['이전유지'], df['신규'], df['복귀수'], df['부활수']
+            ),
+            use_container_width=True
         )
-        
-        st.plotly_chart(fig_composition, use_container_width=True)
     
     with col2:
-        fig_success = go.Figure()
-        
-        fig_success.add_trace(go.Bar(
-            name='성공수',
-            x=df['노드'],
-            y=df['성공수'],
-            marker_color='#00d4aa'
-        ))
-        fig_success.add_trace(go.Bar(
-            name='이탈수',
-            x=df['노드'],
-            y=df['이탈수'],
-            marker_color='#ff4757'
-        ))
-        
-        fig_success.update_layout(
-            title="노드별 성공 vs 이탈",
-            barmode='group',
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            height=400
+        st.plotly_chart(
+            figures.node_outcome(df['노드'], df['성공수'], df['이탈수']),
+            use_container_width=True
         )
-        
-        st.plotly_chart(fig_success, use_container_width=True)
     
     # 성공률 게이지
     st.markdown("### 📈 노드별 성공률")
@@ -773,205 +1254,50 @@ with tab1:
     
     for i, (col, node) in enumerate(zip(cols, nodes)):
         with col:
-            fig_gauge = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=success_rate[node] * 100,
-                title={'text': node, 'font': {'size': 14, 'color': 'white'}},
-                number={'suffix': '%', 'font': {'color': 'white'}},
-                gauge={
-                    'axis': {'range': [0, 100], 'tickcolor': 'white'},
-                    'bar': {'color': '#00d4aa'},
-                    'bgcolor': 'rgba(255,255,255,0.1)',
-                    'steps': [
-                        {'range': [0, 50], 'color': 'rgba(255,71,87,0.3)'},
-                        {'range': [50, 75], 'color': 'rgba(255,230,109,0.3)'},
-                        {'range': [75, 100], 'color': 'rgba(0,212,170,0.3)'}
-                    ],
-                }
-            ))
-            fig_gauge.update_layout(
-                height=200,
-                template='plotly_dark',
-                paper_bgcolor='rgba(0,0,0,0)',
-                margin=dict(l=20, r=20, t=40, b=20)
-            )
-            st.plotly_chart(fig_gauge, use_container_width=True)
+            st.plotly_chart(figures.success_gauge(node, success_rate[node]), use_container_width=True)
 
 # ==================== TAB 2: Funnel Flow ====================
-with tab2:
+if view == VIEW_FLOW:
     st.markdown("### 🔄 유저 흐름 Sankey 다이어그램")
     
-    # Sankey 데이터 준비
-    labels = []
-    sources = []
-    targets = []
-    values = []
-    colors = []
-    
-    # 노드 라벨 생성 (인덱스 0-4)
-    for node in nodes:
-        labels.append(f"{node}\n(총: {df[df['노드']==node]['총활성'].values[0]:,.0f})")
-    
-    # 추가 노드들
-    labels.append(f"At Risk DAU\n({at_risk_dau_pool:,.0f})")  # 5
-    labels.append(f"At Risk WAU\n({at_risk_wau_pool:,.0f})")  # 6
-    labels.append(f"Dead Users\n({dead_users_pool:,.0f})")     # 7
-    labels.append(f"React Pool\n({react_pool:,.0f})")          # 8
-    labels.append(f"Sur Pool\n({sur_pool:,.0f})")              # 9
-    labels.append(f"다음 사이클\n({df[df['노드']==nodes[-1]]['성공수'].values[0]:,.0f})")  # 10
-    labels.append(f"완전 이탈\n({dead_users_loss:,.0f})")       # 11
-    
-    # 인덱스 정의
-    node_indices = {name: i for i, name in enumerate(nodes)}
-    at_risk_dau_idx = 5
-    at_risk_wau_idx = 6
-    dead_users_idx = 7
-    react_idx = 8
-    sur_idx = 9
-    next_cycle_idx = 10
-    final_churn_idx = 11
-    
-    # 색상 정의 (시간대별 같은 색 계열)
-    # 경기 노드: 청록색 계열
-    node_colors_flow = [
-        'rgba(78,205,196,0.6)',   # 경기전
-        'rgba(69,183,209,0.6)',   # 전반전  
-        'rgba(60,161,222,0.6)',   # 하프타임
-        'rgba(51,139,235,0.6)',   # 후반전
-        'rgba(42,117,248,0.6)',   # 경기직후
-    ]
-    
-    # 1. 노드 간 성공 흐름 (경기전 → 전반전 → ... → 경기직후)
-    for i in range(len(nodes) - 1):
-        sources.append(node_indices[nodes[i]])
-        targets.append(node_indices[nodes[i + 1]])
-        values.append(df[df['노드']==nodes[i]]['성공수'].values[0])
-        colors.append(node_colors_flow[i])
-    
-    # 2. 마지막 노드 성공 → 다음 사이클
-    last_success = df[df['노드']==nodes[-1]]['성공수'].values[0]
-    sources.append(node_indices[nodes[-1]])
-    targets.append(next_cycle_idx)
-    values.append(last_success)
-    colors.append('rgba(0,212,170,0.7)')
-    
-    # 3. 각 노드에서 이탈 → At Risk DAU (같은 빨간색 계열)
-    for i, node in enumerate(nodes):
-        sources.append(node_indices[node])
-        targets.append(at_risk_dau_idx)
-        values.append(df[df['노드']==node]['이탈수'].values[0])
-        colors.append('rgba(255,107,107,0.5)')
-    
-    # 4. At Risk DAU → React Pool (성공) - 노란색 계열
-    sources.append(at_risk_dau_idx)
-    targets.append(react_idx)
-    values.append(at_risk_dau_success)
-    colors.append('rgba(255,217,61,0.6)')
-    
-    # 5. At Risk DAU → At Risk WAU (손실) - 주황색 계열
-    sources.append(at_risk_dau_idx)
-    targets.append(at_risk_wau_idx)
-    values.append(at_risk_dau_loss)
-    colors.append('rgba(255,140,66,0.5)')
-    
-    # 6. At Risk WAU → React Pool (성공) - 노란색 계열
-    sources.append(at_risk_wau_idx)
-    targets.append(react_idx)
-    values.append(at_risk_wau_success)
-    colors.append('rgba(255,217,61,0.6)')
-    
-    # 7. At Risk WAU → Dead Users (손실) - 보라색 계열
-    sources.append(at_risk_wau_idx)
-    targets.append(dead_users_idx)
-    values.append(at_risk_wau_loss)
-    colors.append('rgba(160,108,213,0.5)')
-    
-    # 8. Dead Users → Sur Pool (성공) - 연보라색 계열
-    sources.append(dead_users_idx)
-    targets.append(sur_idx)
-    values.append(dead_users_success)
-    colors.append('rgba(192,132,252,0.6)')
-    
-    # 9. Dead Users → 완전 이탈 (손실) - 회색 계열
-    sources.append(dead_users_idx)
-    targets.append(final_churn_idx)
-    values.append(dead_users_loss)
-    colors.append('rgba(107,114,128,0.5)')
-    
-    # 노드 색상 (시간대별 청록색 그라데이션 + 기타)
-    node_colors = [
-        '#4ecdc4',  # 0: 경기전 (밝은 청록)
-        '#45b7d1',  # 1: 전반전
-        '#3ca1de',  # 2: 하프타임
-        '#338beb',  # 3: 후반전
-        '#2a75f8',  # 4: 경기직후 (진한 파랑)
-        '#ff6b6b',  # 5: At Risk DAU (빨강)
-        '#ff8c42',  # 6: At Risk WAU (주황)
-        '#a06cd5',  # 7: Dead Users (보라)
-        '#ffd93d',  # 8: React Pool (노랑)
-        '#c084fc',  # 9: Sur Pool (연보라)
-        '#22c55e',  # 10: 다음 사이클 (녹색)
-        '#6b7280',  # 11: 완전 이탈 (회색)
-    ]
-    
-    # 노드 위치 수동 지정 (x: 0~1 왼쪽→오른쪽, y: 0~1 아래→위)
-    node_x = [
-        0.01,  # 경기전
-        0.15,  # 전반전
-        0.30,  # 하프타임
-        0.45,  # 후반전
-        0.60,  # 경기직후
-        0.65,  # At Risk DAU
-        0.7,  # At Risk WAU
-        0.8,  # Dead Users
-        0.8,  # React Pool
-        0.85,  # Sur Pool
-        0.8,  # 다음 사이클
-        1,  # 완전 이탈
-    ]
-    
-    node_y = [
-        0.3,   # 경기전 (중앙)
-        0.5,   # 전반전
-        0.6,   # 하프타임
-        0.7,   # 후반전
-        0.8,   # 경기직후
-        0.1,  # At Risk DAU (위쪽)
-        0.45,  # At Risk WAU
-        0.45,  # Dead Users
-        0.05,  # React Pool (맨 위)
-        0.65,  # Sur Pool
-        0.75,  # 다음 사이클 (아래쪽)
-        0.5,  # 완전 이탈
-    ]
-    
-    fig_sankey = go.Figure(data=[go.Sankey(
-        arrangement='snap',
-        node=dict(
-            pad=30,
-            thickness=20,
-            line=dict(color="white", width=0.5),
-            label=labels,
-            color=node_colors,
-            x=node_x,
-            y=node_y
-        ),
-        link=dict(
-            source=sources,
-            target=targets,
-            value=values,
-            color=colors
+    # 🕸️ 퍼널 그래프: 기본은 5개 노드 선형 체인, 파일로 분기·추가 노드를 정의
+    with st.expander("🕸️ 퍼널 그래프 (분기 / 추가 노드)", expanded=False):
+        graph_file = st.file_uploader(
+            "그래프 파일 (JSON / YAML)", type=["json", "yaml", "yml"], key="flow_graph_file",
+            help="nodes / edges / entry 형식 — 예시: scenarios/graph_extra_time.yaml"
         )
-    )])
-    
-    fig_sankey.update_layout(
-        title="유저 흐름 시각화 (전체 라이프사이클)",
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        height=700,
-        font=dict(size=11, color='white')
-    )
+        st.caption("사이드바에 있는 노드는 사이드바 값을, 그래프에만 있는 노드는 파일에 적은 값을 씁니다")
+    
+    funnel_graph = graph.FunnelGraph.linear()
+    if graph_file is not None:
+        try:
+            funnel_graph = load_funnel_graph(
+                graph_file.getvalue().decode("utf-8"), graph_file.name.rsplit(".", 1)[-1].lower()
+            )
+        except (ValueError, TypeError, KeyError) as e:
+            st.error(f"그래프 파일을 읽을 수 없습니다: {e}")
+    
+    flow_df, flow_risk, flow_react, flow_sur = df, risk, react_pool, sur_pool
+    if funnel_graph != graph.FunnelGraph.linear():
+        try:
+            flow_steady = cached_graph_steady_state(funnel_graph, graph.funnel_params(
+                funnel_graph, success_rate, total_new_users, new_user_weight,
+                re_weight, sur_weight, risk_conversion
+            ))
+        except ValueError as e:
+            st.error(str(e))
+            funnel_graph = graph.FunnelGraph.linear()
+        else:
+            flow_df, flow_risk = flow_steady.table, flow_steady.risk
+            flow_react, flow_sur = flow_steady.react_pool, flow_steady.sur_pool
+            st.caption(
+                f"🕸️ 노드 {len(funnel_graph.nodes):,}개 · 간선 {len(funnel_graph.edges):,}개 — "
+                f"정상상태 총활성 {flow_df['총활성'].sum():,.0f}명 (기본 체인 {df['총활성'].sum():,.0f}명)"
+            )
     
+    fig_sankey = figures.lifecycle_sankey(
+        funnel_graph, flow_df[['노드', '총활성', '성공수', '이탈수']], flow_risk, flow_react, flow_sur
+    )
     st.plotly_chart(fig_sankey, use_container_width=True)
     
     # 흐름 설명
@@ -1004,76 +1330,32 @@ with tab2:
     # 추가: 노드별 유입 구성 파이차트
     st.markdown("### 📊 노드별 유입 구성")
     
-    selected_node = st.selectbox("노드 선택", nodes)
-    node_data = df[df['노드'] == selected_node].iloc[0]
+    selected_node = st.selectbox("노드 선택", list(funnel_graph.nodes), key="flow_node")
+    node_data = flow_df[flow_df['노드'] == selected_node].iloc[0]
     
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_pie = go.Figure(data=[go.Pie(
-            labels=['이전유지', '신규', '복귀수', '부활수'],
-            values=[node_data['이전유지'], node_data['신규'], node_data['복귀수'], node_data['부활수']],
-            hole=0.4,
-            marker_colors=['#4ecdc4', '#ff6b6b', '#ffe66d', '#a06cd5']
-        )])
-        
-        fig_pie.update_layout(
-            title=f"{selected_node} 유입 구성",
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            height=350
+        st.plotly_chart(
+            figures.inflow_pie(
+                selected_node, node_data['이전유지'], node_data['신규'],
+                node_data['복귀수'], node_data['부활수']
+            ),
+            use_container_width=True
         )
-        
-        st.plotly_chart(fig_pie, use_container_width=True)
     
     with col2:
-        fig_pie2 = go.Figure(data=[go.Pie(
-            labels=['성공', '이탈'],
-            values=[node_data['성공수'], node_data['이탈수']],
-            hole=0.4,
-            marker_colors=['#00d4aa', '#ff4757']
-        )])
-        
-        fig_pie2.update_layout(
-            title=f"{selected_node} 성공 vs 이탈",
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            height=350
+        st.plotly_chart(
+            figures.outcome_pie(selected_node, node_data['성공수'], node_data['이탈수']),
+            use_container_width=True
         )
-        
-        st.plotly_chart(fig_pie2, use_container_width=True)
 
 # ==================== TAB 3: 리스크 관리 ====================
-with tab3:
+if view == VIEW_RISK:
     st.markdown("### ⚠️ 리스크 관리 파이프라인")
     
     # 리스크 단계별 데이터
-    risk_data = pd.DataFrame([
-        {
-            "단계": "At Risk DAU",
-            "인원": at_risk_dau_pool,
-            "전환율": risk_conversion["at_risk_dau"],
-            "성공수": at_risk_dau_success,
-            "손실율": 1 - risk_conversion["at_risk_dau"],
-            "손실수": at_risk_dau_loss
-        },
-        {
-            "단계": "At Risk WAU",
-            "인원": at_risk_wau_pool,
-            "전환율": risk_conversion["at_risk_wau"],
-            "성공수": at_risk_wau_success,
-            "손실율": 1 - risk_conversion["at_risk_wau"],
-            "손실수": at_risk_wau_loss
-        },
-        {
-            "단계": "Dead Users",
-            "인원": dead_users_pool,
-            "전환율": risk_conversion["dead_users"],
-            "성공수": dead_users_success,
-            "손실율": 1 - risk_conversion["dead_users"],
-            "손실수": dead_users_loss
-        }
-    ])
+    risk_data = risk.to_frame()
     
     # 리스크 KPI
     col1, col2, col3 = st.columns(3)
@@ -1102,62 +1384,29 @@ with tab3:
     st.markdown("---")
     
     # 리스크 워터폴 차트
-    fig_waterfall = go.Figure(go.Waterfall(
-        name="리스크 파이프라인",
-        orientation="v",
-        measure=["absolute", "relative", "relative", "relative", "relative", "total"],
-        x=["총 이탈", "DAU 전환", "DAU 손실→WAU", "WAU 전환", "WAU 손실→Dead", "최종 손실"],
-        y=[at_risk_dau_pool, -at_risk_dau_success, 0, -at_risk_wau_success, 0, None],
-        connector={"line": {"color": "rgb(63, 63, 63)"}},
-        decreasing={"marker": {"color": "#00d4aa"}},
-        increasing={"marker": {"color": "#ff4757"}},
-        totals={"marker": {"color": "#ffa502"}}
-    ))
-    
-    fig_waterfall.update_layout(
-        title="리스크 파이프라인 워터폴",
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=400
-    )
-    
-    st.plotly_chart(fig_waterfall, use_container_width=True)
+    st.plotly_chart(figures.risk_waterfall(risk), use_container_width=True)
     
     # 리스크 단계별 상세
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_funnel = go.Figure(go.Funnel(
-            y=["총 이탈 (At Risk)", "At Risk DAU 전환", "At Risk WAU 전환", "Dead Users 전환"],
-            x=[at_risk_dau_pool, at_risk_dau_success, at_risk_wau_success, dead_users_success],
-            textinfo="value+percent initial",
-            marker={"color": ["#ff4757", "#ffa502", "#ffe66d", "#a06cd5"]}
-        ))
-        
-        fig_funnel.update_layout(
-            title="리스크 전환 퍼널",
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            height=400
-        )
-        
-        st.plotly_chart(fig_funnel, use_container_width=True)
+        st.plotly_chart(figures.risk_funnel(risk), use_container_width=True)
     
     with col2:
         st.markdown("#### 📊 리스크 상세 데이터")
         
-        st.dataframe(
-            risk_data.style.format({
-                "인원": "{:,.0f}",
-                "전환율": "{:.0%}",
-                "성공수": "{:,.0f}",
-                "손실율": "{:.0%}",
-                "손실수": "{:,.0f}"
-            }),
-            use_container_width=True,
-            height=200
-        )
+        with perf.section("Styler · 리스크 표"):
+            st.dataframe(
+                risk_data.style.format({
+                    "인원": "{:,.0f}",
+                    "전환율": "{:.0%}",
+                    "성공수": "{:,.0f}",
+                    "손실율": "{:.0%}",
+                    "손실수": "{:,.0f}"
+                }),
+                use_container_width=True,
+                height=200
+            )
         
         st.markdown("---")
         st.markdown("#### 🔄 Pool 요약")
@@ -1168,7 +1417,7 @@ with tab3:
         """)
 
 # ==================== TAB 4: 상세 데이터 ====================
-with tab4:
+if view == VIEW_DATA:
     st.markdown("### 📋 노드별 상세 데이터")
     
     # 데이터프레임 스타일링 (matplotlib 없이)
@@ -1186,7 +1435,8 @@ with tab4:
         "이탈수": "{:,.0f}"
     })
     
-    st.dataframe(styled_df, use_container_width=True, height=250)
+    with perf.section("Styler · 노드 표"):
+        st.dataframe(styled_df, use_container_width=True, height=250)
     
     st.markdown("---")
     
@@ -1209,6 +1459,10 @@ with tab4:
         #### Pool 계산
         - **React Pool** = At Risk DAU 성공 + At Risk WAU 성공
         - **Sur Pool** = Dead Users 성공
+        
+        #### 순환 참조
+        - 경기전 이전유지 = 경기직후 성공수, 복귀/부활수 = Pool × 비중 이므로 (이전유지, React Pool, Sur Pool) 은 3×3 선형 방정식
+        - 반복 근사 대신 **(I − M) z = b** 를 한 번에 풀어 정확한 정상상태를 구함
         """)
     
     # 데이터 다운로드
@@ -1218,7 +1472,8 @@ with tab4:
     col1, col2 = st.columns(2)
     
     with col1:
-        csv = df.to_csv(index=False).encode('utf-8-sig')
+        with perf.section("CSV · 노드 표"):
+            csv = df.to_csv(index=False).encode('utf-8-sig')
         st.download_button(
             label="📊 노드 데이터 CSV 다운로드",
             data=csv,
@@ -1227,16 +1482,116 @@ with tab4:
         )
     
     with col2:
-        risk_csv = risk_data.to_csv(index=False).encode('utf-8-sig')
+        with perf.section("CSV · 리스크 표"):
+            risk_csv = risk.to_frame().to_csv(index=False).encode('utf-8-sig')
         st.download_button(
             label="⚠️ 리스크 데이터 CSV 다운로드",
             data=risk_csv,
             file_name="dau_funnel_risk.csv",
             mime="text/csv"
         )
+    
+    # 📐 과거 데이터 보정
+    st.markdown("---")
+    st.markdown("### 📐 과거 데이터로 보정")
+    st.caption(
+        "경기별·노드별 실제 개수 (경기, 노드, 총활성, 성공수, 이탈수, 복귀수, 부활수) 로 성공률 · 복귀/부활 비중 · "
+        "리스크 전환율을 맞춥니다 — 복귀/부활 개수만으로 정해지지 않는 부분은 현재 값 쪽에 머뭅니다"
+    )
+    col_calib1, col_calib2 = st.columns([3, 1])
+    with col_calib1:
+        calib_file = st.file_uploader("과거 데이터 CSV", type="csv", key="calib_file")
+    with col_calib2:
+        calib_prior = st.number_input(
+            "현재 값 유지 강도", min_value=0.0, value=calibrate.PRIOR_WEIGHT, step=0.5, key="calib_prior",
+            help="클수록 데이터로 정해지지 않는 방향에서 현재 사이드바 값에 가깝게 남습니다"
+        )
+        example_params = engine.ForecastParams.from_dicts(funnel_params, 38, 5000, total_new_users, new_user_weight)
+        st.download_button(
+            "📄 양식 예시 CSV",
+            calibrate.synthetic_history(example_params, 38).to_table().to_csv(index=False).encode("utf-8-sig"),
+            file_name="history_example.csv",
+            mime="text/csv",
+            key="calib_example",
+            help="현재 설정으로 만든 38경기 예시 데이터"
+        )
+    
+    if calib_file is not None:
+        current_params = {
+            "success_rate": dict(success_rate),
+            "re_weight": dict(re_weight),
+            "sur_weight": dict(sur_weight),
+            "risk_conversion": dict(risk_conversion),
+        }
+        try:
+            calib_history, calibration = cached_calibration(calib_file.getvalue(), current_params, float(calib_prior))
+        except (ValueError, pd.errors.ParserError, UnicodeDecodeError) as e:
+            st.error(f"⚠️ 과거 데이터를 읽을 수 없습니다: {e}")
+        else:
+            st.caption(
+                f"📐 {len(calib_history.matches):,}경기 · 반복 {calibration.iterations}회 · {calibration.elapsed:.2f}초 · "
+                f"잔차 제곱합 {calibration.initial_cost:,.0f} → {calibration.cost:,.0f}"
+                + ("" if calibration.converged else " (최대 반복 도달)")
+            )
+            col_calib3, col_calib4 = st.columns([3, 2])
+            with col_calib3:
+                st.dataframe(
+                    calibration.params_table(current_params).style.format(
+                        {"현재": "{:.3f}", "보정": "{:.3f}", "차이": "{:+.3f}"}
+                    ),
+                    use_container_width=True, hide_index=True, height=300
+                )
+            with col_calib4:
+                st.dataframe(
+                    calibration.fit.style.format({"관측 합계": "{:,.0f}", "예측 합계": "{:,.0f}", "R²": "{:.3f}"}),
+                    use_container_width=True, hide_index=True
+                )
+                st.button(
+                    "📐 사이드바에 반영", key="calib_apply", on_click=apply_calibration,
+                    args=(calibration,), type="primary", use_container_width=True
+                )
+
+            # 사후 분포 (MCMC)
+            st.markdown("#### 🎯 사후 분포 (MCMC)")
+            st.caption(
+                "같은 데이터로 파라미터의 사후 분포를 뽑아 90% 신용구간을 봅니다 — 표본은 예상치 관리 화면의 "
+                "불확실성 밴드에서 '사후 분포' 로 고르면 사후 예측 밴드가 됩니다"
+            )
+            col_mcmc1, col_mcmc2 = st.columns([1, 3])
+            with col_mcmc1:
+                calib_mcmc = st.checkbox("표본 추출", value=False, key="calib_mcmc")
+                calib_steps = st.select_slider(
+                    "걸음 수", options=[2_000, 5_000, 10_000, 20_000], value=10_000, key="calib_steps",
+                    help="walker 한 개가 움직이는 횟수 (앞 1/4 은 버림)"
+                )
+            if calib_mcmc:
+                mcmc_settings = posterior.PosteriorSettings(
+                    steps=int(calib_steps), burn=int(calib_steps) // 4, prior_weight=float(calib_prior)
+                )
+                post = cached_posterior(calib_file.getvalue(), current_params, mcmc_settings)
+                st.session_state.posterior_samples = post
+                with col_mcmc2:
+                    st.caption(
+                        f"🎯 chain {post.chains}개 · 표본 {post.draws_total:,}개 (보관 {len(post.samples):,}개) · "
+                        f"{post.elapsed:.1f}초 · "
+                        f"채택률 {post.acceptance:.0%} · 최대 R-hat {np.nanmax(post.r_hat):.3f} · "
+                        f"최소 ESS {post.ess.min():,.0f}"
+                    )
+                    if np.nanmax(post.r_hat) > 1.1:
+                        st.warning("⚠️ R-hat 이 1.1 을 넘습니다 — 걸음 수를 늘리거나 현재 값 유지 강도를 올려 보세요")
+                    st.dataframe(
+                        post.summary().style.format({
+                            "평균": "{:.3f}", "표준편차": "{:.3f}", "P5": "{:.3f}", "P50": "{:.3f}",
+                            "P95": "{:.3f}", "R-hat": "{:.3f}", "ESS": "{:,.0f}",
+                        }),
+                        use_container_width=True, hide_index=True, height=300
+                    )
+    if "calib_message" in st.session_state:
+        level, message = st.session_state.pop("calib_message")
+        getattr(st, level)(message)
 
 # ==================== TAB 5: 예상치 관리 ====================
-with tab_forecast:
+if view == VIEW_FORECAST:
     st.markdown("### 📈 시간별 총 유저 수 예측")
     st.caption("경기 사이클을 반복하며 유저 수가 어떻게 변화하는지 시뮬레이션합니다")
     
@@ -1244,14 +1599,52 @@ with tab_forecast:
     col_sim1, col_sim2, col_sim3 = st.columns(3)
     
     with col_sim1:
-        num_cycles = st.slider("시뮬레이션 사이클 수", 1, 50, 20, help="경기 반복 횟수")
+        num_cycles = st.slider("시뮬레이션 사이클 수", 1, 50, 20, help="경기 반복 횟수", key="num_cycles")
     
     with col_sim2:
-        initial_users = st.number_input("초기 유저 수", min_value=0, value=5000, step=500)
+        initial_users = st.number_input("초기 유저 수", min_value=0, value=5000, step=500, key="initial_users")
     
     with col_sim3:
         st.caption(f"(설정된 총 신규: {total_new_users:,})")
-        cycle_new_users = st.number_input("사이클당 신규 유저", min_value=0, value=total_new_users, step=100)
+        cycle_new_users = st.number_input(
+            "사이클당 신규 유저", min_value=0, value=total_new_users, step=100,
+            key=f"cycle_new_users_{total_new_users}"
+        )
+    
+    # 불확실성 (Monte Carlo) 설정
+    with st.expander("🎲 불확실성 밴드 (Monte Carlo)"):
+        st.caption(
+            "파라미터: 노드별 성공률·리스크 전환율을 현재 슬라이더 값을 평균으로 하는 Beta 분포에서 샘플링 · "
+            "정수 유저: 노드 통과와 리스크 단계마다 이항(다항) 개수를 뽑아 작은 세그먼트의 분산을 반영"
+        )
+        mc_enabled = st.checkbox("P5 / P50 / P95 밴드 표시", value=False, key="mc_enabled")
+        # 상세 데이터 화면에서 사후 분포를 뽑았으면 사후 예측 밴드도 고를 수 있다
+        mc_sources = dict(montecarlo.SOURCES)
+        if "posterior_samples" in st.session_state:
+            mc_sources["posterior"] = "과거 데이터 사후 분포"
+        elif st.session_state.get("mc_source") == "posterior":
+            del st.session_state.mc_source
+        mc_source = st.radio(
+            "불확실성 종류", list(mc_sources), format_func=mc_sources.get,
+            horizontal=True, key="mc_source"
+        )
+        col_mc1, col_mc2, col_mc3 = st.columns(3)
+        with col_mc1:
+            mc_draws = st.select_slider(
+                "샘플 수", options=[1_000, 10_000, 50_000, 100_000], value=100_000, key="mc_draws"
+            )
+            mc_seed = st.number_input("시드", min_value=0, value=42, step=1, key="mc_seed")
+        with col_mc2:
+            mc_rate_conc = st.slider(
+                "성공률 집중도", 5, 500, 50, 5, key="mc_rate_conc",
+                help="클수록 슬라이더 값 주변에 좁게 분포 (Beta a+b)"
+            )
+            mc_risk_conc = st.slider(
+                "전환율 집중도", 5, 500, 50, 5, key="mc_risk_conc",
+                help="클수록 슬라이더 값 주변에 좁게 분포 (Beta a+b)"
+            )
+        with col_mc3:
+            mc_budget = st.slider("시간 예산 (초)", 0.5, 10.0, 2.0, 0.5, key="mc_budget")
     
     st.markdown("---")
     
@@ -1272,111 +1665,147 @@ with tab_forecast:
     st.markdown("---")
     
     # 시뮬레이션 실행
-    simulation_data = []
-    
-    # 초기값
-    current_active = initial_users
-    current_react_pool = 0
-    current_sur_pool = 0
-    
-    for cycle in range(num_cycles):
-        cycle_data = {"사이클": cycle + 1}
-        
-        # 각 노드를 순회하며 계산
-        node_active = current_active
-        cycle_total_at_risk = 0
-        
-        for node_idx, node in enumerate(nodes):
-            # 신규 유저 배분 (비중에 따라)
-            total_weight_sim = sum(new_user_weight.values())
-            node_new = cycle_new_users * (new_user_weight.get(node, 0) / max(total_weight_sim, 0.01))
-            
-            # 복귀 및 부활
-            node_react = current_react_pool * re_weight.get(node, 0)
-            node_resur = current_sur_pool * sur_weight.get(node, 0)
-            
-            # 총 활성
-            node_total = node_active + node_new + node_react + node_resur
-            
-            # 성공/이탈
-            node_success_rate = success_rate.get(node, 0.8)
-            node_success = node_total * node_success_rate
-            node_at_risk = node_total * (1 - node_success_rate)
-            
-            # 다음 노드로 전달
-            node_active = node_success
-            cycle_total_at_risk += node_at_risk
-        
-        # 리스크 파이프라인
-        dau_pool = cycle_total_at_risk
-        dau_success = dau_pool * risk_conversion["at_risk_dau"]
-        dau_loss = dau_pool * (1 - risk_conversion["at_risk_dau"])
-        
-        wau_pool = dau_loss
-        wau_success = wau_pool * risk_conversion["at_risk_wau"]
-        wau_loss = wau_pool * (1 - risk_conversion["at_risk_wau"])
-        
-        dead_pool = wau_loss
-        dead_success = dead_pool * risk_conversion["dead_users"]
-        dead_loss = dead_pool * (1 - risk_conversion["dead_users"])
-        
-        # Pool 업데이트
-        current_react_pool = dau_success + wau_success
-        current_sur_pool = dead_success
-        
-        # 다음 사이클 시작 유저 = 마지막 노드 성공 유저
-        current_active = node_active
-        
-        # 총 활성 유저 (모든 pool 합산)
-        total_ecosystem = current_active + current_react_pool + current_sur_pool
-        
-        cycle_data["활성 유저"] = current_active
-        cycle_data["React Pool"] = current_react_pool
-        cycle_data["Sur Pool"] = current_sur_pool
-        cycle_data["총 유저"] = total_ecosystem
-        cycle_data["이탈 (Dead)"] = dead_loss
-        
-        simulation_data.append(cycle_data)
+    forecast_params = engine.ForecastParams.from_dicts(
+        funnel_params, num_cycles, initial_users, cycle_new_users, new_user_weight
+    )
+    with perf.section("예측 시뮬레이션"):
+        sim_df = cached_forecast(forecast_params).table
+    
+    # 분석용 파라미터 공간 (민감도 등에서 배치 평가)
+    scenario_space = scenario.ScenarioSpace(
+        endo_factors=st.session_state.applied_endo_factors,
+        exo_ratio=st.session_state.exo_endo_ratio,
+        total_new_users=total_new_users,
+        new_user_weight=new_user_weight,
+        re_weight=re_weight,
+        sur_weight=sur_weight,
+        risk_conversion=risk_conversion,
+        num_cycles=num_cycles,
+        initial_users=initial_users,
+        cycle_new_users=cycle_new_users,
+    )
     
-    sim_df = pd.DataFrame(simulation_data)
+    fan_chart = None
+    if mc_enabled and mc_source == "posterior":
+        with perf.section("Monte Carlo 밴드"):
+            fan_chart = cached_posterior_bands(
+                st.session_state.posterior_samples, forecast_params, int(mc_draws), int(mc_seed), float(mc_budget)
+            )
+    elif mc_enabled:
+        mc_settings = montecarlo.MonteCarloSettings(
+            draws=int(mc_draws),
+            rate_concentration=float(mc_rate_conc),
+            risk_concentration=float(mc_risk_conc),
+            seed=int(mc_seed),
+            time_budget=float(mc_budget),
+            source=mc_source,
+        )
+        with perf.section("Monte Carlo 밴드"):
+            fan_chart = cached_fan_chart(forecast_params, mc_settings)
     
     # 메인 그래프: 시간별 총 유저 수
-    fig_forecast = go.Figure()
-    
-    fig_forecast.add_trace(go.Scatter(
-        x=sim_df["사이클"],
-        y=sim_df["총 유저"],
-        mode='lines+markers',
-        name='총 유저 수',
-        line=dict(color='#00d4aa', width=3),
-        marker=dict(size=8),
-        fill='tozeroy',
-        fillcolor='rgba(0,212,170,0.2)'
-    ))
-    
-    fig_forecast.add_trace(go.Scatter(
-        x=sim_df["사이클"],
-        y=sim_df["활성 유저"],
-        mode='lines+markers',
-        name='활성 유저',
-        line=dict(color='#4ecdc4', width=2, dash='dot'),
-        marker=dict(size=6)
-    ))
-    
-    fig_forecast.update_layout(
-        title="🔮 시간(사이클)별 예상 총 유저 수",
-        xaxis_title="경기 사이클",
-        yaxis_title="유저 수",
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=450,
-        hovermode='x unified',
-        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01)
+    fig_forecast = figures.forecast(
+        sim_df["사이클"], sim_df["총 유저"], sim_df["활성 유저"],
+        band_cycles=fan_chart.cycles if fan_chart is not None else None,
+        bands=fan_chart.bands if fan_chart is not None else None,
     )
-    
     st.plotly_chart(fig_forecast, use_container_width=True)
     
+    if fan_chart is not None:
+        budget_note = " (시간 예산 도달로 조기 종료)" if fan_chart.truncated else ""
+        st.caption(
+            f"🎲 Monte Carlo ({mc_sources[mc_source]}) {fan_chart.draws:,}회 · "
+            f"{fan_chart.elapsed:.2f}초{budget_note} — "
+            f"최종 총 유저 P5 {fan_chart.bands['총 유저'][0][-1]:,.0f} / "
+            f"P50 {fan_chart.bands['총 유저'][1][-1]:,.0f} / "
+            f"P95 {fan_chart.bands['총 유저'][2][-1]:,.0f}"
+        )
+    
+    # 유저 단위 마이크로시뮬레이션 (결정론 결과 검증)
+    with st.expander("🧬 유저 단위 시뮬레이션 (마이크로)"):
+        st.caption(
+            "유저 한 명을 한 행으로 두고 노드 통과·리스크 전환을 난수로 뽑아 정수 유저 수로 계산합니다 — "
+            "평균은 위 예측과 같아야 합니다"
+        )
+        col_micro1, col_micro2 = st.columns([3, 1])
+        with col_micro2:
+            micro_seed = st.number_input("시드", min_value=0, value=0, step=1, key="micro_seed")
+        with col_micro1:
+            micro_enabled = st.checkbox("실행", value=False, key="micro_enabled")
+        if micro_enabled:
+            micro_result = cached_microsim(forecast_params, int(micro_seed))
+            st.caption(
+                f"🧬 사이클당 최대 {micro_result.peak_users:,}명 · {micro_result.elapsed:.2f}초 · "
+                f"마지막 사이클 뒤 유저 배열 {micro_result.population.nbytes / 1e6:,.1f} MB"
+            )
+            st.dataframe(
+                microsim.compare(micro_result, sim_df).style.format({
+                    "결정론 (최종)": "{:,.1f}", "마이크로 (최종)": "{:,.0f}",
+                    "최종 오차": "{:.2%}", "최대 오차": "{:.2%}",
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
+    
+    # 시즌 일정 (경기별 외생 점수 / 신규 유저 / 휴식)
+    with st.expander("📅 시즌 일정"):
+        st.caption(
+            "경기마다 외생 점수(경기 중요도·기대감)와 신규 유저를 바꾸고, 경기 뒤 휴식 사이클 동안에는 "
+            "리스크 파이프라인만 돌립니다 — 경기별 전이행렬의 누적곱으로 계산합니다"
+        )
+        col_season1, col_season2 = st.columns([1, 3])
+        with col_season1:
+            st.number_input(
+                "경기 수", min_value=1, max_value=season.MAX_MATCHES, value=38, step=1, key="season_matches",
+                on_change=reset_season_schedule, args=(int(cycle_new_users),)
+            )
+            st.button(
+                "↺ 일정 초기화", key="season_reset", on_click=reset_season_schedule,
+                args=(int(cycle_new_users),), use_container_width=True
+            )
+            season_csv = st.file_uploader("📤 일정 CSV", type="csv", key="season_csv")
+        if season_csv is not None and season_csv.file_id != st.session_state.get("season_csv_id"):
+            st.session_state.season_csv_id = season_csv.file_id
+            try:
+                st.session_state.season_base = season.Season.from_table(
+                    pd.read_csv(season_csv, encoding="utf-8-sig")
+                ).to_table()
+                st.session_state.season_saved = st.session_state.season_base
+                st.session_state.season_version += 1
+            except (ValueError, pd.errors.ParserError, UnicodeDecodeError) as e:
+                st.error(f"⚠️ 가져오기 실패: {e}")
+        with col_season2:
+            schedule_table = season_editor(int(cycle_new_users))
+        
+        try:
+            schedule = season.Season.from_table(schedule_table)
+        except ValueError as e:
+            st.error(f"⚠️ {e}")
+        else:
+            season_df = cached_season(forecast_params, float(st.session_state.exo_endo_ratio), schedule)
+            st.plotly_chart(
+                figures.forecast(season_df["누적 사이클"], season_df["총 유저"], season_df["활성 유저"]),
+                use_container_width=True
+            )
+            col_season3, col_season4, col_season5 = st.columns(3)
+            with col_season3:
+                st.metric(
+                    "시즌 종료 총 유저", f"{season_df['총 유저'].iloc[-1]:,.0f}",
+                    f"{season_df['총 유저'].iloc[-1] - sim_df['총 유저'].iloc[-1]:+,.0f} vs 반복 예측",
+                    help="반복 예측은 위 그래프 (마지막 사이클)"
+                )
+            with col_season4:
+                st.metric("시즌 누적 이탈", f"{season_df['이탈 (Dead)'].sum():,.0f}")
+            with col_season5:
+                st.metric("경기 / 전체 사이클", f"{len(schedule):,} / {int(season_df['누적 사이클'].iloc[-1]):,}")
+            st.download_button(
+                "📥 일정 CSV 다운로드",
+                schedule.to_table().to_csv(index=False, encoding="utf-8-sig"),
+                file_name="season_schedule.csv",
+                mime="text/csv",
+                key="season_download"
+            )
+    
     # KPI 요약
     st.markdown("---")
     st.markdown("### 📊 시뮬레이션 결과 요약")
@@ -1418,77 +1847,280 @@ with tab_forecast:
         
         with col_chart1:
             # Pool 변화 추이
-            fig_pools = go.Figure()
-            
-            fig_pools.add_trace(go.Scatter(
-                x=sim_df["사이클"],
-                y=sim_df["React Pool"],
-                mode='lines',
-                name='React Pool',
-                line=dict(color='#ffe66d', width=2),
-                stackgroup='one'
-            ))
-            
-            fig_pools.add_trace(go.Scatter(
-                x=sim_df["사이클"],
-                y=sim_df["Sur Pool"],
-                mode='lines',
-                name='Sur Pool',
-                line=dict(color='#a06cd5', width=2),
-                stackgroup='one'
-            ))
-            
-            fig_pools.update_layout(
-                title="Pool 변화 추이",
-                xaxis_title="사이클",
-                yaxis_title="유저 수",
-                template='plotly_dark',
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                height=300
+            st.plotly_chart(
+                figures.pool_trend(sim_df["사이클"], sim_df["React Pool"], sim_df["Sur Pool"]),
+                use_container_width=True
             )
-            
-            st.plotly_chart(fig_pools, use_container_width=True)
         
         with col_chart2:
             # 사이클별 이탈
-            fig_churn = go.Figure()
-            
-            fig_churn.add_trace(go.Bar(
-                x=sim_df["사이클"],
-                y=sim_df["이탈 (Dead)"],
-                name='이탈 유저',
-                marker_color='#ff4757'
-            ))
-            
-            fig_churn.update_layout(
-                title="사이클별 최종 이탈 유저",
-                xaxis_title="사이클",
-                yaxis_title="이탈 수",
-                template='plotly_dark',
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                height=300
+            st.plotly_chart(figures.churn_trend(sim_df["사이클"], sim_df["이탈 (Dead)"]), use_container_width=True)
+    
+    # 민감도 분석
+    with st.expander("🌪️ 민감도 분석 (Tornado)"):
+        st.caption("모든 입력을 ±스윙만큼 움직였을 때 KPI 변화 — 전체 파라미터를 배치 계산 두 번으로 평가합니다")
+        col_sens1, col_sens2, col_sens3 = st.columns(3)
+        with col_sens1:
+            sens_kpi = st.selectbox(
+                "KPI", list(scenario.KPIS), format_func=scenario.KPIS.get, key="sens_kpi"
             )
-            
-            st.plotly_chart(fig_churn, use_container_width=True)
-    
-    # 시뮬레이션 데이터 테이블
-    with st.expander("📋 시뮬레이션 상세 데이터"):
+        with col_sens2:
+            sens_swing = st.slider("스윙 (±)", 0.01, 0.5, 0.1, 0.01, key="sens_swing", format="%.2f")
+        with col_sens3:
+            sens_top = st.slider("표시 개수", 5, 40, 15, key="sens_top")
+        
+        sens = cached_sensitivity(scenario_space, float(sens_swing))
+        sens_table = sens.table(sens_kpi).head(sens_top)
+        st.plotly_chart(
+            figures.tornado(
+                sens_table["파라미터"], sens_table["하향 변화"], sens_table["상향 변화"],
+                float(sens_swing), scenario.KPIS[sens_kpi], sens.base_kpis[sens_kpi]
+            ),
+            use_container_width=True
+        )
+        
         st.dataframe(
-            sim_df.style.format({
-                "활성 유저": "{:,.0f}",
-                "React Pool": "{:,.0f}",
-                "Sur Pool": "{:,.0f}",
-                "총 유저": "{:,.0f}",
-                "이탈 (Dead)": "{:,.0f}"
+            sens_table[["파라미터", "기준값", "미분", "탄력성", "하향 변화", "상향 변화"]].style.format({
+                "기준값": "{:,.2f}",
+                "미분": "{:,.2f}",
+                "탄력성": "{:.3f}",
+                "하향 변화": "{:+,.0f}",
+                "상향 변화": "{:+,.0f}"
             }),
+            use_container_width=True
+        )
+    
+    # 2D 파라미터 스윕
+    with st.expander("🗺️ 2D 파라미터 스윕"):
+        st.caption("두 입력을 격자로 훑어 KPI 지도를 그립니다 — 모든 KPI 를 한 번에 계산해 캐시하므로 KPI·색상 변경은 재계산하지 않습니다")
+        sweep_labels = scenario_space.labels
+        col_sw1, col_sw2 = st.columns(2)
+        with col_sw1:
+            sweep_x = st.selectbox(
+                "X 축 파라미터", range(len(sweep_labels)), format_func=sweep_labels.__getitem__,
+                index=scenario_space.index("exo_ratio"), key="sweep_x"
+            )
+            sweep_x_range = st.slider(
+                "X 범위", *sweep.default_range(scenario_space, sweep_x),
+                sweep.default_range(scenario_space, sweep_x), key=f"sweep_x_range_{sweep_x}"
+            )
+        with col_sw2:
+            sweep_y = st.selectbox(
+                "Y 축 파라미터", range(len(sweep_labels)), format_func=sweep_labels.__getitem__,
+                index=scenario_space.index("risk_conversion", item="At Risk DAU"), key="sweep_y"
+            )
+            sweep_y_range = st.slider(
+                "Y 범위", *sweep.default_range(scenario_space, sweep_y),
+                sweep.default_range(scenario_space, sweep_y), key=f"sweep_y_range_{sweep_y}"
+            )
+        col_sw3, col_sw4, col_sw5, col_sw6 = st.columns(4)
+        with col_sw3:
+            sweep_size = st.select_slider("격자 크기", options=[50, 100, 200, 300, 500], value=200, key="sweep_size")
+        with col_sw4:
+            sweep_kpi = st.selectbox(
+                "KPI", list(scenario.KPIS), format_func=scenario.KPIS.get, key="sweep_kpi"
+            )
+        with col_sw5:
+            sweep_colorscale = st.selectbox(
+                "색상", ["Viridis", "Plasma", "Turbo", "RdBu", "Teal"], key="sweep_colorscale"
+            )
+        with col_sw6:
+            sweep_style = st.radio("형태", ["Heatmap", "Contour"], horizontal=True, key="sweep_style")
+        
+        if sweep_x == sweep_y:
+            st.warning("X 축과 Y 축에 서로 다른 파라미터를 선택하세요")
+        elif st.checkbox("스윕 실행", value=False, key="sweep_enabled"):
+            sweep_result = cached_sweep(
+                scenario_space, sweep_x, sweep_y,
+                tuple(sweep_x_range), tuple(sweep_y_range), int(sweep_size)
+            )
+            st.plotly_chart(
+                figures.sweep_map(
+                    sweep_result.x, sweep_result.y, sweep_result.values[sweep_kpi],
+                    sweep_style, sweep_colorscale, scenario.KPIS[sweep_kpi],
+                    sweep_labels[sweep_x], sweep_labels[sweep_y],
+                    scenario_space.base[sweep_x], scenario_space.base[sweep_y]
+                ),
+                use_container_width=True
+            )
+            if sweep_result.workers > 1:
+                st.caption(f"⚙️ {sweep_result.workers}개 프로세스로 병렬 계산")
+    
+    # 콘텐츠 투자 최적화
+    with st.expander("💰 콘텐츠 투자 최적화"):
+        st.caption("콘텐츠별 점수 개선 비용과 총 예산을 정하면, KPI 를 가장 크게 올리는 점수 개선 배분을 찾습니다")
+        value_params = scenario_space.params[scenario_space.group("endo_value")]
+        col_inv1, col_inv2, col_inv3, col_inv4 = st.columns(4)
+        with col_inv1:
+            invest_kpi = st.selectbox(
+                "목표 KPI", list(scenario.KPIS), format_func=scenario.KPIS.get,
+                index=list(scenario.KPIS).index("steady_active"), key="invest_kpi"
+            )
+        with col_inv2:
+            invest_budget = st.number_input("총 예산", min_value=0.0, value=10.0, step=1.0, key="invest_budget")
+        with col_inv3:
+            invest_step = st.select_slider("개선 단위", options=[0.01, 0.05, 0.1], value=0.05, key="invest_step")
+        with col_inv4:
+            invest_exponent = st.slider(
+                "비용 곡률", 1.0, 3.0, 1.0, 0.1, key="invest_exponent",
+                help="1 = 선형, 1보다 크면 같은 콘텐츠를 더 올릴수록 단계 비용이 커집니다"
+            )
+        
+        cost_table = kept_editor(
+            "invest_costs",
+            pd.DataFrame({
+                "노드": [p.node for p in value_params],
+                "콘텐츠": [p.item for p in value_params],
+                "현재 점수": scenario_space.base[scenario_space.group("endo_value")],
+                "단계당 비용": 1.0,
+            }),
+            columns=["단계당 비용"],
+            on=["노드", "콘텐츠"],
+            disabled=["노드", "콘텐츠", "현재 점수"],
+            hide_index=True,
+            use_container_width=True,
+        )
+        
+        if st.checkbox("최적화 실행", value=False, key="invest_enabled") and len(value_params):
+            plan = cached_investment(
+                scenario_space, float(invest_budget),
+                tuple(float(c) for c in cost_table["단계당 비용"]),
+                invest_kpi, float(invest_step), float(invest_exponent)
+            )
+            st.caption(f"후보 {plan.evaluations:,}개 평가 · 현재 {scenario.KPIS[invest_kpi]}: {plan.base_kpi:,.0f}")
+            st.dataframe(
+                plan.top.style.format({"KPI": "{:,.0f}", "증가": "{:+,.0f}", "비용": "{:,.2f}"}),
+                use_container_width=True,
+                hide_index=True
+            )
+            if len(plan.top):
+                best_delta = plan.deltas[0]
+                st.plotly_chart(figures.investment(plan.items, best_delta), use_container_width=True)
+                st.button(
+                    "✅ 1순위 배분을 사이드바에 적용",
+                    key="invest_apply",
+                    on_click=set_endo_values,
+                    args=({
+                        (p.node, p.item): value
+                        for p, value in zip(value_params, plan.current + best_delta)
+                    },)
+                )
+    
+    # 유입/복귀 라우팅 최적화
+    with st.expander("🧭 유입·복귀 라우팅 최적화"):
+        st.caption("신규/복귀/부활 비중(각 합계 100%)을 노드별 상한 안에서 장기 목표가 최대가 되도록 배분합니다 — 모델이 비중에 선형이므로 정확해입니다")
+        route_objective = st.selectbox(
+            "목표", list(optimize.ROUTING_OBJECTIVES), format_func=optimize.ROUTING_OBJECTIVES.get,
+            key="route_objective"
+        )
+        route_cap_columns = [f"{label} 상한" for label in optimize.ROUTING_VECTORS.values()]
+        route_caps = kept_editor(
+            "route_caps",
+            pd.DataFrame({col: [1.0] * len(nodes) for col in route_cap_columns}, index=nodes),
+            columns=route_cap_columns,
+            column_config={
+                col: st.column_config.NumberColumn(min_value=0.0, max_value=1.0, step=0.05, format="%.2f")
+                for col in route_cap_columns
+            },
             use_container_width=True,
-            height=400
         )
+        try:
+            routing = optimize.optimize_routing(
+                success_rate=[success_rate[n] for n in nodes],
+                risk_conversion=[risk_conversion[s] for s in engine.RISK_STAGES],
+                cycle_new_users=cycle_new_users,
+                new_user_weight=[new_user_weight[n] for n in nodes],
+                re_weight=[re_weight[n] for n in nodes],
+                sur_weight=[sur_weight[n] for n in nodes],
+                objective=route_objective,
+                caps={
+                    name: route_caps[f"{label} 상한"].to_numpy(dtype=float)
+                    for name, label in optimize.ROUTING_VECTORS.items()
+                },
+            )
+        except ValueError as e:
+            st.error(f"⚠️ {e}")
+        else:
+            col_rt1, col_rt2 = st.columns(2)
+            with col_rt1:
+                st.metric("현재 배분", f"{routing.current_kpi:,.0f}")
+            with col_rt2:
+                st.metric(
+                    "최적 배분", f"{routing.optimal_kpi:,.0f}",
+                    f"{routing.optimal_kpi - routing.current_kpi:+,.0f}"
+                )
+            
+            st.plotly_chart(
+                figures.routing(nodes, optimize.ROUTING_VECTORS, routing.current, routing.optimal),
+                use_container_width=True
+            )
+    
+    # 목표 역산
+    with st.expander("🎯 목표 역산 (Goal Seek)"):
+        st.caption("목표 KPI 와 사이클 수, 움직일 파라미터 하나를 고르면 목표 달성에 필요한 값을 계산합니다")
+        col_gs1, col_gs2 = st.columns(2)
+        with col_gs1:
+            goal_kpi = st.selectbox(
+                "목표 KPI", list(scenario.KPIS), format_func=scenario.KPIS.get, key="goal_kpi"
+            )
+            goal_horizon = st.number_input(
+                "사이클 수 (예측 KPI)", min_value=1, max_value=100_000, value=int(num_cycles), key="goal_horizon"
+            )
+        goal_space = scenario_space.with_num_cycles(int(goal_horizon))
+        goal_current = float(goal_space.evaluate(goal_space.base, (goal_kpi,))[goal_kpi])
+        with col_gs2:
+            goal_param = st.selectbox(
+                "움직일 파라미터", range(len(goal_space)), format_func=goal_space.labels.__getitem__,
+                index=goal_space.index("cycle_new_users"), key="goal_param"
+            )
+            goal_target = st.number_input(
+                f"목표 값 (현재 {goal_current:,.0f})", min_value=0.0,
+                value=float(round(goal_current * 1.2)) if np.isfinite(goal_current) else 0.0,
+                step=100.0, key=f"goal_target_{goal_kpi}"
+            )
+        
+        try:
+            goal = goalseek.goal_seek(goal_space, goal_param, goal_kpi, goal_target)
+        except ValueError as e:
+            st.error(f"⚠️ {e}")
+            goal = None
+        if goal is not None:
+            col_gs3, col_gs4, col_gs5 = st.columns(3)
+            with col_gs3:
+                st.metric(
+                    f"필요한 {goal_space.labels[goal_param]}", f"{goal.value:,.4g}",
+                    f"현재 {goal_space.base[goal_param]:,.4g}", delta_color="off"
+                )
+            with col_gs4:
+                if np.isfinite(goal.achieved):
+                    st.metric("달성 KPI", f"{goal.achieved:,.0f}", f"{goal.achieved - goal.target:+,.0f} vs 목표", delta_color="off")
+                else:
+                    st.metric("달성 KPI", "발산")
+            with col_gs5:
+                st.metric("계산", goal.method, f"{goal.evaluations}회 평가 · {goal.elapsed * 1000:.1f}ms", delta_color="off")
+            if not np.isfinite(goal.achieved):
+                st.warning("⚠️ 파라미터 범위 전체에서 KPI 가 발산합니다 (정상상태 없음) — 계수를 확인하세요")
+            elif not goal.feasible:
+                st.warning("⚠️ 파라미터 범위 안에서는 목표에 도달할 수 없습니다 — 가장 가까운 값을 표시합니다")
+    
+    # 시뮬레이션 데이터 테이블
+    with st.expander("📋 시뮬레이션 상세 데이터"):
+        with perf.section("Styler · 시뮬레이션 표"):
+            st.dataframe(
+                sim_df.style.format({
+                    "활성 유저": "{:,.0f}",
+                    "React Pool": "{:,.0f}",
+                    "Sur Pool": "{:,.0f}",
+                    "총 유저": "{:,.0f}",
+                    "이탈 (Dead)": "{:,.0f}"
+                }),
+                use_container_width=True,
+                height=400
+            )
         
         # CSV 다운로드
-        sim_csv = sim_df.to_csv(index=False).encode('utf-8-sig')
+        with perf.section("CSV · 시뮬레이션 표"):
+            sim_csv = sim_df.to_csv(index=False).encode('utf-8-sig')
         st.download_button(
             label="📥 시뮬레이션 데이터 다운로드",
             data=sim_csv,
@@ -1496,8 +2128,84 @@ with tab_forecast:
             mime="text/csv"
         )
 
+# ==================== 시나리오 비교 ====================
+if view == VIEW_COMPARE:
+    st.markdown("### 🗂️ 시나리오 비교")
+    st.caption(
+        f"저장한 시나리오를 최대 {store.MAX_COMPARE}개까지 겹쳐 봅니다 — 저장된 결과는 다시 계산하지 않고, "
+        "결과가 없는 시나리오만 모아 한 번의 배치 계산으로 평가합니다"
+    )
+    saved_names = scenario_store().names()
+    
+    col_cmp1, col_cmp2, col_cmp3 = st.columns([3, 1, 1])
+    with col_cmp2:
+        compare_current = st.checkbox("현재 설정 포함", value=True, key="compare_current")
+    with col_cmp1:
+        compare_names = st.multiselect(
+            "비교할 시나리오",
+            saved_names,
+            default=saved_names[:3],
+            max_selections=store.MAX_COMPARE - int(compare_current),
+            key="compare_names"
+        )
+    with col_cmp3:
+        compare_cycles = st.number_input("사이클 수", min_value=1, max_value=1000, value=20, key="compare_cycles")
+    
+    extra = {"▶ 현재 설정": current_scenario} if compare_current else {}
+    if not compare_names and not extra:
+        st.info("비교할 시나리오를 고르거나 사이드바 💾 에서 현재 설정을 저장하세요")
+    else:
+        comparison = scenario_store().compare(compare_names, int(compare_cycles), extra=extra)
+        
+        col_cmp4, col_cmp5 = st.columns(2)
+        with col_cmp4:
+            compare_metric = st.selectbox(
+                "곡선", list(engine.FORECAST_COLUMNS), index=engine.FORECAST_COLUMNS.index("총 유저"),
+                key="compare_metric"
+            )
+        with col_cmp5:
+            compare_reference = st.selectbox("기준 시나리오 (Δ)", comparison.names, key="compare_reference")
+        
+        st.plotly_chart(
+            figures.scenario_comparison(
+                comparison.names,
+                comparison.forecast[..., engine.FORECAST_COLUMNS.index(compare_metric)],
+                compare_metric
+            ),
+            use_container_width=True
+        )
+        st.caption(
+            f"🗄️ {len(comparison.names)}개 시나리오 중 {comparison.computed}개 새로 계산 "
+            f"(나머지는 저장된 결과 재사용)"
+        )
+        
+        kpi_table = comparison.kpi_table(reference=comparison.names.index(compare_reference))
+        st.dataframe(
+            kpi_table.style.format({c: "{:+,.0f}" if c.startswith("Δ") else "{:,.0f}" for c in kpi_table.columns[1:]}),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    with st.expander("📋 저장된 시나리오 목록"):
+        st.dataframe(scenario_store().table(), use_container_width=True, hide_index=True)
+
+# ⏱️ 성능 패널 (측정은 여기까지, 패널 그리기는 포함하지 않음)
+if perf_recorder is not None:
+    perf_timing = perf.stop(perf_recorder)
+    st.session_state.setdefault("perf_history", deque(maxlen=perf.HISTORY_SIZE)).append(perf_timing)
+if "perf_profiler" in st.session_state:
+    st.session_state.perf_capture = perf.finish_profile(st.session_state.pop("perf_profiler"))
+if perf_recorder is not None:
+    perf_panel(perf_timing, st.session_state.perf_history)
+
 # Footer
 st.markdown("---")
+fig_stats = figures.CACHE.stats()
+st.caption(
+    f"🖼️ 그림 캐시 (이 세션): 재사용 {st.session_state.fig_tally.hits:,}회 · "
+    f"새로 생성 {st.session_state.fig_tally.misses:,}회 · "
+    f"서버 공용 보관 {fig_stats['size']}/{fig_stats['maxsize']} (밀려남 {fig_stats['evictions']:,})"
+)
 st.markdown(
     '<p style="text-align:center; color:#666;">Made with ❤️ using Streamlit | DAU Funnel Simulator v1.0</p>',
     unsafe_allow_html=True
@@ -0,0 +1,265 @@
+"""시나리오 일괄 실행 (브라우저 없이)
+
+JSON/YAML 시나리오 파일을 읽어 정상상태와 사이클 예측을 프로세스 풀에서 계산하고,
+노드 표 / 리스크 표 / 시뮬레이션 표를 시나리오 열을 붙인 파일 세 개로 저장한다.
+
+    python batch.py scenarios/*.yaml -o out/
+    python batch.py plans.json -o out/ --format csv --workers 8
+
+시나리오 파일은 시나리오 dict 하나, dict 목록, 또는 {"scenarios": [...]} 이며 키는
+scenario.ScenarioSpace.from_state 와 같다 (endo_factors, exo_endo_ratio, total_new_users,
+new_user_weight, re_weight, sur_weight, risk_conversion, num_cycles, initial_users,
+cycle_new_users). 예측 설정은 생략하면 app 기본값을 쓴다. 예시: scenarios/example.yaml
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+import engine
+
+# 필수 키 (예측 설정은 FORECAST_DEFAULTS 로 채움)
+REQUIRED_KEYS = (
+    "endo_factors", "exo_endo_ratio", "total_new_users",
+    "new_user_weight", "re_weight", "sur_weight", "risk_conversion",
+)
+
+# app 의 예측 입력 기본값 (cycle_new_users 가 없으면 total_new_users)
+FORECAST_DEFAULTS = {"num_cycles": 20, "initial_users": 5000}
+
+# 출력 표 이름 → 파일 이름
+OUTPUT_TABLES = ("nodes", "risk", "forecast", "summary")
+
+
+# ==================== 시나리오 읽기 ====================
+def _load_file(path):
+    text = Path(path).read_text(encoding="utf-8")
+    if Path(path).suffix.lower() in (".yaml", ".yml"):
+        import yaml  # YAML 시나리오를 쓸 때만 필요
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+def load_scenarios(paths):
+    """파일 목록 → [(이름, 시나리오 dict)] (이름이 없으면 파일 이름, 겹치면 번호를 붙임)"""
+    scenarios = []
+    used = set()
+    for path in paths:
+        data = _load_file(path)
+        if isinstance(data, dict) and "scenarios" in data:
+            data = data["scenarios"]
+        items = data if isinstance(data, list) else [data]
+        for i, state in enumerate(items):
+            if not isinstance(state, dict):
+                raise ValueError(f"{path}: 시나리오는 dict 여야 합니다 ({i}번째)")
+            name = str(state.get("name") or (Path(path).stem if len(items) == 1 else f"{Path(path).stem}_{i}"))
+            if name in used:
+                # 번호를 붙인 이름도 이미 쓰였을 수 있다 (예: a, a, a_2)
+                n = 2
+                while f"{name}_{n}" in used:
+                    n += 1
+                name = f"{name}_{n}"
+            used.add(name)
+            scenarios.append((name, state))
+    return scenarios
+
+
+def complete_state(state):
+    """필수 키를 확인하고 생략한 예측 설정을 기본값으로 채운 사본"""
+    missing = [k for k in REQUIRED_KEYS if k not in state]
+    if missing:
+        raise ValueError(f"시나리오에 키가 없습니다: {', '.join(missing)}")
+    return {
+        **FORECAST_DEFAULTS,
+        "cycle_new_users": state["total_new_users"],
+        **{k: v for k, v in state.items() if k != "name"},
+    }
+
+
+def build_params(state):
+    """시나리오 dict → (FunnelParams, ForecastParams) (app 사이드바와 같은 계산)"""
+    state = complete_state(state)
+    exo_ratio = float(state["exo_endo_ratio"])
+    success_rate = {
+        node: engine.node_success_rate(engine.endo_score(state["endo_factors"].get(node, {}))[0], exo_ratio)
+        for node in engine.NODES
+    }
+    new_users = engine.split_new_users(state["total_new_users"], state["new_user_weight"])
+    funnel = engine.FunnelParams.from_dicts(
+        success_rate, new_users, state["re_weight"], state["sur_weight"], state["risk_conversion"]
+    )
+    forecast = engine.ForecastParams.from_dicts(
+        funnel, state["num_cycles"], state["initial_users"], state["cycle_new_users"],
+        state["new_user_weight"],
+    )
+    return funnel, forecast
+
+
+# ==================== 실행 ====================
+def run_scenario(state):
+    """시나리오 하나 계산 → {표 이름: DataFrame, "summary": 요약 dict} (워커에서 실행)"""
+    start = time.perf_counter()
+    funnel, forecast_params = build_params(state)
+    steady = engine.solve_steady_state(funnel)
+    sim_df = engine.run_forecast(forecast_params).table
+
+    nodes = steady.table
+    summary = {
+        "총활성": float(nodes["총활성"].to_numpy().sum()),
+        "성공수": float(nodes["성공수"].to_numpy().sum()),
+        "React Pool": steady.react_pool,
+        "Sur Pool": steady.sur_pool,
+        "최종 총 유저": float(sim_df["총 유저"].to_numpy()[-1]),
+        "최종 활성 유저": float(sim_df["활성 유저"].to_numpy()[-1]),
+        "정확해": steady.exact,
+        "계산 시간(초)": time.perf_counter() - start,
+    }
+    return {"nodes": nodes, "risk": steady.risk.to_frame(), "forecast": sim_df, "summary": summary}
+
+
+def _chunks(scenarios, size):
+    for i in range(0, len(scenarios), size):
+        yield scenarios[i:i + size]
+
+
+def _run_chunk(chunk):
+    # 시나리오 하나는 수 ms 라 여러 개를 묶어 프로세스 왕복을 줄인다
+    results, failures = [], []
+    for name, state in chunk:
+        try:
+            results.append((name, run_scenario(state)))
+        except (KeyError, ValueError, TypeError) as e:
+            failures.append((name, f"{type(e).__name__}: {e}"))
+    return results, failures
+
+
+def run_batch(scenarios, workers=None, chunk_size=None, progress=None):
+    """시나리오 목록을 프로세스 풀에서 계산한다
+
+    workers=1 이면 현재 프로세스에서 계산. progress(완료 수, 전체 수) 콜백.
+    반환: ({표 이름: 전체 DataFrame}, [(이름, 오류)], 사용한 워커 수)
+    """
+    workers = max(1, min(int(workers or os.cpu_count() or 1), len(scenarios) or 1))
+    if chunk_size is None:
+        chunk_size = max(1, min(50, len(scenarios) // (workers * 4) or 1))
+
+    results, failures = [], []
+    done = 0
+    if workers == 1:
+        for chunk in _chunks(scenarios, chunk_size):
+            r, f = _run_chunk(chunk)
+            results += r
+            failures += f
+            done += len(chunk)
+            if progress:
+                progress(done, len(scenarios))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_run_chunk, chunk): len(chunk) for chunk in _chunks(scenarios, chunk_size)}
+            for future in as_completed(futures):
+                r, f = future.result()
+                results += r
+                failures += f
+                done += futures[future]
+                if progress:
+                    progress(done, len(scenarios))
+
+    # 시나리오 입력 순서로 정렬해 시나리오 열을 붙여 합친다
+    order = {name: i for i, (name, _) in enumerate(scenarios)}
+    results.sort(key=lambda r: order[r[0]])
+    names = [name for name, _ in results]
+    tables = {}
+    for k in OUTPUT_TABLES:
+        if not results:
+            tables[k] = pd.DataFrame()
+        elif k == "summary":
+            tables[k] = pd.DataFrame([{"시나리오": name, **r[k]} for name, r in results])
+        else:
+            merged = pd.concat([r[k] for _, r in results], keys=names, names=["시나리오", None])
+            tables[k] = merged.reset_index(level="시나리오").reset_index(drop=True)
+    return tables, failures, workers
+
+
+# ==================== 저장 ====================
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def write_tables(tables, out_dir, fmt):
+    """표를 out_dir/<이름>.<fmt> 로 저장하고 경로 목록을 돌려준다"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, table in tables.items():
+        path = out_dir / f"{name}.{fmt}"
+        if fmt == "parquet":
+            table.to_parquet(path, index=False)
+        else:
+            table.to_csv(path, index=False, encoding="utf-8-sig")
+        paths.append(path)
+    return paths
+
+
+def _print_progress(done, total):
+    width = 30
+    filled = int(width * done / max(total, 1))
+    print(f"\r[{'#' * filled}{'.' * (width - filled)}] {done}/{total}", end="", file=sys.stderr, flush=True)
+    if done == total:
+        print(file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DAU Funnel 시나리오 일괄 실행")
+    parser.add_argument("files", nargs="+", help="시나리오 JSON/YAML 파일")
+    parser.add_argument("-o", "--out", default="batch_output", help="출력 폴더 (기본: batch_output)")
+    parser.add_argument("--format", choices=("parquet", "csv"), default=None,
+                        help="출력 형식 (기본: pyarrow 가 있으면 parquet, 없으면 csv)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수, 1 이면 단일 프로세스)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="워커에 한 번에 넘길 시나리오 수")
+    parser.add_argument("-q", "--quiet", action="store_true", help="진행 표시 생략")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if parquet_available() else "csv")
+    if fmt == "parquet" and not parquet_available():
+        parser.error("parquet 출력에는 pyarrow 가 필요합니다 (--format csv 를 쓰세요)")
+
+    start = time.perf_counter()
+    scenarios = load_scenarios(args.files)
+    loaded = time.perf_counter()
+    print(f"시나리오 {len(scenarios):,}개 ({len(args.files)}개 파일)", file=sys.stderr)
+
+    tables, failures, workers = run_batch(
+        scenarios, workers=args.workers, chunk_size=args.chunk_size,
+        progress=None if args.quiet else _print_progress,
+    )
+    computed = time.perf_counter()
+    paths = write_tables(tables, args.out, fmt)
+    finished = time.perf_counter()
+
+    succeeded = len(scenarios) - len(failures)
+    compute_time = computed - loaded
+    print(
+        f"완료: {succeeded:,}개 성공 / {len(failures):,}개 실패 · 워커 {workers}개\n"
+        f"  읽기 {loaded - start:.2f}초 · 계산 {compute_time:.2f}초 · 저장 {finished - computed:.2f}초\n"
+        f"  처리량 {succeeded / max(compute_time, 1e-9):,.1f} 시나리오/초 "
+        f"(전체 {succeeded / max(finished - start, 1e-9):,.1f} 시나리오/초)",
+        file=sys.stderr,
+    )
+    for path in paths:
+        print(f"  → {path}", file=sys.stderr)
+    for name, error in failures:
+        print(f"  ✗ {name}: {error}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,630 @@
+"""성능 벤치마크 (엔진 / 그림 / Styler / 앱 전체 재실행) + 기준 구현 검증
+
+변경 전후로 대시보드가 느려졌는지 확인한다. 결과는 JSON 으로 저장하고, 저장해 둔 기준선이
+있으면 항목별 배율(현재 / 기준선)을 비교해 임계값을 넘는 항목을 회귀로 표시한다.
+
+    python bench.py                                  # bench_results.json 저장 (+ bench_baseline.json 과 비교)
+    python bench.py --only engine oracle --quick     # 일부 계층만, 반복 줄여서
+    python bench.py --save-baseline                  # 현재 결과를 기준선으로 저장
+
+계층:
+  engine   정상상태 Pool 계산, 사이클 예측 (20 / 1,000 / 100,000 사이클), 배치 API
+  figures  figures.py 의 모든 그림 (캐시를 거치지 않은 .build)
+  styler   app 의 pandas Styler 표 렌더링
+  app      streamlit AppTest 로 app.py 새 세션 실행, 화면별 재실행, 콘텐츠 편집 재실행
+  oracle   원래 app.py 의 사이클 루프를 그대로 옮긴 순수 Python 기준 구현과 엔진 결과 비교
+           (더 빠른 엔진으로 바꿔도 숫자가 허용 오차 안에서 같아야 함)
+
+엔진 결과가 기준 구현과 다르거나, 항목이 실패하거나, 기준선 대비 회귀가 있으면 종료 코드 1.
+"""
+import argparse
+import dataclasses
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import batch
+import engine
+import figures
+import graph
+import montecarlo
+import optimize
+import scenario
+import sensitivity
+import sweep
+
+# 결과 파일 형식 버전
+RESULTS_VERSION = 1
+
+LAYERS = ("engine", "figures", "styler", "app", "oracle")
+
+# 기준 시나리오 (app 기본값)
+DEFAULT_SCENARIO = Path(__file__).with_name("scenarios") / "example.yaml"
+DEFAULT_BASELINE = Path(__file__).with_name("bench_baseline.json")
+
+# 예측 사이클 수
+FORECAST_HORIZONS = (20, 1_000, 100_000)
+
+# 기준 구현과의 허용 상대 오차 (|차이| / max(|기준값|, 1))
+ORACLE_RTOL = 1e-9
+# 무작위 시나리오 수 (기준 구현 비교용)
+ORACLE_SCENARIOS = 20
+
+
+# ==================== 기준 구현 (oracle) ====================
+def reference_cycle(funnel, inflow, active, react_pool, sur_pool):
+    """한 경기 사이클 (원래 app.py 의 노드 / 리스크 루프를 그대로 옮긴 순수 Python)
+
+    반환: (다음 활성, React Pool, Sur Pool, 완전 이탈, 노드별 (총활성, 성공수, 이탈수))
+    """
+    rows = []
+    total_at_risk = 0.0
+    for i in range(len(funnel.success_rate)):
+        total = active + inflow[i] + react_pool * funnel.re_weight[i] + sur_pool * funnel.sur_weight[i]
+        rate = funnel.success_rate[i]
+        success = total * rate
+        at_risk = total * (1 - rate)
+        rows.append((total, success, at_risk))
+        total_at_risk += at_risk
+        active = success
+
+    dau_rate, wau_rate, dead_rate = funnel.risk_conversion
+    dau_loss = total_at_risk * (1 - dau_rate)
+    wau_loss = dau_loss * (1 - wau_rate)
+    react_pool = total_at_risk * dau_rate + dau_loss * wau_rate
+    sur_pool = wau_loss * dead_rate
+    dead_loss = wau_loss * (1 - dead_rate)
+    return active, react_pool, sur_pool, dead_loss, rows
+
+
+def reference_forecast(params):
+    """사이클 예측 기준 구현 → (num_cycles, len(FORECAST_COLUMNS)) 배열"""
+    weights = params.new_user_weight
+    total_weight = max(sum(weights), 0.01)
+    inflow = [params.cycle_new_users * w / total_weight for w in weights]
+
+    active, react_pool, sur_pool = float(params.initial_users), 0.0, 0.0
+    out = []
+    for _ in range(params.num_cycles):
+        active, react_pool, sur_pool, dead_loss, _ = reference_cycle(
+            params.funnel, inflow, active, react_pool, sur_pool
+        )
+        out.append((active, react_pool, sur_pool, active + react_pool + sur_pool, dead_loss))
+    return np.array(out)
+
+
+def reference_steady_state(funnel, tol=1e-15, max_iterations=1_000_000):
+    """정상상태 기준 구현: 사이클을 변화가 없어질 때까지 반복한다
+
+    반환: (이전유지, React Pool, Sur Pool, 노드별 총활성…, 성공수…, 이탈수…) 배열
+    """
+    state = (0.0, 0.0, 0.0)
+    for _ in range(max_iterations):
+        active, react_pool, sur_pool, _, rows = reference_cycle(funnel, funnel.new_users, *state)
+        new_state = (active, react_pool, sur_pool)
+        if max(abs(a - b) / max(abs(b), 1.0) for a, b in zip(new_state, state)) < tol:
+            break
+        state = new_state
+    else:
+        raise ValueError("기준 정상상태가 수렴하지 않았습니다")
+    _, _, _, _, rows = reference_cycle(funnel, funnel.new_users, *new_state)
+    return np.array([*new_state, *(r[0] for r in rows), *(r[1] for r in rows), *(r[2] for r in rows)])
+
+
+def _steady_vector(steady):
+    table = steady.table
+    return np.concatenate([
+        [table["이전유지"].iloc[0], steady.react_pool, steady.sur_pool],
+        table["총활성"].to_numpy(), table["성공수"].to_numpy(), table["이탈수"].to_numpy(),
+    ])
+
+
+def random_params(n, num_cycles=1_000, seed=0):
+    """기준 구현 비교용 무작위 ForecastParams (정상상태가 존재하는 범위)"""
+    rng = np.random.default_rng(seed)
+    k = len(engine.NODES)
+
+    def floats(values):
+        return tuple(float(v) for v in values)
+
+    params = []
+    for _ in range(n):
+        funnel = engine.FunnelParams(
+            success_rate=floats(rng.uniform(0.3, 0.95, k)),
+            new_users=floats(rng.uniform(0, 2_000, k)),
+            re_weight=floats(rng.dirichlet(np.ones(k))),
+            sur_weight=floats(rng.dirichlet(np.ones(k))),
+            risk_conversion=floats(rng.uniform(0.0, 0.6, len(engine.RISK_STAGES))),
+        )
+        params.append(engine.ForecastParams(
+            funnel=funnel,
+            num_cycles=num_cycles,
+            initial_users=float(rng.uniform(0, 10_000)),
+            cycle_new_users=float(rng.uniform(0, 5_000)),
+            new_user_weight=floats(rng.uniform(0, 1, k)),
+        ))
+    return params
+
+
+def relative_error(actual, expected):
+    actual = np.asarray(actual, dtype=float)
+    expected = np.asarray(expected, dtype=float)
+    return float(np.max(np.abs(actual - expected) / np.maximum(np.abs(expected), 1.0)))
+
+
+def oracle_checks(fixture, rtol=ORACLE_RTOL):
+    """엔진 결과를 기준 구현과 비교 → [{"name", "max_rel_error", "ok"}]"""
+    funnel, forecast_params = fixture.funnel, fixture.forecast_params
+    randoms = random_params(ORACLE_SCENARIOS)
+    linear = graph.FunnelGraph.linear()
+    checks = []
+
+    def check(name, compute):
+        errors = [relative_error(actual, expected) for actual, expected in compute()]
+        error = max(errors)
+        checks.append({"name": name, "max_rel_error": error, "ok": bool(error <= rtol)})
+
+    check("engine.solve_steady_state", lambda: [
+        (_steady_vector(engine.solve_steady_state(p)), reference_steady_state(p))
+        for p in [funnel] + [r.funnel for r in randoms]
+    ])
+    check("graph.solve_steady_state[linear]", lambda: [
+        (_steady_vector(graph.solve_steady_state(linear, p)), reference_steady_state(p))
+        for p in [funnel] + [r.funnel for r in randoms]
+    ])
+
+    def batch_steady():
+        arrays = engine.stack_forecast_params(randoms)
+        inflow = np.array([r.funnel.new_users for r in randoms])
+        out = engine.steady_state_batch(
+            arrays["success_rate"], arrays["re_weight"], arrays["sur_weight"], arrays["risk_conversion"], inflow
+        )
+        k = len(engine.NODES)
+        for row, r in zip(out, randoms):
+            ref = reference_steady_state(r.funnel)
+            totals = ref[3:3 + k].sum(), ref[3 + k:3 + 2 * k].sum(), ref[3 + 2 * k:].sum()
+            yield row, np.concatenate([ref[:3], totals])
+
+    check("engine.steady_state_batch", batch_steady)
+
+    for cycles in FORECAST_HORIZONS:
+        params = dataclasses.replace(forecast_params, num_cycles=cycles)
+        check(f"engine.run_forecast[{cycles}]", lambda params=params: [
+            (engine.run_forecast(params).table[list(engine.FORECAST_COLUMNS)].to_numpy(), reference_forecast(params))
+        ])
+
+    def far_forecast():
+        params = dataclasses.replace(forecast_params, num_cycles=max(FORECAST_HORIZONS))
+        ref = reference_forecast(params)
+        out = engine.forecast_at(cycles=FORECAST_HORIZONS, **engine.stack_forecast_params([params]))[0]
+        yield out, ref[[c - 1 for c in FORECAST_HORIZONS]]
+
+    check("engine.forecast_at", far_forecast)
+
+    def batch_forecast():
+        traj = engine.simulate_batch(num_cycles=randoms[0].num_cycles, **engine.stack_forecast_params(randoms))
+        for row, r in zip(traj, randoms):
+            yield row, reference_forecast(r)
+
+    check("engine.simulate_batch", batch_forecast)
+    check("graph.run_forecast[linear]", lambda: [
+        (graph.run_forecast(linear, r).table[list(engine.FORECAST_COLUMNS)].to_numpy(), reference_forecast(r))
+        for r in randoms[:5]
+    ])
+    return checks
+
+
+# ==================== 측정 ====================
+@dataclass(frozen=True)
+class Case:
+    """측정 항목 하나 (setup 은 매 반복 전에 실행하고 시간에서 뺀다)"""
+    layer: str
+    name: str
+    fn: object
+    setup: object = None
+
+
+@dataclass(frozen=True, eq=False)
+class Fixture:
+    """기준 시나리오로 만든 공통 입력 (app 과 같은 계산 경로)"""
+    state: dict
+    funnel: engine.FunnelParams
+    forecast_params: engine.ForecastParams
+    steady: engine.SteadyState
+    sim_df: pd.DataFrame
+    fan_chart: montecarlo.FanChart
+
+    @classmethod
+    def load(cls, path=DEFAULT_SCENARIO):
+        (_, state), = batch.load_scenarios([path])
+        state = batch.complete_state(state)
+        funnel, forecast_params = batch.build_params(state)
+        return cls(
+            state=state,
+            funnel=funnel,
+            forecast_params=forecast_params,
+            steady=engine.solve_steady_state(funnel),
+            sim_df=engine.run_forecast(forecast_params).table,
+            fan_chart=montecarlo.sample_forecast(
+                forecast_params, montecarlo.MonteCarloSettings(draws=10_000, seed=0)
+            ),
+        )
+
+
+def measure(case, repeat):
+    """반복별 1회 시간(ms) 목록 → {"median_ms", "min_ms", "runs"}
+
+    한 번이 짧은 항목은 timeit.autorange 로 여러 번 묶어 타이머 해상도 오차를 줄인다.
+    """
+    if case.setup is not None:
+        case.setup()
+    case.fn()  # 준비 실행 (import, 지연 초기화)
+
+    number = 1
+    if case.setup is None:
+        number, _ = timeit.Timer(case.fn).autorange()
+
+    times = []
+    for _ in range(repeat):
+        if case.setup is not None:
+            case.setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            case.fn()
+        times.append((time.perf_counter() - start) / number * 1000)
+    return {"median_ms": statistics.median(times), "min_ms": min(times), "runs": repeat * number}
+
+
+def engine_cases(fixture):
+    funnel, forecast_params = fixture.funnel, fixture.forecast_params
+    cases = [
+        Case("engine", "engine.solve_steady_state", lambda: engine.solve_steady_state(funnel)),
+        Case("engine", "engine.solve_steady_state_iterative", lambda: engine.solve_steady_state_iterative(funnel)),
+    ]
+    for cycles in FORECAST_HORIZONS:
+        params = dataclasses.replace(forecast_params, num_cycles=cycles)
+        cases.append(Case("engine", f"engine.run_forecast[{cycles}]", lambda params=params: engine.run_forecast(params)))
+
+    arrays = engine.stack_forecast_params([forecast_params])
+    cases.append(Case("engine", "engine.forecast_at[100000]",
+                      lambda: engine.forecast_at(cycles=[max(FORECAST_HORIZONS)], **arrays)))
+
+    randoms = random_params(10_000, num_cycles=20, seed=1)
+    stacked = engine.stack_forecast_params(randoms)
+    inflow = np.array([r.funnel.new_users for r in randoms])
+    cases += [
+        Case("engine", "engine.steady_state_batch[10000]", lambda: engine.steady_state_batch(
+            stacked["success_rate"], stacked["re_weight"], stacked["sur_weight"], stacked["risk_conversion"], inflow
+        )),
+        Case("engine", "engine.simulate_batch[10000x20]", lambda: engine.simulate_batch(num_cycles=20, **stacked)),
+    ]
+    return cases
+
+
+def figure_cases(fixture):
+    """app 과 같은 인자로 모든 그림을 만든다 (캐시 적중 비용은 별도 항목)"""
+    df, risk, sim_df, fan = fixture.steady.table, fixture.steady.risk, fixture.sim_df, fixture.fan_chart
+    react_pool, sur_pool = fixture.steady.react_pool, fixture.steady.sur_pool
+    node = engine.NODES[0]
+    factors = fixture.state["endo_factors"][node]
+    names = list(factors)
+    values = [f["value"] for f in factors.values()]
+    weights = [f["weight"] for f in factors.values()]
+    node_data = df.iloc[0]
+
+    comparison = engine.simulate_batch(
+        num_cycles=fixture.forecast_params.num_cycles,
+        **engine.stack_forecast_params(random_params(20, num_cycles=fixture.forecast_params.num_cycles, seed=2)),
+    )[..., engine.FORECAST_COLUMNS.index("총 유저")]
+    comparison_names = [f"시나리오 {i + 1}" for i in range(len(comparison))]
+
+    # 분석 패널 그림 입력 (app 기본 설정)
+    space = scenario.ScenarioSpace.from_state(fixture.state)
+    sens = sensitivity.analyze(space, 0.1)
+    sens_table = sens.table("forecast_total").head(15)
+    sweep_x, sweep_y = space.index("exo_ratio"), space.index("risk_conversion", item="At Risk DAU")
+    sweep_result = sweep.run_sweep(
+        space, sweep_x, sweep_y, sweep.default_range(space, sweep_x), sweep.default_range(space, sweep_y),
+        size=200, kpis=("forecast_total",), workers=1,
+    )
+    value_params = space.params[space.group("endo_value")]
+    plan = optimize.invest_content(space, 10.0, np.ones(len(value_params)))
+    funnel = fixture.funnel
+    routing = optimize.optimize_routing(
+        funnel.success_rate, funnel.risk_conversion, fixture.forecast_params.cycle_new_users,
+        fixture.forecast_params.new_user_weight, funnel.re_weight, funnel.sur_weight,
+    )
+
+    builds = {
+        "endo_factors": lambda: figures.endo_factors.build(node, names, values, weights),
+        "endo_contribution": lambda: figures.endo_contribution.build(
+            node, names, [v * w for v, w in zip(values, weights)]
+        ),
+        "node_composition": lambda: figures.node_composition.build(
+            df["노드"], df["이전유지"], df["신규"], df["복귀수"], df["부활수"]
+        ),
+        "node_outcome": lambda: figures.node_outcome.build(df["노드"], df["성공수"], df["이탈수"]),
+        "success_gauge": lambda: figures.success_gauge.build(node, fixture.funnel.success_rate[0]),
+        "lifecycle_sankey": lambda: figures.lifecycle_sankey.build(
+            graph.FunnelGraph.linear(), df[["노드", "총활성", "성공수", "이탈수"]], risk, react_pool, sur_pool
+        ),
+        "inflow_pie": lambda: figures.inflow_pie.build(
+            node, node_data["이전유지"], node_data["신규"], node_data["복귀수"], node_data["부활수"]
+        ),
+        "outcome_pie": lambda: figures.outcome_pie.build(node, node_data["성공수"], node_data["이탈수"]),
+        "risk_waterfall": lambda: figures.risk_waterfall.build(risk),
+        "risk_funnel": lambda: figures.risk_funnel.build(risk),
+        "forecast": lambda: figures.forecast.build(sim_df["사이클"], sim_df["총 유저"], sim_df["활성 유저"]),
+        "forecast[bands]": lambda: figures.forecast.build(
+            sim_df["사이클"], sim_df["총 유저"], sim_df["활성 유저"], band_cycles=fan.cycles, bands=fan.bands
+        ),
+        "pool_trend": lambda: figures.pool_trend.build(sim_df["사이클"], sim_df["React Pool"], sim_df["Sur Pool"]),
+        "churn_trend": lambda: figures.churn_trend.build(sim_df["사이클"], sim_df["이탈 (Dead)"]),
+        "scenario_comparison": lambda: figures.scenario_comparison.build(comparison_names, comparison, "총 유저"),
+        "tornado": lambda: figures.tornado.build(
+            sens_table["파라미터"], sens_table["하향 변화"], sens_table["상향 변화"],
+            0.1, scenario.KPIS["forecast_total"], sens.base_kpis["forecast_total"]
+        ),
+        "sweep_map": lambda: figures.sweep_map.build(
+            sweep_result.x, sweep_result.y, sweep_result.values["forecast_total"], "Heatmap", "Viridis",
+            scenario.KPIS["forecast_total"], space.labels[sweep_x], space.labels[sweep_y],
+            space.base[sweep_x], space.base[sweep_y]
+        ),
+        "investment": lambda: figures.investment.build(plan.items, plan.deltas[0]),
+        "routing": lambda: figures.routing.build(
+            list(engine.NODES), optimize.ROUTING_VECTORS, routing.current, routing.optimal
+        ),
+    }
+    cases = [Case("figures", f"figures.{name}", fn) for name, fn in builds.items()]
+    cases.append(Case("figures", "figures.forecast[cache hit]", lambda: figures.forecast(
+        sim_df["사이클"], sim_df["총 유저"], sim_df["활성 유저"], band_cycles=fan.cycles, bands=fan.bands
+    )))
+    return cases
+
+
+def styler_cases(fixture):
+    """app.py 와 같은 서식의 Styler 를 HTML 로 렌더링한다"""
+    df, sim_df = fixture.steady.table, fixture.sim_df
+    risk_data = fixture.steady.risk.to_frame()
+    table = engine.factor_table(fixture.state["endo_factors"])
+    scores, total_weight, rates = engine.node_scores(table, float(fixture.state["exo_endo_ratio"]))
+    summary = pd.DataFrame({
+        "노드": list(engine.NODES),
+        "콘텐츠": table["노드"].value_counts().reindex(engine.NODES, fill_value=0).to_numpy(),
+        "가중치 합계": total_weight,
+        "내재 점수": scores,
+        "성공률": rates,
+    })
+
+    renders = {
+        "nodes": lambda: df.style.format({
+            "이전유지": "{:,.0f}", "신규": "{:,.0f}", "복귀비중": "{:.0%}", "복귀수": "{:,.1f}",
+            "부활비중": "{:.0%}", "부활수": "{:,.1f}", "총활성": "{:,.0f}", "성공률": "{:.0%}",
+            "이탈률": "{:.0%}", "성공수": "{:,.0f}", "이탈수": "{:,.0f}",
+        }).to_html(),
+        "risk": lambda: risk_data.style.format({
+            "인원": "{:,.0f}", "전환율": "{:.0%}", "성공수": "{:,.0f}", "손실율": "{:.0%}", "손실수": "{:,.0f}",
+        }).to_html(),
+        "forecast": lambda: sim_df.style.format(
+            {c: "{:,.0f}" for c in engine.FORECAST_COLUMNS}
+        ).to_html(),
+        "factor_summary": lambda: summary.style.format(
+            {"가중치 합계": "{:.0%}", "내재 점수": "{:.0%}", "성공률": "{:.0%}"}
+        ).to_html(),
+    }
+    return [Case("styler", f"styler.{name}", fn) for name, fn in renders.items()]
+
+
+def app_cases(timeout=120):
+    """AppTest 로 app.py 전체 스크립트를 실행한다
+
+    app.first_run 은 새 세션의 첫 실행 (프로세스 캐시는 공유), [cold] 는 st.cache_data 와
+    그림 캐시를 비운 뒤의 첫 실행, app.rerun[화면] 은 입력 변화 없는 재실행이다.
+    """
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    script = str(Path(__file__).with_name("app.py"))
+
+    def run(at):
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"app.py 실행 오류: {at.exception[0].value}")
+        return at
+
+    def new_session():
+        return run(AppTest.from_file(script, default_timeout=timeout))
+
+    def clear_caches():
+        st.cache_data.clear()
+        figures.CACHE.clear()
+
+    def show(view):
+        session.radio(key="view").set_value(view)
+        run(session)
+
+    session = new_session()
+    cases = [
+        Case("app", "app.first_run", new_session),
+        Case("app", "app.first_run[cold]", new_session, setup=clear_caches),
+    ]
+    for view in session.radio(key="view").options:
+        cases.append(Case("app", f"app.rerun[{view}]", lambda: run(session), setup=lambda view=view: show(view)))
+
+    def edit_factor():
+        # 자동 반영이 켜진 채 콘텐츠 점수를 바꾼 실행이 끝나야 한다 (다시 실행이 반복되면 시간 초과)
+        slider = session.slider(key=f"endo_val_{engine.NODES[0]}_0")
+        slider.set_value(round(slider.value + (0.05 if slider.value <= 0.95 else -0.05), 2))
+        run(session)
+
+    cases.append(Case("app", "app.edit_factor", edit_factor))
+    return cases
+
+
+# ==================== 결과 / 기준선 ====================
+def machine_info():
+    import streamlit
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "streamlit": streamlit.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """기준선에도 있는 항목의 배율 (현재 중앙값 / 기준선 중앙값)"""
+    base = {r["name"]: r for r in baseline.get("results", []) if "median_ms" in r}
+    rows = []
+    for r in results:
+        if "median_ms" not in r or r["name"] not in base:
+            continue
+        ratio = r["median_ms"] / max(base[r["name"]]["median_ms"], 1e-9)
+        rows.append({
+            "name": r["name"],
+            "baseline_ms": base[r["name"]]["median_ms"],
+            "median_ms": r["median_ms"],
+            "ratio": ratio,
+            "regression": bool(ratio > threshold),
+        })
+    return rows
+
+
+def _print_progress(done, total, name):
+    print(f"\r[{done}/{total}] {name:<60}", end="", file=sys.stderr, flush=True)
+    if done == total:
+        print(file=sys.stderr)
+
+
+def _print_report(results, oracle, comparison):
+    ratios = {c["name"]: c for c in comparison}
+    layer = None
+    for r in results:
+        if r["layer"] != layer:
+            layer = r["layer"]
+            print(f"\n## {layer}")
+        if "error" in r:
+            print(f"  ✗ {r['name']:<48} {r['error']}")
+            continue
+        line = f"  {r['name']:<50} {r['median_ms']:>11,.3f} ms  (최소 {r['min_ms']:,.3f} · {r['runs']:,}회)"
+        c = ratios.get(r["name"])
+        if c is not None:
+            line += f"  ×{c['ratio']:.2f}" + (" ⚠️ 회귀" if c["regression"] else "")
+        print(line)
+
+    if oracle:
+        print("\n## oracle")
+        for check in oracle:
+            mark = "✓" if check["ok"] else "✗"
+            print(f"  {mark} {check['name']:<48} 최대 상대오차 {check['max_rel_error']:.2e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DAU Funnel 성능 벤치마크")
+    parser.add_argument("-o", "--out", default="bench_results.json", help="결과 JSON (기본: bench_results.json)")
+    parser.add_argument("--baseline", default=None,
+                        help=f"비교할 기준선 JSON (기본: {DEFAULT_BASELINE.name} 가 있으면 사용)")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준선 파일로도 저장")
+    parser.add_argument("--only", nargs="+", choices=LAYERS, default=None, help="실행할 계층 (기본: 전부)")
+    parser.add_argument("--repeat", type=int, default=None, help="항목별 반복 수 (기본: 7, --quick 이면 3)")
+    parser.add_argument("--quick", action="store_true", help="반복 수를 줄여 빠르게 확인")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="회귀로 볼 배율 (현재 / 기준선 중앙값, 기본: 1.25)")
+    parser.add_argument("--rtol", type=float, default=ORACLE_RTOL,
+                        help=f"기준 구현과의 허용 상대 오차 (기본: {ORACLE_RTOL:g})")
+    parser.add_argument("--scenario", default=str(DEFAULT_SCENARIO), help="기준 시나리오 파일 (기본: app 기본값)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="진행 표시 생략")
+    args = parser.parse_args(argv)
+
+    layers = args.only or LAYERS
+    repeat = args.repeat or (3 if args.quick else 7)
+    baseline_path = Path(args.baseline) if args.baseline else DEFAULT_BASELINE
+    if args.baseline and not args.save_baseline and not baseline_path.exists():
+        parser.error(f"기준선 파일이 없습니다: {baseline_path}")
+
+    start = time.perf_counter()
+    fixture = Fixture.load(args.scenario)
+
+    # AppTest 실행이 사용자의 시나리오 저장소를 건드리지 않도록 임시 DB 를 쓴다
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("DAU_FUNNEL_DB", str(Path(tmp) / "scenarios.db"))
+
+        builders = {"engine": engine_cases, "figures": figure_cases, "styler": styler_cases}
+        cases = [case for layer in LAYERS if layer in builders and layer in layers for case in builders[layer](fixture)]
+        if "app" in layers:
+            cases += app_cases()
+
+        results = []
+        for i, case in enumerate(cases):
+            if not args.quiet:
+                _print_progress(i, len(cases), case.name)
+            entry = {"name": case.name, "layer": case.layer}
+            try:
+                entry.update(measure(case, repeat))
+            except Exception as e:  # 한 항목이 실패해도 나머지는 측정
+                entry["error"] = f"{type(e).__name__}: {e}"
+            results.append(entry)
+        if cases and not args.quiet:
+            _print_progress(len(cases), len(cases), "")
+
+    oracle = oracle_checks(fixture, rtol=args.rtol) if "oracle" in layers else []
+
+    baseline = None
+    comparison = []
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        comparison = compare(results, baseline, args.threshold)
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "settings": {"repeat": repeat, "layers": list(layers), "threshold": args.threshold, "rtol": args.rtol,
+                     "scenario": Path(args.scenario).name},
+        "results": results,
+        "oracle": oracle,
+        "baseline": str(baseline_path) if baseline is not None else None,
+        "comparison": comparison,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    Path(args.out).write_text(text, encoding="utf-8")
+    if args.save_baseline:
+        baseline_path.write_text(text, encoding="utf-8")
+
+    _print_report(results, oracle, comparison)
+
+    errors = [r for r in results if "error" in r]
+    mismatches = [c for c in oracle if not c["ok"]]
+    regressions = [c for c in comparison if c["regression"]]
+    print(f"\n완료 {time.perf_counter() - start:.1f}초 · 항목 {len(results)}개 · → {args.out}", file=sys.stderr)
+    if args.save_baseline:
+        print(f"  기준선 저장 → {baseline_path}", file=sys.stderr)
+    elif baseline is not None:
+        if baseline.get("machine") != report["machine"]:
+            print("  ⚠️ 기준선과 실행 환경이 다릅니다 — 배율은 참고용입니다", file=sys.stderr)
+        print(f"  기준선 비교 {len(comparison)}개 · 회귀 {len(regressions)}개 (×{args.threshold:g} 초과)",
+              file=sys.stderr)
+    if errors:
+        print(f"  ✗ 실패한 항목 {len(errors)}개", file=sys.stderr)
+    if mismatches:
+        print(f"  ✗ 기준 구현과 다른 결과 {len(mismatches)}개 (허용 오차 {args.rtol:g})", file=sys.stderr)
+    return 1 if errors or mismatches or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""과거 데이터 보정
+
+경기별·노드별 실제 개수 (총활성, 성공수, 이탈수, 복귀수, 부활수 — df 와 같은 열 이름) 로
+노드별 성공률, 복귀/부활 비중, 리스크 전환율을 맞춘다.
+
+모델에서 경기 m 의 노드 i 는
+    성공수 ~ 이항(총활성, 성공률_i)
+    복귀수 ≈ 복귀비중_i × (dau + (1 - dau) wau) × 경기 m-1 이탈 합계
+    부활수 ≈ 부활비중_i × (1 - dau)(1 - wau) dead × 경기 m-1 이탈 합계
+이므로 모든 경기의 잔차를 (경기, 노드) 배열 한 번으로 계산하고, 개수의 분산으로 나눈
+(Pearson) 잔차 제곱합을 [0, 1] 구간 안에서 최소화한다 (투영 Levenberg–Marquardt).
+
+복귀/부활 개수만으로는 비중과 전환율의 곱만 정해지므로 (예: 복귀비중 ×2, React 전환 ÷2)
+현재 사이드바 값에서 멀어지는 만큼 작은 벌점(prior_weight)을 더해 정해지지 않는 방향은
+현재 값에 머물게 한다.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import engine
+import montecarlo
+
+# 업로드 표 열 (이탈수는 없으면 총활성 - 성공수)
+HISTORY_COLUMNS = ("경기", "노드", "총활성", "성공수", "이탈수", "복귀수", "부활수")
+
+# 파라미터 벡터 순서: 성공률 5, 복귀비중 5, 부활비중 5, 리스크 전환율 3
+PARAM_GROUPS = (
+    ("success_rate", engine.NODES),
+    ("re_weight", engine.NODES),
+    ("sur_weight", engine.NODES),
+    ("risk_conversion", engine.RISK_STAGES),
+)
+
+# 최적화 설정
+MAX_ITER = 200
+TOL = 1e-10
+PRIOR_WEIGHT = 1.0
+
+
+@dataclass(frozen=True, eq=False)
+class History:
+    """(경기, 노드) 개수 배열"""
+    matches: list
+    total: np.ndarray
+    success: np.ndarray
+    churn: np.ndarray
+    returned: np.ndarray
+    revived: np.ndarray
+
+    @classmethod
+    def from_table(cls, table):
+        """HISTORY_COLUMNS 표 → History (경기 순서는 표에 처음 나온 순서). 잘못된 값은 ValueError"""
+        required = [c for c in HISTORY_COLUMNS if c != "이탈수"]
+        missing = [c for c in required if c not in table.columns]
+        if missing:
+            raise ValueError(f"과거 데이터에 열이 없습니다: {', '.join(missing)}")
+        unknown = sorted(set(table["노드"].astype(str)) - set(engine.NODES))
+        if unknown:
+            raise ValueError(f"알 수 없는 노드: {', '.join(unknown)}")
+        table = table.copy()
+        if "이탈수" not in table.columns:
+            table["이탈수"] = pd.to_numeric(table["총활성"], errors="coerce") - pd.to_numeric(table["성공수"], errors="coerce")
+        count_cols = list(HISTORY_COLUMNS[2:])
+        numbers = table[count_cols].apply(pd.to_numeric, errors="coerce")
+        if numbers.isna().any().any():
+            raise ValueError("개수 열에 숫자가 아닌 값이 있습니다")
+        if (numbers < 0).any().any():
+            raise ValueError("개수는 0 이상이어야 합니다")
+        if (numbers["성공수"] > numbers["총활성"]).any():
+            raise ValueError("성공수가 총활성보다 큰 행이 있습니다")
+
+        matches = list(dict.fromkeys(table["경기"].astype(str)))
+        if len(matches) < 2:
+            raise ValueError("경기가 2개 이상 있어야 복귀/부활을 맞출 수 있습니다")
+        row = pd.Categorical(table["경기"].astype(str), categories=matches).codes
+        col = pd.Categorical(table["노드"].astype(str), categories=engine.NODES).codes
+        arrays = {}
+        for name, source in zip(("total", "success", "churn", "returned", "revived"), count_cols):
+            grid = np.zeros((len(matches), len(engine.NODES)))
+            np.add.at(grid, (row, col), numbers[source].to_numpy(dtype=float))
+            arrays[name] = grid
+        return cls(matches=matches, **arrays)
+
+    def to_table(self):
+        return pd.DataFrame({
+            "경기": np.repeat(self.matches, len(engine.NODES)),
+            "노드": np.tile(engine.NODES, len(self.matches)),
+            "총활성": self.total.ravel(),
+            "성공수": self.success.ravel(),
+            "이탈수": self.churn.ravel(),
+            "복귀수": self.returned.ravel(),
+            "부활수": self.revived.ravel(),
+        })
+
+
+@dataclass(frozen=True, eq=False)
+class Calibration:
+    """보정 결과 (값은 {노드/단계: 값} dict)"""
+    success_rate: dict
+    re_weight: dict
+    sur_weight: dict
+    risk_conversion: dict
+    cost: float
+    initial_cost: float
+    iterations: int
+    converged: bool
+    elapsed: float
+    fit: pd.DataFrame  # 항목별 관측 합계 / 예측 합계 / R²
+
+    def params_table(self, current):
+        """보정값과 현재 값 비교 표 (current: 같은 키의 dict 묶음)"""
+        rows = []
+        for group, keys in PARAM_GROUPS:
+            for key in keys:
+                rows.append((group, key, current[group][key], getattr(self, group)[key]))
+        table = pd.DataFrame(rows, columns=["항목", "노드/단계", "현재", "보정"])
+        table["차이"] = table["보정"] - table["현재"]
+        return table
+
+
+# ==================== 잔차 ====================
+def pack(success_rate, re_weight, sur_weight, risk_conversion):
+    """dict 묶음 → 파라미터 벡터 (PARAM_GROUPS 순서)"""
+    groups = dict(success_rate=success_rate, re_weight=re_weight, sur_weight=sur_weight, risk_conversion=risk_conversion)
+    return np.array([float(groups[g][k]) for g, keys in PARAM_GROUPS for k in keys])
+
+
+def unpack(theta):
+    out, i = {}, 0
+    for group, keys in PARAM_GROUPS:
+        out[group] = {k: float(v) for k, v in zip(keys, theta[i:i + len(keys)])}
+        i += len(keys)
+    return out
+
+
+def predict(theta, history):
+    """파라미터 벡터 (..., 18) → 예측 (성공수, 복귀수, 부활수). 복귀/부활은 두 번째 경기부터 (..., 경기-1, 노드)"""
+    n = len(engine.NODES)
+    s, re, sur = theta[..., :n], theta[..., n:2 * n], theta[..., 2 * n:3 * n]
+    dau, wau, dead = theta[..., 3 * n], theta[..., 3 * n + 1], theta[..., 3 * n + 2]
+    to_react = (dau + (1 - dau) * wau)[..., None, None]
+    to_sur = ((1 - dau) * (1 - wau) * dead)[..., None, None]
+    prev_lost = history.churn.sum(1)[:-1, None]
+    success = s[..., None, :] * history.total
+    returned = re[..., None, :] * to_react * prev_lost
+    revived = sur[..., None, :] * to_sur * prev_lost
+    return success, returned, revived
+
+
+def residuals(theta, history, prior, prior_weight=PRIOR_WEIGHT):
+    """Pearson 잔차 벡터 (..., 관측 수 + 파라미터 수) — 모든 경기를 한 번에"""
+    success, returned, revived = predict(theta, history)
+    parts = [
+        (history.success - success) / np.sqrt(np.maximum(history.total, 1.0)),
+        (history.returned[1:] - returned) / np.sqrt(np.maximum(history.returned[1:], 1.0)),
+        (history.revived[1:] - revived) / np.sqrt(np.maximum(history.revived[1:], 1.0)),
+    ]
+    batch = theta.shape[:-1]
+    flat = [p.reshape(batch + (-1,)) for p in parts]
+    flat.append(np.sqrt(prior_weight) * (theta - prior))
+    return np.concatenate(flat, -1)
+
+
+def _jacobian(theta, history, prior, prior_weight, h=1e-6):
+    # 파라미터별 ± 섭동을 배치 축으로 쌓아 잔차를 한 번에 계산한다 (중앙차분)
+    eye = np.eye(len(theta)) * h
+    r = residuals(np.concatenate([theta + eye, theta - eye]), history, prior, prior_weight)
+    plus, minus = np.split(r, 2)
+    return ((plus - minus) / (2 * h)).T
+
+
+# ==================== 보정 ====================
+def fit(history, current, prior_weight=PRIOR_WEIGHT, max_iter=MAX_ITER):
+    """과거 데이터로 파라미터를 맞춘다 (current: 현재 값 dict 묶음, 시작점이자 prior)"""
+    start = time.perf_counter()
+    prior = pack(**current)
+    theta = prior.copy()
+    r = residuals(theta, history, prior, prior_weight)
+    cost = initial_cost = float(r @ r)
+    mu = 1e-3
+    converged = False
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        J = _jacobian(theta, history, prior, prior_weight)
+        JtJ = J.T @ J
+        grad = J.T @ r
+        while True:
+            step = np.linalg.solve(JtJ + mu * np.diag(np.maximum(np.diag(JtJ), 1e-12)), -grad)
+            candidate = np.clip(theta + step, 0.0, 1.0)
+            r_new = residuals(candidate, history, prior, prior_weight)
+            new_cost = float(r_new @ r_new)
+            if new_cost <= cost:
+                mu = max(mu / 3, 1e-12)
+                break
+            mu *= 4
+            if mu > 1e12:
+                break
+        if new_cost > cost:
+            converged = True  # 더 내려갈 방향이 없다
+            break
+        improvement = cost - new_cost
+        theta, r, cost = candidate, r_new, new_cost
+        if improvement <= TOL * max(cost, 1.0):
+            converged = True
+            break
+
+    params = unpack(theta)
+    return Calibration(
+        **params,
+        cost=cost,
+        initial_cost=initial_cost,
+        iterations=iterations,
+        converged=converged,
+        elapsed=time.perf_counter() - start,
+        fit=fit_summary(theta, history),
+    )
+
+
+def fit_summary(theta, history):
+    """항목별 관측 합계 / 예측 합계 / (경기, 노드) 단위 R²"""
+    predicted = predict(theta, history)
+    observed = (history.success, history.returned[1:], history.revived[1:])
+    rows = []
+    for label, obs, pred in zip(("성공수", "복귀수", "부활수"), observed, predicted):
+        ss_res = float(((obs - pred) ** 2).sum())
+        ss_tot = float(((obs - obs.mean()) ** 2).sum())
+        rows.append((label, obs.sum(), pred.sum(), 1 - ss_res / ss_tot if ss_tot > 0 else np.nan))
+    return pd.DataFrame(rows, columns=["항목", "관측 합계", "예측 합계", "R²"])
+
+
+# ==================== 사이드바 반영 ====================
+def factor_values_for_rates(endo_factors, success_rate, exo_ratio):
+    """노드별 성공률이 되도록 콘텐츠 점수를 옮긴다 → ({(노드, 콘텐츠): 점수}, 맞출 수 없는 노드)
+
+    내재 점수를 낮출 때는 모든 점수에 같은 비율을 곱하고, 높일 때는 각 점수를 1 쪽으로 같은
+    비율만큼 옮긴다 (가중평균이 정확히 목표가 되고 점수는 [0, 1] 에 머문다).
+    외생 비율 때문에 목표 성공률이 1 - 외생 비율을 넘으면 최대치로 두고 노드를 돌려준다.
+    """
+    values, unreachable = {}, []
+    endo_ratio = 1.0 - float(exo_ratio)
+    for node in engine.NODES:
+        factors = endo_factors.get(node, {})
+        current, total_weight = engine.endo_score(factors)
+        if total_weight <= 0:
+            unreachable.append(node)
+            continue
+        target = success_rate[node] / endo_ratio if endo_ratio > 0 else 1.0
+        if target > 1.0 + 1e-9:
+            unreachable.append(node)
+        target = min(target, 1.0)
+        for name, data in factors.items():
+            v = data["value"]
+            if target <= current:
+                values[(node, name)] = v * target / current if current > 0 else 0.0
+            else:
+                values[(node, name)] = v + (1 - v) * (target - current) / (1 - current)
+    return values, unreachable
+
+
+# ==================== 예시 데이터 ====================
+def synthetic_history(params, num_matches, seed=0):
+    """ForecastParams 로 정수 과거 데이터를 만든다 (보정 확인·CSV 양식 예시용)"""
+    funnel = params.funnel
+    counts = np.zeros((1, num_matches, len(engine.NODES), len(montecarlo.NODE_COUNT_COLUMNS)), dtype=np.int64)
+    montecarlo.simulate_binomial(
+        np.random.default_rng(seed), funnel.success_rate, funnel.re_weight, funnel.sur_weight,
+        funnel.risk_conversion, params.new_user_weight, params.cycle_new_users, params.initial_users,
+        num_matches, size=1, node_counts=counts,
+    )
+    counts = counts[0]
+    return History(
+        matches=[f"{m}R" for m in range(1, num_matches + 1)],
+        **dict(zip(("total", "success", "churn", "returned", "revived"), np.moveaxis(counts, -1, 0).astype(float))),
+    )
@@ -0,0 +1,623 @@
+"""DAU Funnel 계산 엔진
+
+app.py 에서 쓰는 모델 수식(성공률 → 노드 흐름 → 리스크 파이프라인 → 사이클 예측)을
+Streamlit 없이 import 해서 쓸 수 있도록 순수 함수로 분리한 모듈.
+입력은 불변(frozen) 파라미터 객체이고, 같은 파라미터는 같은 `key` 를 가지므로
+app.py 에서는 이 key 로 결과를 캐시한다.
+"""
+import hashlib
+from dataclasses import astuple, dataclass, is_dataclass
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+# 노드 목록 (경기 진행 순서)
+NODES = ("경기전", "전반전", "하프타임", "후반전", "경기직후")
+
+# 리스크 단계 (At Risk DAU → At Risk WAU → Dead Users)
+RISK_STAGES = ("at_risk_dau", "at_risk_wau", "dead_users")
+RISK_STAGE_LABELS = ("At Risk DAU", "At Risk WAU", "Dead Users")
+
+# 기존 순환 참조 근사 반복 횟수 (해석해와의 오차 보고용)
+POOL_ITERATIONS = 10
+
+# 상태 벡터 (경기직후 성공 → 다음 경기전 이전유지, React Pool, Sur Pool)
+STATE_LABELS = ("활성 유저", "React Pool", "Sur Pool")
+
+# 예측 배열의 마지막 축 순서 (sim_df 컬럼과 동일)
+FORECAST_COLUMNS = ("활성 유저", "React Pool", "Sur Pool", "총 유저", "이탈 (Dead)")
+
+# 정상상태 배치 결과의 마지막 축 순서 (총활성/성공수/이탈수는 노드 합계)
+STEADY_COLUMNS = ("이전유지", "React Pool", "Sur Pool", "총활성", "성공수", "이탈수")
+
+# 콘텐츠 표 열 (노드, 콘텐츠, 점수, 가중치)
+FACTOR_COLUMNS = ("노드", "콘텐츠", "점수", "가중치")
+
+
+# ==================== 성공률 ====================
+def endo_score(factors):
+    """내재변수 {이름: {"value", "weight"}} → (내재 점수, 가중치 합계)"""
+    weighted_sum = 0
+    total_weight = 0
+    for data in factors.values():
+        weighted_sum += data["value"] * data["weight"]
+        total_weight += data["weight"]
+    return weighted_sum / max(total_weight, 0.01), total_weight
+
+
+def node_success_rate(endo, exo_ratio, exo=0.0):
+    """외생/내재 점수를 비율대로 섞어 [0, 1] 성공률로 만든다 (외생은 0점 처리)"""
+    final_score = (exo * exo_ratio) + (endo * (1.0 - exo_ratio))
+    return min(1.0, max(0.0, final_score))
+
+
+def success_rates_batch(values, weights, node_index, exo_ratio, n_nodes=len(NODES)):
+    """콘텐츠별 점수/가중치 배열에서 모든 노드의 성공률을 한 번에 계산한다
+
+    values, weights: (..., 콘텐츠 수), node_index: 콘텐츠가 속한 노드 번호 (콘텐츠 수,),
+    exo_ratio: (...). 반환: (..., n_nodes). endo_score + node_success_rate 와 같은 수식.
+    """
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    onehot = np.eye(n_nodes)[np.asarray(node_index, dtype=int)]
+    weighted_sum = (values * weights) @ onehot
+    total_weight = weights @ onehot
+    endo = weighted_sum / np.maximum(total_weight, 0.01)
+    endo_ratio = 1.0 - np.asarray(exo_ratio, dtype=float)[..., None]
+    return np.clip(endo * endo_ratio, 0.0, 1.0)
+
+
+def split_new_users_batch(total_new_users, new_user_weight, floor=True):
+    """split_new_users 의 배열 버전 (..., 노드)
+
+    floor=False 면 정수로 자르지 않는다 (미분처럼 작은 변화에 매끄러운 값이 필요할 때).
+    """
+    weight = np.asarray(new_user_weight, dtype=float)
+    total_weight = weight.sum(-1, keepdims=True)
+    share = np.divide(weight, total_weight, out=np.zeros_like(weight), where=total_weight > 0)
+    new_users = np.asarray(total_new_users, dtype=float)[..., None] * share
+    return np.floor(new_users) if floor else new_users
+
+
+def split_new_users(total_new_users, new_user_weight):
+    """총 신규 유저를 노드별 비중으로 나눈다 (사이드바 표시와 같은 정수 절사)"""
+    total_weight = sum(new_user_weight.values())
+    return {
+        node: int(total_new_users * (weight / total_weight)) if total_weight > 0 else 0
+        for node, weight in new_user_weight.items()
+    }
+
+
+# ==================== 콘텐츠 표 ====================
+def factor_table(endo_factors):
+    """{노드: {콘텐츠: {"value", "weight"}}} → FACTOR_COLUMNS 열 표 (노드 순서는 NODES)"""
+    rows = [
+        (node, name, float(data["value"]), float(data["weight"]))
+        for node in NODES
+        for name, data in endo_factors.get(node, {}).items()
+    ]
+    return pd.DataFrame(rows, columns=list(FACTOR_COLUMNS))
+
+
+def factors_from_table(table):
+    """factor_table 의 역변환
+
+    이름이 빈 행은 버리고 점수/가중치는 [0, 1] 로 자른다. 같은 노드·콘텐츠가 여러 번
+    나오면 마지막 행을 쓴다. 알 수 없는 노드나 숫자가 아닌 값은 ValueError.
+    """
+    missing = [c for c in FACTOR_COLUMNS if c not in table.columns]
+    if missing:
+        raise ValueError(f"콘텐츠 표에 열이 없습니다: {', '.join(missing)}")
+    table = table.loc[:, list(FACTOR_COLUMNS)].copy()
+    table["콘텐츠"] = table["콘텐츠"].fillna("").astype(str).str.strip()
+    table = table[table["콘텐츠"] != ""]
+    unknown = sorted(set(table["노드"].astype(str)) - set(NODES))
+    if unknown:
+        raise ValueError(f"알 수 없는 노드: {', '.join(unknown)}")
+    numbers = table[["점수", "가중치"]].apply(pd.to_numeric, errors="coerce")
+    if numbers.isna().any().any():
+        raise ValueError("점수/가중치에 숫자가 아닌 값이 있습니다")
+    numbers = numbers.clip(0.0, 1.0)
+
+    factors = {node: {} for node in NODES}
+    for node, name, value, weight in zip(table["노드"], table["콘텐츠"], numbers["점수"], numbers["가중치"]):
+        factors[node][name] = {"value": float(value), "weight": float(weight)}
+    return factors
+
+
+def node_scores(table, exo_ratio):
+    """콘텐츠 표 전체에서 노드별 내재 점수 / 가중치 합계 / 성공률을 한 번에 계산한다
+
+    endo_score + node_success_rate 와 같은 수식. 반환: (NODES 순서) 배열 세 개.
+    """
+    node_index = pd.Categorical(table["노드"], categories=NODES).codes
+    values = table["점수"].to_numpy(dtype=float)
+    weights = table["가중치"].to_numpy(dtype=float)
+    weighted_sum = np.bincount(node_index, weights=values * weights, minlength=len(NODES))
+    total_weight = np.bincount(node_index, weights=weights, minlength=len(NODES))
+    endo = weighted_sum / np.maximum(total_weight, 0.01)
+    return endo, total_weight, np.clip(endo * (1.0 - exo_ratio), 0.0, 1.0)
+
+
+# ==================== 파라미터 ====================
+def digest(obj):
+    """파라미터 객체(데이터클래스 또는 튜플)의 안정적인 해시 문자열"""
+    if is_dataclass(obj):
+        obj = astuple(obj)
+    return hashlib.sha1(repr(obj).encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class FunnelParams:
+    """노드 흐름 파라미터 (모든 노드별 값은 NODES 순서의 튜플, 그래프는 graph.nodes 순서)"""
+    success_rate: tuple
+    new_users: tuple
+    re_weight: tuple
+    sur_weight: tuple
+    risk_conversion: tuple  # RISK_STAGES 순서
+
+    @classmethod
+    def from_dicts(cls, success_rate, new_users, re_weight, sur_weight, risk_conversion, nodes=NODES):
+        return cls(
+            success_rate=tuple(float(success_rate[n]) for n in nodes),
+            new_users=tuple(new_users[n] for n in nodes),
+            re_weight=tuple(float(re_weight[n]) for n in nodes),
+            sur_weight=tuple(float(sur_weight[n]) for n in nodes),
+            risk_conversion=tuple(float(risk_conversion[s]) for s in RISK_STAGES),
+        )
+
+    @cached_property
+    def key(self):
+        return digest(self)
+
+
+@dataclass(frozen=True)
+class ForecastParams:
+    """사이클 예측 파라미터"""
+    funnel: FunnelParams
+    num_cycles: int
+    initial_users: float
+    cycle_new_users: float
+    new_user_weight: tuple
+
+    @classmethod
+    def from_dicts(cls, funnel, num_cycles, initial_users, cycle_new_users, new_user_weight, nodes=NODES):
+        return cls(
+            funnel=funnel,
+            num_cycles=int(num_cycles),
+            initial_users=initial_users,
+            cycle_new_users=cycle_new_users,
+            new_user_weight=tuple(float(new_user_weight[n]) for n in nodes),
+        )
+
+    @cached_property
+    def key(self):
+        return digest(self)
+
+
+# ==================== 결과 ====================
+@dataclass(frozen=True)
+class RiskPipeline:
+    """리스크 파이프라인 단계별 인원/성공/손실"""
+    conversion: tuple
+    at_risk_dau_pool: float
+    at_risk_dau_success: float
+    at_risk_dau_loss: float
+    at_risk_wau_pool: float
+    at_risk_wau_success: float
+    at_risk_wau_loss: float
+    dead_users_pool: float
+    dead_users_success: float
+    dead_users_loss: float
+
+    @property
+    def react_pool(self):
+        return self.at_risk_dau_success + self.at_risk_wau_success
+
+    @property
+    def sur_pool(self):
+        return self.dead_users_success
+
+    def to_frame(self):
+        pools = (self.at_risk_dau_pool, self.at_risk_wau_pool, self.dead_users_pool)
+        successes = (self.at_risk_dau_success, self.at_risk_wau_success, self.dead_users_success)
+        losses = (self.at_risk_dau_loss, self.at_risk_wau_loss, self.dead_users_loss)
+        return pd.DataFrame([
+            {
+                "단계": label,
+                "인원": pool,
+                "전환율": rate,
+                "성공수": success,
+                "손실율": 1 - rate,
+                "손실수": loss,
+            }
+            for label, rate, pool, success, loss
+            in zip(RISK_STAGE_LABELS, self.conversion, pools, successes, losses)
+        ])
+
+
+@dataclass(frozen=True, eq=False)
+class SteadyState:
+    """한 경기 사이클의 노드별 결과 (df) 와 리스크 파이프라인
+
+    exact 가 False 면 정상상태가 존재하지 않아(Pool 이 발산) 기존 반복 근사값이다.
+    iteration_gap 은 기존 POOL_ITERATIONS 회 반복 근사값과 해석해의 차이
+    (STATE_LABELS 순서, 절대값) 이다.
+    """
+    table: pd.DataFrame
+    risk: RiskPipeline
+    react_pool: float
+    sur_pool: float
+    exact: bool = True
+    iteration_gap: tuple = (0.0, 0.0, 0.0)
+
+
+@dataclass(frozen=True, eq=False)
+class Forecast:
+    """사이클별 예측 결과 (sim_df)"""
+    table: pd.DataFrame
+
+
+# ==================== 계산 ====================
+def risk_pipeline(total_at_risk, risk_conversion):
+    """노드 이탈 합계를 At Risk DAU → WAU → Dead 순으로 흘려보낸다"""
+    dau_rate, wau_rate, dead_rate = risk_conversion
+
+    # at risk DAU
+    at_risk_dau_pool = total_at_risk
+    at_risk_dau_success = at_risk_dau_pool * dau_rate
+    at_risk_dau_loss = at_risk_dau_pool * (1 - dau_rate)
+
+    # at risk WAU
+    at_risk_wau_pool = at_risk_dau_loss
+    at_risk_wau_success = at_risk_wau_pool * wau_rate
+    at_risk_wau_loss = at_risk_wau_pool * (1 - wau_rate)
+
+    # Dead Users
+    dead_users_pool = at_risk_wau_loss
+    dead_users_success = dead_users_pool * dead_rate
+    dead_users_loss = dead_users_pool * (1 - dead_rate)
+
+    return RiskPipeline(
+        conversion=tuple(risk_conversion),
+        at_risk_dau_pool=at_risk_dau_pool,
+        at_risk_dau_success=at_risk_dau_success,
+        at_risk_dau_loss=at_risk_dau_loss,
+        at_risk_wau_pool=at_risk_wau_pool,
+        at_risk_wau_success=at_risk_wau_success,
+        at_risk_wau_loss=at_risk_wau_loss,
+        dead_users_pool=dead_users_pool,
+        dead_users_success=dead_users_success,
+        dead_users_loss=dead_users_loss,
+    )
+
+
+def node_rows(params, retained, react_pool, sur_pool):
+    """이전유지(경기전 입력)와 Pool 크기로 한 사이클의 노드별 행을 만든다"""
+    results = []
+    for i, node in enumerate(NODES):
+        if i > 0:
+            retained = results[i - 1]["성공수"]
+
+        new = params.new_users[i]
+        react_qty = react_pool * params.re_weight[i]
+        resur_qty = sur_pool * params.sur_weight[i]
+
+        total = retained + new + react_qty + resur_qty
+        curr = params.success_rate[i]
+        churn = 1 - curr
+
+        results.append({
+            "노드": node,
+            "이전유지": retained,
+            "신규": new,
+            "복귀비중": params.re_weight[i],
+            "복귀수": react_qty,
+            "부활비중": params.sur_weight[i],
+            "부활수": resur_qty,
+            "총활성": total,
+            "성공률": curr,
+            "이탈률": churn,
+            "성공수": total * curr,
+            "이탈수": total * churn,
+        })
+    return results
+
+
+def survival(success_rate):
+    """노드 i 에 들어온 유저가 경기직후까지 모두 성공할 확률 (뒤에서부터 누적곱)"""
+    rates = np.asarray(success_rate, dtype=float)
+    return np.flip(np.cumprod(np.flip(rates, -1), -1), -1)
+
+
+def throughput(success_rate):
+    """노드 i 에 들어온 1명이 경기직후까지 거치는 노드 수 기대값 (총활성 기여)"""
+    rates = np.asarray(success_rate, dtype=float)
+    h = np.ones_like(rates)
+    for i in range(rates.shape[-1] - 2, -1, -1):
+        h[..., i] = 1.0 + rates[..., i] * h[..., i + 1]
+    return h
+
+
+def cycle_operator(success_rate, re_weight, sur_weight, risk_conversion, inflow):
+    """한 사이클을 상태 벡터 z = (활성, React, Sur) 에 대한 선형 사상 z' = M z + b 로 쓴다
+
+    노드 i 에 들어온 u 명은 경기직후까지 u * g_i 명이 성공하고 나머지 u * (1 - g_i) 명이
+    이탈하므로 (g = survival), 다음 활성 = g · 입력, 이탈 합계 = (1 - g) · 입력 이고
+    Pool 과 완전 이탈(Dead 손실)은 이탈 합계의 고정 비율이다. 모든 인자는 마지막 축이
+    노드(또는 리스크 단계)인 배열이며 앞쪽 축은 시나리오 배치로 그대로 브로드캐스트된다.
+    반환: M (..., 3, 3), b (..., 3), 완전 이탈 = dead_row · z + dead_b
+    """
+    g = survival(success_rate)
+    return operator_from_survival(g, g[..., 0], re_weight, sur_weight, risk_conversion, inflow)
+
+
+def operator_from_survival(g, retained_g, re_weight, sur_weight, risk_conversion, inflow):
+    """노드별 생존 확률 g 로 cycle_operator 의 (M, b, dead_row, dead_b) 를 만든다
+
+    retained_g 는 이전유지(지난 사이클 성공) 1명의 생존 확률. 선형 체인은 g[..., 0] 이고
+    graph.FunnelGraph 는 진입 비중으로 섞은 값을 넘긴다.
+    """
+    g = np.asarray(g, dtype=float)
+    retained_g = np.asarray(retained_g, dtype=float)
+    re_weight = np.asarray(re_weight, dtype=float)
+    sur_weight = np.asarray(sur_weight, dtype=float)
+    inflow = np.asarray(inflow, dtype=float)
+    risk_conversion = np.asarray(risk_conversion, dtype=float)
+
+    # 인자마다 배치 축이 다를 수 있으므로 (예: 성공률 1개 × 비중 여러 개) 공통 모양으로 맞춘다
+    batch = np.broadcast_shapes(
+        g.shape[:-1], retained_g.shape, re_weight.shape[:-1], sur_weight.shape[:-1],
+        inflow.shape[:-1], risk_conversion.shape[:-1],
+    )
+    g = np.broadcast_to(g, batch + g.shape[-1:])
+    retained_g = np.broadcast_to(retained_g, batch)
+    lost = 1.0 - g
+    re_weight = np.broadcast_to(re_weight, batch + re_weight.shape[-1:])
+    sur_weight = np.broadcast_to(sur_weight, batch + sur_weight.shape[-1:])
+    inflow = np.broadcast_to(inflow, batch + inflow.shape[-1:])
+    risk_conversion = np.broadcast_to(risk_conversion, batch + risk_conversion.shape[-1:])
+
+    dau, wau, dead = risk_conversion[..., 0], risk_conversion[..., 1], risk_conversion[..., 2]
+    to_react = dau + (1 - dau) * wau
+    to_sur = (1 - dau) * (1 - wau) * dead
+    to_dead = (1 - dau) * (1 - wau) * (1 - dead)
+
+    # 경기전 이전유지, React Pool, Sur Pool 각각 1명이 만드는 (성공, 이탈)
+    succ_row = np.stack([
+        retained_g,
+        (g * re_weight).sum(-1),
+        (g * sur_weight).sum(-1),
+    ], -1)
+    lost_row = np.stack([
+        1.0 - retained_g,
+        (lost * re_weight).sum(-1),
+        (lost * sur_weight).sum(-1),
+    ], -1)
+
+    M = np.stack([
+        succ_row,
+        to_react[..., None] * lost_row,
+        to_sur[..., None] * lost_row,
+    ], -2)
+    lost_new = (lost * inflow).sum(-1)
+    b = np.stack([(g * inflow).sum(-1), to_react * lost_new, to_sur * lost_new], -1)
+    return M, b, to_dead[..., None] * lost_row, to_dead * lost_new
+
+
+def pool_system(success_rate, re_weight, sur_weight, risk_conversion, inflow):
+    """cycle_operator 의 (M, b) 만 돌려준다"""
+    M, b, _, _ = cycle_operator(success_rate, re_weight, sur_weight, risk_conversion, inflow)
+    return M, b
+
+
+def solve_steady_state(params):
+    """순환 참조(경기직후 → 경기전, Pool → 노드)를 3×3 선형 방정식으로 한 번에 푼다"""
+    M, b = pool_system(
+        params.success_rate, params.re_weight, params.sur_weight,
+        params.risk_conversion, params.new_users,
+    )
+
+    # 스펙트럼 반경이 1 이상이면 고정점이 없다 (Pool 이 무한히 커짐)
+    if _spectral_radius(M) >= 1.0 - 1e-12:
+        return solve_steady_state_iterative(params)
+
+    z = np.linalg.solve(np.eye(3) - M, b)
+    retained, react_pool, sur_pool = (float(v) for v in z)
+
+    results = node_rows(params, retained, react_pool, sur_pool)
+    risk = risk_pipeline(sum(r["이탈수"] for r in results), params.risk_conversion)
+
+    # z_0 = 0 에서 시작한 k 회 반복은 z_k = z - M^k z 이므로 오차는 |M^k z|
+    gap = np.abs(np.linalg.matrix_power(M, POOL_ITERATIONS) @ z)
+
+    return SteadyState(
+        table=pd.DataFrame(results),
+        risk=risk,
+        react_pool=risk.react_pool,
+        sur_pool=risk.sur_pool,
+        iteration_gap=tuple(float(v) for v in gap),
+    )
+
+
+def _spectral_radius(M):
+    return np.max(np.abs(np.linalg.eigvals(M)), -1)
+
+
+def steady_state_batch(success_rate, re_weight, sur_weight, risk_conversion, inflow):
+    """여러 시나리오의 정상상태 요약을 한 번에 푼다
+
+    반환: (..., len(STEADY_COLUMNS)) 배열. 정상상태가 없는 시나리오는 inf.
+    """
+    M, b = pool_system(success_rate, re_weight, sur_weight, risk_conversion, inflow)
+    batch = np.broadcast_shapes(M.shape[:-2], b.shape[:-1])
+    M = np.broadcast_to(M, batch + (3, 3))
+    b = np.broadcast_to(b, batch + (3,))
+
+    stable = _spectral_radius(M) < 1.0 - 1e-12
+    I_minus_M = np.where(stable[..., None, None], np.eye(3) - M, np.eye(3))
+    z = np.linalg.solve(I_minus_M, b[..., None])[..., 0]
+
+    # 노드별 입력 = 신규 + 복귀 + 부활 (+ 경기전 이전유지)
+    node_in = (
+        np.asarray(inflow, dtype=float)
+        + z[..., 1:2] * np.asarray(re_weight, dtype=float)
+        + z[..., 2:3] * np.asarray(sur_weight, dtype=float)
+    )
+    node_in[..., 0] += z[..., 0]
+    total = (throughput(success_rate) * node_in).sum(-1)
+    lost = ((1.0 - survival(success_rate)) * node_in).sum(-1)
+
+    out = np.empty(batch + (len(STEADY_COLUMNS),))
+    out[..., :3] = z
+    out[..., 3] = total
+    out[..., 4] = total - lost
+    out[..., 5] = lost
+    out[~stable] = np.inf
+    return out
+
+
+def solve_steady_state_iterative(params, iterations=POOL_ITERATIONS):
+    """React/Sur Pool 순환 참조를 반복 계산으로 근사한다 (기존 방식)"""
+    react_pool = 0
+    sur_pool = 0
+    retained = 0  # 첫 반복은 경기직후 성공 = 0 으로 시작
+
+    for _ in range(iterations):
+        results = node_rows(params, retained, react_pool, sur_pool)
+        # 경기전은 경기직후의 성공수를 이전유지로 받음 (순환)
+        retained = results[-1]["성공수"]
+
+        risk = risk_pipeline(sum(r["이탈수"] for r in results), params.risk_conversion)
+        react_pool = risk.react_pool
+        sur_pool = risk.sur_pool
+
+    return SteadyState(
+        table=pd.DataFrame(results),
+        risk=risk,
+        react_pool=react_pool,
+        sur_pool=sur_pool,
+        exact=False,
+    )
+
+
+def forecast_inflow(new_user_weight, cycle_new_users):
+    """사이클당 신규 유저를 노드별 비중으로 나눈다 (비중 합계 하한 0.01, 소수 유지)"""
+    weight = np.asarray(new_user_weight, dtype=float)
+    total_weight = np.maximum(weight.sum(-1, keepdims=True), 0.01)
+    return np.asarray(cycle_new_users, dtype=float)[..., None] * weight / total_weight
+
+
+def stack_forecast_params(params_list):
+    """ForecastParams 리스트를 simulate_batch / forecast_at 인자 배열로 쌓는다"""
+    return dict(
+        success_rate=np.array([p.funnel.success_rate for p in params_list], dtype=float),
+        re_weight=np.array([p.funnel.re_weight for p in params_list], dtype=float),
+        sur_weight=np.array([p.funnel.sur_weight for p in params_list], dtype=float),
+        risk_conversion=np.array([p.funnel.risk_conversion for p in params_list], dtype=float),
+        new_user_weight=np.array([p.new_user_weight for p in params_list], dtype=float),
+        cycle_new_users=np.array([p.cycle_new_users for p in params_list], dtype=float),
+        initial_users=np.array([p.initial_users for p in params_list], dtype=float),
+    )
+
+
+def _forecast_operator(success_rate, re_weight, sur_weight, risk_conversion,
+                       new_user_weight, cycle_new_users, initial_users):
+    inflow = forecast_inflow(new_user_weight, cycle_new_users)
+    M, b, dead_row, dead_b = cycle_operator(success_rate, re_weight, sur_weight, risk_conversion, inflow)
+    initial_users = np.asarray(initial_users, dtype=float)
+    z0 = np.zeros(np.broadcast_shapes(b.shape, initial_users.shape + (3,)))
+    z0[..., 0] = initial_users
+    return M, b, dead_row, dead_b, z0
+
+
+def simulate_batch(success_rate, re_weight, sur_weight, risk_conversion,
+                   new_user_weight, cycle_new_users, initial_users, num_cycles):
+    """여러 시나리오의 사이클 예측을 한 번에 계산한다
+
+    인자는 stack_forecast_params 와 같은 배열 (앞쪽 축 = 시나리오, 단일 시나리오면 1차원).
+    반환: (..., num_cycles, len(FORECAST_COLUMNS)) 배열. [..., t, :] 가 sim_df 의 t 번째 행.
+    """
+    M, b, dead_row, dead_b, z = _forecast_operator(
+        success_rate, re_weight, sur_weight, risk_conversion,
+        new_user_weight, cycle_new_users, initial_users,
+    )
+    return iterate_operator(M, b, dead_row, dead_b, z, num_cycles)
+
+
+def iterate_operator(M, b, dead_row, dead_b, z, num_cycles):
+    """z' = M z + b 를 num_cycles 번 반복한 (..., num_cycles, len(FORECAST_COLUMNS)) 배열"""
+    out = np.empty(z.shape[:-1] + (int(num_cycles), len(FORECAST_COLUMNS)))
+    for t in range(int(num_cycles)):
+        out[..., t, 4] = (dead_row * z).sum(-1) + dead_b
+        z = np.einsum("...ij,...j->...i", M, z) + b
+        out[..., t, :3] = z
+    out[..., 3] = out[..., :3].sum(-1)
+    return out
+
+
+def forecast_at(success_rate, re_weight, sur_weight, risk_conversion,
+                new_user_weight, cycle_new_users, initial_users, cycles):
+    """지정한 사이클 번호(1부터)의 예측값만 행렬 거듭제곱으로 바로 계산한다
+
+    [z; 1] 에 대한 4×4 아핀 전이행렬 A 를 쓰면 z_n = A^n [z_0; 1] 이므로
+    긴 horizon (예: 10만 사이클) 도 O(log n) 행렬곱으로 끝난다.
+    반환: (..., len(cycles), len(FORECAST_COLUMNS)) 배열
+    """
+    M, b, dead_row, dead_b, z0 = _forecast_operator(
+        success_rate, re_weight, sur_weight, risk_conversion,
+        new_user_weight, cycle_new_users, initial_users,
+    )
+    batch = z0.shape[:-1]
+    A = np.zeros(batch + (4, 4))
+    A[..., :3, :3] = M
+    A[..., :3, 3] = b
+    A[..., 3, 3] = 1.0
+    x0 = np.concatenate([z0, np.ones(batch + (1,))], -1)
+
+    out = np.empty(batch + (len(cycles), len(FORECAST_COLUMNS)))
+    for k, n in enumerate(cycles):
+        # 완전 이탈은 직전 사이클 상태로 계산
+        prev = np.einsum("...ij,...j->...i", np.linalg.matrix_power(A, int(n) - 1), x0)[..., :3]
+        out[..., k, 4] = (dead_row * prev).sum(-1) + dead_b
+        out[..., k, :3] = np.einsum("...ij,...j->...i", M, prev) + b
+    out[..., 3] = out[..., :3].sum(-1)
+    return out
+
+
+def forecast_limit(success_rate, re_weight, sur_weight, risk_conversion,
+                   new_user_weight, cycle_new_users):
+    """사이클을 무한히 반복했을 때 수렴하는 상태 (…, len(FORECAST_COLUMNS))
+
+    수렴하지 않는(스펙트럼 반경 ≥ 1) 시나리오는 inf 로 채운다.
+    """
+    M, b, dead_row, dead_b, z0 = _forecast_operator(
+        success_rate, re_weight, sur_weight, risk_conversion,
+        new_user_weight, cycle_new_users, 0.0,
+    )
+    M = np.broadcast_to(M, z0.shape[:-1] + (3, 3))
+    b = np.broadcast_to(b, z0.shape)
+    stable = _spectral_radius(M) < 1.0 - 1e-12
+    I_minus_M = np.where(stable[..., None, None], np.eye(3) - M, np.eye(3))
+    z = np.linalg.solve(I_minus_M, b[..., None])[..., 0]
+
+    out = np.empty(z.shape[:-1] + (len(FORECAST_COLUMNS),))
+    out[..., :3] = z
+    out[..., 3] = z.sum(-1)
+    out[..., 4] = (dead_row * z).sum(-1) + dead_b
+    out[~stable] = np.inf
+    return out
+
+
+def forecast_frame(trajectory):
+    """simulate_batch 의 단일 시나리오 결과 (num_cycles, 5) 를 sim_df 로 바꾼다"""
+    sim_df = pd.DataFrame(trajectory, columns=list(FORECAST_COLUMNS))
+    sim_df.insert(0, "사이클", np.arange(1, len(sim_df) + 1))
+    return sim_df
+
+
+def run_forecast(params):
+    """경기 사이클을 num_cycles 번 반복하며 활성/Pool/이탈 추이를 계산한다"""
+    trajectory = simulate_batch(num_cycles=params.num_cycles, **stack_forecast_params([params]))
+    return Forecast(table=forecast_frame(trajectory[0]))
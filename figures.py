@@ -0,0 +1,708 @@
+"""Plotly 그림 생성과 그림 캐시
+
+app.py 의 차트를 입력 데이터만 받는 함수로 모았다. @cached 함수는 입력 배열과 레이아웃
+인자의 해시를 키로 최근 사용 순(LRU) 캐시에 Figure 를 보관해, 재실행 때 데이터가 그대로인
+그림은 다시 만들지 않는다 (예: 콘텐츠 이름만 바꾸면 Sankey 는 캐시에서 나온다).
+캐시는 프로세스 전체에서 공유하므로 돌려받은 Figure 는 수정하지 않는다. 적중/미스는
+서버 전체(FigureCache) 와 별도로, track() 으로 지정한 세션별 CacheTally 에도 센다.
+"""
+import contextvars
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+import perf
+
+# 캐시에 보관할 최대 그림 수
+CACHE_SIZE = 128
+
+_tally = contextvars.ContextVar("figure_cache_tally", default=None)
+
+
+# ==================== 그림 캐시 ====================
+def _feed(h, obj):
+    """obj 내용을 해시에 넣는다 (배열은 dtype/shape/바이트, 컨테이너는 재귀)"""
+    if isinstance(obj, np.ndarray):
+        h.update(f"nd{obj.dtype.str}{obj.shape}".encode())
+        if obj.dtype == object:
+            _feed(h, obj.tolist())
+        else:
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(f"pd{type(obj).__name__}".encode())
+        _feed(h, list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name)
+        h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for k, v in obj.items():
+            _feed(h, k)
+            _feed(h, v)
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"(" if isinstance(obj, tuple) else b"[")
+        for v in obj:
+            _feed(h, v)
+        h.update(b")")
+    elif is_dataclass(obj) and not isinstance(obj, type):
+        h.update(type(obj).__qualname__.encode())
+        _feed(h, {f.name: getattr(obj, f.name) for f in fields(obj)})
+    else:
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+
+
+def fingerprint(*args, **kwargs):
+    """인자 내용의 sha1 (같은 데이터면 객체가 달라도 같은 값)"""
+    h = hashlib.sha1()
+    _feed(h, (args, kwargs))
+    return h.hexdigest()
+
+
+class CacheTally:
+    """세션 하나의 그림 캐시 적중/미스 (FigureCache 의 집계는 서버 전체 합계)"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+
+def track(tally):
+    """이번 실행(스크립트 스레드)의 캐시 적중/미스를 tally 에도 센다"""
+    _tally.set(tally)
+    return tally
+
+
+class FigureCache:
+    """키 → Figure LRU 캐시 (스레드 안전, 서버 전체 적중/미스 집계)"""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key, build):
+        tally = _tally.get()
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                if tally is not None:
+                    tally.hits += 1
+                return self._figures[key]
+            self.misses += 1
+            if tally is not None:
+                tally.misses += 1
+        fig = build()
+        with self._lock:
+            self._figures[key] = fig
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.maxsize:
+                self._figures.popitem(last=False)
+                self.evictions += 1
+        return fig
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._figures),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+CACHE = FigureCache()
+
+
+def cached(builder):
+    """그림 함수를 입력 해시 기준으로 CACHE 에 보관한다 (원본은 .build)
+
+    성능 패널을 켠 실행에서는 해시 + 캐시 조회/생성 시간을 '그림 · 이름' 구간으로 기록한다.
+    """
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        with perf.section(f"그림 · {builder.__name__}"):
+            key = (builder.__qualname__, fingerprint(*args, **kwargs))
+            return CACHE.get_or_build(key, lambda: builder(*args, **kwargs))
+
+    wrapper.build = builder
+    return wrapper
+
+
+# ==================== 노드별 현황 ====================
+@cached
+def endo_factors(node, names, values, weights):
+    """노드의 콘텐츠별 점수 & 가중치 막대"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        name='점수',
+        x=names,
+        y=values,
+        marker_color='#4ecdc4',
+        text=[f'{v:.0%}' for v in values],
+        textposition='outside'
+    ))
+    fig.add_trace(go.Bar(
+        name='가중치',
+        x=names,
+        y=weights,
+        marker_color='#ffe66d',
+        text=[f'{w:.0%}' for w in weights],
+        textposition='outside'
+    ))
+    fig.update_layout(
+        title=f"{node} 콘텐츠별 점수 & 가중치",
+        barmode='group',
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=350,
+        yaxis=dict(range=[0, 1.2])
+    )
+    return fig
+
+
+@cached
+def endo_contribution(node, names, contributions):
+    """노드의 콘텐츠별 성공률 기여도 파이"""
+    fig = go.Figure(data=[go.Pie(
+        labels=names,
+        values=contributions,
+        hole=0.4,
+        textinfo='label+percent',
+        marker_colors=['#4ecdc4', '#ff6b6b', '#ffe66d', '#a06cd5', '#45b7d1', '#96ceb4', '#ff8c42', '#c084fc']
+    )])
+    fig.update_layout(
+        title=f"{node} 콘텐츠별 성공률 기여도",
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=350
+    )
+    return fig
+
+
+@cached
+def node_composition(nodes, retained, new, returned, revived):
+    """노드별 유저 구성 (이전유지/신규/복귀/부활) 누적 막대"""
+    fig = go.Figure()
+    for name, y, color in (
+        ('이전유지', retained, '#4ecdc4'),
+        ('신규', new, '#ff6b6b'),
+        ('복귀수', returned, '#ffe66d'),
+        ('부활수', revived, '#a06cd5'),
+    ):
+        fig.add_trace(go.Bar(name=name, x=nodes, y=y, marker_color=color))
+    fig.update_layout(
+        title="노드별 유저 구성",
+        barmode='stack',
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=400
+    )
+    return fig
+
+
+@cached
+def node_outcome(nodes, success, churn):
+    """노드별 성공 vs 이탈 막대"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(name='성공수', x=nodes, y=success, marker_color='#00d4aa'))
+    fig.add_trace(go.Bar(name='이탈수', x=nodes, y=churn, marker_color='#ff4757'))
+    fig.update_layout(
+        title="노드별 성공 vs 이탈",
+        barmode='group',
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=400
+    )
+    return fig
+
+
+@cached
+def success_gauge(node, rate):
+    """노드 성공률 게이지 (rate: 0~1)"""
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=rate * 100,
+        title={'text': node, 'font': {'size': 14, 'color': 'white'}},
+        number={'suffix': '%', 'font': {'color': 'white'}},
+        gauge={
+            'axis': {'range': [0, 100], 'tickcolor': 'white'},
+            'bar': {'color': '#00d4aa'},
+            'bgcolor': 'rgba(255,255,255,0.1)',
+            'steps': [
+                {'range': [0, 50], 'color': 'rgba(255,71,87,0.3)'},
+                {'range': [50, 75], 'color': 'rgba(255,230,109,0.3)'},
+                {'range': [75, 100], 'color': 'rgba(0,212,170,0.3)'}
+            ],
+        }
+    ))
+    fig.update_layout(
+        height=200,
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+    return fig
+
+
+# ==================== Funnel Flow ====================
+# 경기 노드 색 (진입 노드 → 가장 깊은 노드로 청록 → 파랑 그라데이션)
+FLOW_COLOR_START = (78, 205, 196)
+FLOW_COLOR_END = (42, 117, 248)
+
+
+def _flow_color(t, alpha=None):
+    r, g, b = (round(a + (z - a) * t) for a, z in zip(FLOW_COLOR_START, FLOW_COLOR_END))
+    return f'#{r:02x}{g:02x}{b:02x}' if alpha is None else f'rgba({r},{g},{b},{alpha})'
+
+
+def _graph_layout(depth):
+    """노드 깊이 → Sankey 좌표 (x: 깊이, y: 선형 체인은 대각선, 같은 깊이의 노드는 위아래로 벌림)"""
+    max_depth = max(int(depth.max()), 1)
+    x, y = [], []
+    for i, d in enumerate(depth):
+        same = np.flatnonzero(depth == d)
+        offset = (int(np.flatnonzero(same == i)[0]) - (len(same) - 1) / 2) * 0.15
+        x.append(0.01 + 0.59 * d / max_depth)
+        y.append(float(np.clip(0.3 + 0.5 * d / max_depth + offset, 0.02, 0.98)))
+    return x, y
+
+
+@cached
+def lifecycle_sankey(graph, df, risk, react_pool, sur_pool):
+    """전체 라이프사이클 Sankey (경기 노드와 흐름은 graph.FunnelGraph 에서 만든다)
+
+    df: 정상상태 노드 표 (graph.nodes 순서, 총활성 / 성공수 / 이탈수 열), risk: engine.RiskPipeline
+    """
+    n = len(graph.nodes)
+    total = df['총활성'].to_numpy(dtype=float)
+    success = df['성공수'].to_numpy(dtype=float)
+    churn = df['이탈수'].to_numpy(dtype=float)
+    depth = graph.depth()
+    shade = depth / max(int(depth.max()), 1)
+
+    # 경기 노드 뒤의 고정 노드 번호
+    at_risk_dau_idx, at_risk_wau_idx, dead_users_idx, react_idx, sur_idx, next_cycle_idx, final_churn_idx = range(n, n + 7)
+
+    labels = [f"{node}\n(총: {t:,.0f})" for node, t in zip(graph.nodes, total)]
+    labels += [
+        f"At Risk DAU\n({risk.at_risk_dau_pool:,.0f})",
+        f"At Risk WAU\n({risk.at_risk_wau_pool:,.0f})",
+        f"Dead Users\n({risk.dead_users_pool:,.0f})",
+        f"React Pool\n({react_pool:,.0f})",
+        f"Sur Pool\n({sur_pool:,.0f})",
+        f"다음 사이클\n({(success * graph.exit_share).sum():,.0f})",
+        f"완전 이탈\n({risk.dead_users_loss:,.0f})",
+    ]
+
+    sources, targets, values, colors = [], [], [], []
+
+    def link(source, target, value, color):
+        sources.append(int(source))
+        targets.append(int(target))
+        values.append(float(value))
+        colors.append(color)
+
+    # 1. 노드 간 성공 흐름 (간선 비중대로)
+    for src, dst, share in graph.edges:
+        link(src, dst, success[src] * share, _flow_color(shade[src], 0.6))
+
+    # 2. 사이클을 마친 성공 → 다음 사이클
+    for i in np.flatnonzero(graph.exit_share > 0):
+        link(i, next_cycle_idx, success[i] * graph.exit_share[i], 'rgba(0,212,170,0.7)')
+
+    # 3. 각 노드에서 이탈 → At Risk DAU (같은 빨간색 계열)
+    for i in range(n):
+        link(i, at_risk_dau_idx, churn[i], 'rgba(255,107,107,0.5)')
+
+    # 4. 리스크 파이프라인 (React 노랑, 손실 주황/보라, 부활 연보라, 완전 이탈 회색)
+    link(at_risk_dau_idx, react_idx, risk.at_risk_dau_success, 'rgba(255,217,61,0.6)')
+    link(at_risk_dau_idx, at_risk_wau_idx, risk.at_risk_dau_loss, 'rgba(255,140,66,0.5)')
+    link(at_risk_wau_idx, react_idx, risk.at_risk_wau_success, 'rgba(255,217,61,0.6)')
+    link(at_risk_wau_idx, dead_users_idx, risk.at_risk_wau_loss, 'rgba(160,108,213,0.5)')
+    link(dead_users_idx, sur_idx, risk.dead_users_success, 'rgba(192,132,252,0.6)')
+    link(dead_users_idx, final_churn_idx, risk.dead_users_loss, 'rgba(107,114,128,0.5)')
+
+    # 노드 색상 / 위치 (경기 노드는 깊이별, 리스크 쪽은 고정)
+    node_colors = [_flow_color(t) for t in shade] + [
+        '#ff6b6b',  # At Risk DAU (빨강)
+        '#ff8c42',  # At Risk WAU (주황)
+        '#a06cd5',  # Dead Users (보라)
+        '#ffd93d',  # React Pool (노랑)
+        '#c084fc',  # Sur Pool (연보라)
+        '#22c55e',  # 다음 사이클 (녹색)
+        '#6b7280',  # 완전 이탈 (회색)
+    ]
+    node_x, node_y = _graph_layout(depth)
+    node_x += [0.65, 0.7, 0.8, 0.8, 0.85, 0.8, 1]
+    node_y += [0.1, 0.45, 0.45, 0.05, 0.65, 0.75, 0.5]
+
+    fig = go.Figure(data=[go.Sankey(
+        arrangement='snap',
+        node=dict(
+            pad=30,
+            thickness=20,
+            line=dict(color="white", width=0.5),
+            label=labels,
+            color=node_colors,
+            x=node_x,
+            y=node_y
+        ),
+        link=dict(
+            source=sources,
+            target=targets,
+            value=values,
+            color=colors
+        )
+    )])
+    
+    fig.update_layout(
+        title="유저 흐름 시각화 (전체 라이프사이클)",
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=max(700, 40 * int(np.bincount(depth).max()) + 300),
+        font=dict(size=11, color='white')
+    )
+    return fig
+
+
+@cached
+def inflow_pie(node, retained, new, returned, revived):
+    """노드 유입 구성 파이"""
+    fig = go.Figure(data=[go.Pie(
+        labels=['이전유지', '신규', '복귀수', '부활수'],
+        values=[retained, new, returned, revived],
+        hole=0.4,
+        marker_colors=['#4ecdc4', '#ff6b6b', '#ffe66d', '#a06cd5']
+    )])
+    fig.update_layout(
+        title=f"{node} 유입 구성",
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=350
+    )
+    return fig
+
+
+@cached
+def outcome_pie(node, success, churn):
+    """노드 성공 vs 이탈 파이"""
+    fig = go.Figure(data=[go.Pie(
+        labels=['성공', '이탈'],
+        values=[success, churn],
+        hole=0.4,
+        marker_colors=['#00d4aa', '#ff4757']
+    )])
+    fig.update_layout(
+        title=f"{node} 성공 vs 이탈",
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=350
+    )
+    return fig
+
+
+# ==================== 리스크 관리 ====================
+@cached
+def risk_waterfall(risk):
+    """리스크 파이프라인 워터폴 (risk: engine.RiskPipeline)"""
+    fig = go.Figure(go.Waterfall(
+        name="리스크 파이프라인",
+        orientation="v",
+        measure=["absolute", "relative", "relative", "relative", "relative", "total"],
+        x=["총 이탈", "DAU 전환", "DAU 손실→WAU", "WAU 전환", "WAU 손실→Dead", "최종 손실"],
+        y=[risk.at_risk_dau_pool, -risk.at_risk_dau_success, 0, -risk.at_risk_wau_success, 0, None],
+        connector={"line": {"color": "rgb(63, 63, 63)"}},
+        decreasing={"marker": {"color": "#00d4aa"}},
+        increasing={"marker": {"color": "#ff4757"}},
+        totals={"marker": {"color": "#ffa502"}}
+    ))
+    fig.update_layout(
+        title="리스크 파이프라인 워터폴",
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=400
+    )
+    return fig
+
+
+@cached
+def risk_funnel(risk):
+    """리스크 전환 퍼널 (risk: engine.RiskPipeline)"""
+    fig = go.Figure(go.Funnel(
+        y=["총 이탈 (At Risk)", "At Risk DAU 전환", "At Risk WAU 전환", "Dead Users 전환"],
+        x=[risk.at_risk_dau_pool, risk.at_risk_dau_success, risk.at_risk_wau_success, risk.dead_users_success],
+        textinfo="value+percent initial",
+        marker={"color": ["#ff4757", "#ffa502", "#ffe66d", "#a06cd5"]}
+    ))
+    fig.update_layout(
+        title="리스크 전환 퍼널",
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=400
+    )
+    return fig
+
+
+# ==================== 예상치 관리 ====================
+@cached
+def forecast(cycles, total, active, band_cycles=None, bands=None):
+    """사이클별 총/활성 유저 (bands: {열: (P5, P50, P95)} 가 있으면 불확실성 밴드)"""
+    fig = go.Figure()
+
+    # 불확실성 밴드 (P5~P95 영역 + P50 선)
+    if bands is not None:
+        band_colors = {"총 유저": ('0,212,170', '#00d4aa'), "활성 유저": ('78,205,196', '#4ecdc4')}
+        for col_name, (rgb, line_color) in band_colors.items():
+            p5, p50, p95 = bands[col_name]
+            fig.add_trace(go.Scatter(
+                x=band_cycles, y=p95,
+                mode='lines', line=dict(width=0),
+                name=f'{col_name} P95', showlegend=False
+            ))
+            fig.add_trace(go.Scatter(
+                x=band_cycles, y=p5,
+                mode='lines', line=dict(width=0),
+                fill='tonexty', fillcolor=f'rgba({rgb},0.15)',
+                name=f'{col_name} P5–P95'
+            ))
+            fig.add_trace(go.Scatter(
+                x=band_cycles, y=p50,
+                mode='lines', line=dict(color=line_color, width=1, dash='dash'),
+                name=f'{col_name} P50'
+            ))
+
+    fig.add_trace(go.Scatter(
+        x=cycles,
+        y=total,
+        mode='lines+markers',
+        name='총 유저 수',
+        line=dict(color='#00d4aa', width=3),
+        marker=dict(size=8),
+        fill='tozeroy',
+        fillcolor='rgba(0,212,170,0.2)'
+    ))
+    fig.add_trace(go.Scatter(
+        x=cycles,
+        y=active,
+        mode='lines+markers',
+        name='활성 유저',
+        line=dict(color='#4ecdc4', width=2, dash='dot'),
+        marker=dict(size=6)
+    ))
+    fig.update_layout(
+        title="🔮 시간(사이클)별 예상 총 유저 수",
+        xaxis_title="경기 사이클",
+        yaxis_title="유저 수",
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=450,
+        hovermode='x unified',
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01)
+    )
+    return fig
+
+
+@cached
+def pool_trend(cycles, react_pool, sur_pool):
+    """사이클별 React/Sur Pool 누적 영역"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=cycles,
+        y=react_pool,
+        mode='lines',
+        name='React Pool',
+        line=dict(color='#ffe66d', width=2),
+        stackgroup='one'
+    ))
+    fig.add_trace(go.Scatter(
+        x=cycles,
+        y=sur_pool,
+        mode='lines',
+        name='Sur Pool',
+        line=dict(color='#a06cd5', width=2),
+        stackgroup='one'
+    ))
+    fig.update_layout(
+        title="Pool 변화 추이",
+        xaxis_title="사이클",
+        yaxis_title="유저 수",
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=300
+    )
+    return fig
+
+
+@cached
+def churn_trend(cycles, churn):
+    """사이클별 최종 이탈 막대"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=cycles,
+        y=churn,
+        name='이탈 유저',
+        marker_color='#ff4757'
+    ))
+    fig.update_layout(
+        title="사이클별 최종 이탈 유저",
+        xaxis_title="사이클",
+        yaxis_title="이탈 수",
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=300
+    )
+    return fig
+
+
+@cached
+def tornado(params, down, up, swing, kpi_label, base_kpi):
+    """민감도 tornado (표 순서대로 위에서 아래로, down / up: -스윙 / +스윙 KPI 변화)"""
+    params, down, up = list(params)[::-1], list(down)[::-1], list(up)[::-1]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        y=params,
+        x=down,
+        orientation='h',
+        name=f'-{swing:.0%}',
+        marker_color='#ff6b6b'
+    ))
+    fig.add_trace(go.Bar(
+        y=params,
+        x=up,
+        orientation='h',
+        name=f'+{swing:.0%}',
+        marker_color='#00d4aa'
+    ))
+    fig.update_layout(
+        title=f"{kpi_label} 민감도 (기준 {base_kpi:,.0f})",
+        xaxis_title="KPI 변화",
+        barmode='overlay',
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=max(300, 28 * len(params) + 120)
+    )
+    return fig
+
+
+@cached
+def sweep_map(x, y, z, style, colorscale, kpi_label, x_label, y_label, base_x, base_y):
+    """2D 스윕 KPI 지도 (style: "Heatmap" / "Contour", z: (len(y), len(x))) + 현재 설정 표시"""
+    trace_cls = go.Heatmap if style == "Heatmap" else go.Contour
+    fig = go.Figure(trace_cls(
+        x=x,
+        y=y,
+        z=z,
+        colorscale=colorscale,
+        colorbar=dict(title=kpi_label)
+    ))
+    fig.add_trace(go.Scatter(
+        x=[base_x],
+        y=[base_y],
+        mode='markers',
+        name='현재 설정',
+        marker=dict(color='white', size=12, symbol='x')
+    ))
+    fig.update_layout(
+        title=f"{kpi_label} — {len(x)}×{len(y)} 격자",
+        xaxis_title=x_label,
+        yaxis_title=y_label,
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=550
+    )
+    return fig
+
+
+@cached
+def investment(items, delta):
+    """투자 배분의 콘텐츠별 점수 개선량 막대 (delta 가 0 인 콘텐츠는 뺀다)"""
+    changed = np.nonzero(delta)[0]
+    fig = go.Figure(go.Bar(
+        x=[items[i] for i in changed],
+        y=np.asarray(delta)[changed],
+        marker_color='#00d4aa',
+        text=[f'+{delta[i]:.2f}' for i in changed],
+        textposition='outside'
+    ))
+    fig.update_layout(
+        title="1순위 배분 — 콘텐츠별 점수 개선량",
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=350
+    )
+    return fig
+
+
+@cached
+def routing(nodes, labels, current, optimal):
+    """비중 벡터별 현재 vs 최적 배분 (labels: {벡터 이름: 제목}, current / optimal: {벡터 이름: 노드별 비중})"""
+    fig = make_subplots(rows=1, cols=len(labels), subplot_titles=list(labels.values()))
+    for col_idx, name in enumerate(labels, 1):
+        fig.add_trace(go.Bar(
+            x=nodes, y=current[name], name='현재',
+            marker_color='#7b68ee', showlegend=col_idx == 1
+        ), row=1, col=col_idx)
+        fig.add_trace(go.Bar(
+            x=nodes, y=optimal[name], name='최적',
+            marker_color='#00d4aa', showlegend=col_idx == 1
+        ), row=1, col=col_idx)
+    fig.update_layout(
+        barmode='group',
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=350
+    )
+    return fig
+
+
+@cached
+def scenario_comparison(names, values, metric):
+    """시나리오별 사이클 곡선 겹쳐 그리기 (values: (시나리오, 사이클))"""
+    fig = go.Figure()
+    cycles = np.arange(1, np.shape(values)[1] + 1)
+    for name, y in zip(names, values):
+        fig.add_trace(go.Scatter(
+            x=cycles,
+            y=y,
+            mode='lines',
+            name=name,
+            line=dict(width=3 if name.startswith("▶") else 2, dash='dot' if name.startswith("▶") else 'solid')
+        ))
+    fig.update_layout(
+        title=f"시나리오별 {metric} 추이",
+        xaxis_title="경기 사이클",
+        yaxis_title="유저 수",
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        height=450,
+        hovermode='x unified'
+    )
+    return fig
@@ -0,0 +1,136 @@
+"""목표 역산 (Goal Seek)
+
+"N 사이클 뒤 총 유저 X 명이 되려면 사이클당 신규 유저가 몇 명 필요한가?" 처럼 KPI 목표와
+자유 파라미터 하나를 주면 필요한 값을 구한다. 예측 KPI 는 초기 유저 / 사이클당 신규 유저에
+대해 아핀이므로 두 점으로 정확히 풀고, 나머지 파라미터는 구간을 여러 점으로 한꺼번에 나눠
+부호가 바뀌는 칸을 좁혀 가는 배치 구간 탐색으로 푼다.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+# 예측 KPI 가 아핀인 파라미터 그룹
+LINEAR_GROUPS = ("initial_users", "cycle_new_users")
+
+# KPI 에 영향이 없는 파라미터 그룹 — 예측은 사이클 유입만, 정상상태는 총 신규 유저만 쓴다
+_UNUSED_GROUPS = {
+    "forecast": ("total_new_users",),
+    "steady": LINEAR_GROUPS,
+}
+
+# 구간 탐색: 한 번에 평가할 점 수, 최대 반복, 상대 허용오차
+GRID_POINTS = 65
+MAX_ROUNDS = 8
+TOLERANCE = 1e-9
+
+
+@dataclass(frozen=True)
+class GoalSeekResult:
+    """역산 결과
+
+    feasible 이 False 면 범위 안에 목표를 만족하는 값이 없어 가장 가까운 값을 돌려준 것이다.
+    범위 전체에서 KPI 가 유한하지 않으면 (정상상태가 발산) value 는 현재 값, achieved 는 nan 이다.
+    """
+    value: float
+    achieved: float
+    target: float
+    feasible: bool
+    method: str
+    evaluations: int
+    elapsed: float
+
+
+def _evaluate(space, index, values, kpi):
+    X = np.repeat(space.base[None, :], len(values), axis=0)
+    X[:, index] = values
+    return space.evaluate(X, (kpi,))[kpi]
+
+
+def _search_upper(space, index):
+    # 상한이 없는 유저 수 파라미터는 목표를 감쌀 때까지 넓힌다
+    upper = space.upper[index]
+    return upper if np.isfinite(upper) else max(4 * space.base[index], 1000.0)
+
+
+def _linear_solve(space, index, kpi, target):
+    v0 = space.base[index]
+    f0, f1 = _evaluate(space, index, np.array([v0, v0 + 1.0]), kpi)
+    slope = f1 - f0
+    if slope == 0:
+        return v0, f0, False
+    value = v0 + (target - f0) / slope
+    feasible = value >= space.lower[index]
+    value = max(value, space.lower[index])
+    achieved = float(_evaluate(space, index, np.array([value]), kpi)[0])
+    return value, achieved, feasible
+
+
+def _bracket_solve(space, index, kpi, target):
+    lower = space.lower[index]
+    upper = _search_upper(space, index)
+    evaluations = 0
+
+    # 상한이 없으면 목표를 감쌀 때까지 상한을 키운다
+    for _ in range(20):
+        grid = np.linspace(lower, upper, GRID_POINTS)
+        values = _evaluate(space, index, grid, kpi) - target
+        evaluations += len(grid)
+        if np.isfinite(space.upper[index]) or np.any(np.sign(values[:-1]) != np.sign(values[1:])):
+            break
+        upper *= 4
+
+    current = space.base[index]
+    for round_idx in range(MAX_ROUNDS + 1):
+        finite = np.isfinite(values)
+        crossing = np.nonzero(
+            finite[:-1] & finite[1:] & (np.sign(values[:-1]) != np.sign(values[1:]))
+        )[0]
+        if not finite.any():
+            # 범위 전체에서 발산: 가까운 점도 없다
+            return current, np.nan, False, evaluations
+        if not len(crossing):
+            # 목표에 닿지 못함: 가장 가까운 점
+            best = int(np.nanargmin(np.where(finite, np.abs(values), np.nan)))
+            return grid[best], values[best] + target, False, evaluations
+        # 근이 여럿이면 현재 값에 가장 가까운 칸
+        k = crossing[np.argmin(np.abs(grid[crossing] - current))]
+        lo, hi = grid[k], grid[k + 1]
+        if round_idx == MAX_ROUNDS or hi - lo <= TOLERANCE * max(1.0, abs(hi)):
+            break
+        grid = np.linspace(lo, hi, GRID_POINTS)
+        values = _evaluate(space, index, grid, kpi) - target
+        evaluations += len(grid)
+
+    # 마지막 칸 안에서 선형 보간
+    lo_val, hi_val = values[k], values[k + 1]
+    t = lo_val / (lo_val - hi_val) if hi_val != lo_val else 0.0
+    value = grid[k] + t * (grid[k + 1] - grid[k])
+    achieved = float(_evaluate(space, index, np.array([value]), kpi)[0])
+    return value, achieved, True, evaluations + 1
+
+
+def goal_seek(space, index, kpi, target):
+    """space 의 index 번째 파라미터만 움직여 kpi 가 target 이 되는 값을 찾는다
+
+    kpi 에 영향이 없는 파라미터를 고르면 ValueError.
+    """
+    start = time.perf_counter()
+    group = space.params[index].group
+    if group in _UNUSED_GROUPS["forecast" if kpi.startswith("forecast_") else "steady"]:
+        raise ValueError(f"{space.labels[index]} 은(는) 이 KPI 에 영향을 주지 않습니다")
+    if group in LINEAR_GROUPS and kpi.startswith("forecast_"):
+        value, achieved, feasible = _linear_solve(space, index, kpi, target)
+        method, evaluations = "선형 해", 3
+    else:
+        value, achieved, feasible, evaluations = _bracket_solve(space, index, kpi, target)
+        method = "구간 탐색"
+    return GoalSeekResult(
+        value=float(value),
+        achieved=float(achieved),
+        target=float(target),
+        feasible=bool(feasible),
+        method=method,
+        evaluations=evaluations,
+        elapsed=time.perf_counter() - start,
+    )
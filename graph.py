@@ -0,0 +1,429 @@
+"""N-노드 퍼널 그래프
+
+engine.py 의 5개 노드 선형 체인(경기전 → … → 경기직후)을 임의의 방향 그래프로 일반화한다.
+노드 i 에서 성공한 유저는 나가는 간선 (i → j, 비중 share) 으로 나뉘어 같은 사이클의 노드 j 로
+들어가고, 나가는 비중의 나머지(1 - Σshare)는 사이클을 마치고 다음 사이클의 이전유지가 된다.
+이전유지는 진입 비중(entry)대로 노드에 들어간다. 연장전·승부차기 같은 분기나 한 구간에 동시에
+열리는 기능을 노드로 추가할 수 있다.
+
+전이행렬은 간선 배열(출발, 도착, 비중)로만 들고, 노드 값의 선형계 x = u + A x 는 강한 연결
+요소(SCC) 단위로 푼다: 순환이 없는 부분은 위상 순서로 간선을 한 번씩만 따라가고(O(간선 수)),
+순환이 있는 요소만 그 요소 크기의 밀집 선형계로 푼다. 그래서 긴 체인이나 성공률이 1 에 가까운
+순환도 반복 없이 정확히 풀린다. 그래프 밖(사이클 간 순환, Pool, 리스크 파이프라인)은 engine 과
+같은 3×3 선형계를 쓴다.
+
+그래프 파일 (JSON/YAML, 예시: scenarios/graph_extra_time.yaml):
+
+    nodes:
+      - 경기전
+      - {name: 연장전, success_rate: 0.5, new_user_weight: 0, re_weight: 0, sur_weight: 0}
+    edges:
+      - [경기전, 전반전]            # 비중 생략 = 1.0
+      - {from: 후반전, to: 연장전, share: 0.2}
+    entry: {경기전: 1.0}            # 생략하면 첫 노드
+
+노드에 적은 값은 사이드바 입력이 없는 노드의 기본값으로 쓴다.
+"""
+import json
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+import engine
+
+# 그래프 파일의 노드별 기본값 키
+NODE_SETTINGS = ("success_rate", "new_user_weight", "re_weight", "sur_weight")
+
+# 순환 요소의 스펙트럼 반경이 이 이상이면 (성공률 1 로 닫힌 순환) 유한한 해가 없다
+SINGULAR_TOL = 1e-12
+
+
+@dataclass(frozen=True)
+class FunnelGraph:
+    """노드 이름, 간선 ((출발 번호, 도착 번호, 비중), ...), 진입 비중 (노드 순서)"""
+    nodes: tuple
+    edges: tuple
+    entry: tuple
+    settings: tuple = ()  # ((노드, 키, 값), ...) 그래프 파일의 노드별 기본값
+
+    def __post_init__(self):
+        n = len(self.nodes)
+        if n == 0:
+            raise ValueError("그래프에 노드가 없습니다")
+        if len(set(self.nodes)) != n:
+            raise ValueError("노드 이름이 중복됩니다")
+        if len(self.entry) != n:
+            raise ValueError("진입 비중 길이가 노드 수와 다릅니다")
+        for src, dst, share in self.edges:
+            if not (0 <= src < n and 0 <= dst < n):
+                raise ValueError(f"간선 노드 번호가 범위를 벗어났습니다: {src} → {dst}")
+            if share < 0:
+                raise ValueError(f"간선 비중이 음수입니다: {self.nodes[src]} → {self.nodes[dst]}")
+        over = [self.nodes[i] for i in np.flatnonzero(self.out_share > 1.0 + 1e-9)]
+        if over:
+            raise ValueError(f"나가는 간선 비중 합계가 1 을 넘습니다: {', '.join(over)}")
+        if sum(self.entry) <= 0:
+            raise ValueError("진입 비중 합계가 0 입니다")
+
+    # ==================== 만들기 ====================
+    @classmethod
+    def linear(cls, nodes=engine.NODES):
+        """engine 의 선형 체인 (노드 i → i+1, 비중 1, 첫 노드로 진입)"""
+        nodes = tuple(nodes)
+        return cls(
+            nodes=nodes,
+            edges=tuple((i, i + 1, 1.0) for i in range(len(nodes) - 1)),
+            entry=(1.0,) + (0.0,) * (len(nodes) - 1),
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """그래프 파일 dict (모듈 설명 참고) → FunnelGraph. 잘못된 값은 ValueError"""
+        if not isinstance(data, dict) or "nodes" not in data:
+            raise ValueError("그래프에 nodes 가 없습니다")
+        names, settings = [], []
+        for item in data["nodes"]:
+            if isinstance(item, dict):
+                name = str(item.get("name", "")).strip()
+                settings += [(name, k, float(item[k])) for k in NODE_SETTINGS if k in item]
+            else:
+                name = str(item).strip()
+            if not name:
+                raise ValueError("이름이 없는 노드가 있습니다")
+            names.append(name)
+        index = {name: i for i, name in enumerate(names)}
+
+        def node_index(name):
+            if str(name) not in index:
+                raise ValueError(f"간선에 알 수 없는 노드: {name}")
+            return index[str(name)]
+
+        edges = []
+        for item in data.get("edges", []):
+            if isinstance(item, dict):
+                src, dst, share = item.get("from"), item.get("to"), item.get("share", 1.0)
+            else:
+                src, dst, share = (list(item) + [1.0])[:3]
+            edges.append((node_index(src), node_index(dst), float(share)))
+
+        entry = data.get("entry") or {names[0]: 1.0}
+        entry_share = [0.0] * len(names)
+        for name, share in entry.items():
+            entry_share[node_index(name)] = float(share)
+        return cls(nodes=tuple(names), edges=tuple(edges), entry=tuple(entry_share), settings=tuple(settings))
+
+    def to_dict(self):
+        defaults = self.node_defaults()
+        return {
+            "nodes": [{"name": n, **defaults[n]} if defaults[n] else n for n in self.nodes],
+            "edges": [{"from": self.nodes[s], "to": self.nodes[d], "share": w} for s, d, w in self.edges],
+            "entry": {n: w for n, w in zip(self.nodes, self.entry) if w > 0},
+        }
+
+    def node_defaults(self):
+        """{노드: {키: 값}} (그래프 파일에 적은 노드별 기본값)"""
+        defaults = {n: {} for n in self.nodes}
+        for name, key, value in self.settings:
+            defaults[name][key] = value
+        return defaults
+
+    @cached_property
+    def key(self):
+        return engine.digest(self)
+
+    # ==================== 희소 전이 ====================
+    @cached_property
+    def _src(self):
+        return np.array([e[0] for e in self.edges], dtype=np.intp)
+
+    @cached_property
+    def _dst(self):
+        return np.array([e[1] for e in self.edges], dtype=np.intp)
+
+    @cached_property
+    def _share(self):
+        return np.array([e[2] for e in self.edges], dtype=float)
+
+    @cached_property
+    def out_share(self):
+        """노드별 나가는 간선 비중 합계"""
+        return np.bincount(self._src, weights=self._share, minlength=len(self.nodes))
+
+    @cached_property
+    def exit_share(self):
+        """노드별 성공 유저 중 사이클을 마치는 비중 (1 - 나가는 비중)"""
+        return np.clip(1.0 - self.out_share, 0.0, 1.0)
+
+    @cached_property
+    def entry_share(self):
+        entry = np.asarray(self.entry, dtype=float)
+        return entry / entry.sum()
+
+    @cached_property
+    def _components(self):
+        """강한 연결 요소 [(노드 번호 배열, 순환 여부)] — 간선 방향의 역위상 순서 (뒤 노드가 먼저)
+
+        반복형 Tarjan 알고리즘, O(노드 + 간선). 자기 간선만 있는 노드도 순환이다.
+        """
+        n = len(self.nodes)
+        successors = [[] for _ in range(n)]
+        for src, dst, _ in self.edges:
+            successors[src].append(dst)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        stack, components = [], []
+        counter = 0
+        for root in range(n):
+            if index[root] >= 0:
+                continue
+            work = [(root, 0)]
+            while work:
+                v, k = work.pop()
+                if k == 0:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+                if k < len(successors[v]):
+                    work.append((v, k + 1))
+                    w = successors[v][k]
+                    if index[w] < 0:
+                        work.append((w, 0))
+                    elif on_stack[w]:
+                        low[v] = min(low[v], index[w])
+                    continue
+                if low[v] == index[v]:
+                    members = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        members.append(w)
+                        if w == v:
+                            break
+                    cyclic = len(members) > 1 or v in successors[v]
+                    components.append((np.array(members[::-1], dtype=np.intp), cyclic))
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+        return components
+
+    @cached_property
+    def _sources(self):
+        # 노드별 (간선 번호, 앞 노드) — 앞 노드 값이 이 노드 값에 더해지는 간선
+        into = [[] for _ in self.nodes]
+        for e, (src, dst, _) in enumerate(self.edges):
+            into[dst].append((e, src))
+        return into
+
+    @cached_property
+    def _targets(self):
+        # 노드별 (간선 번호, 뒤 노드) — 뒤 노드 값이 이 노드 값에 더해지는 간선
+        out = [[] for _ in self.nodes]
+        for e, (src, dst, _) in enumerate(self.edges):
+            out[src].append((e, dst))
+        return out
+
+    def solve(self, u, coef, forward):
+        """노드 값 x (..., 노드) 의 선형계를 SCC 단위로 정확히 푼다
+
+        forward=True : x_j = u_j + Σ_(i→j) coef_e x_i   (앞 노드에서 흘러들어옴, 위상 순서로)
+        forward=False: x_i = u_i + Σ_(i→j) coef_e x_j   (뒤 노드에서 거슬러옴, 역위상 순서로)
+        coef: (..., 간선) 간선 계수. 성공률 1 로 닫힌 순환이 있어 해가 없으면 ValueError.
+        """
+        u = np.asarray(u, dtype=float)
+        coef = np.asarray(coef, dtype=float)
+        n = len(self.nodes)
+        batch = np.broadcast_shapes(u.shape[:-1], coef.shape[:-1])
+        # 배치 축을 뒤로 보내 노드 / 간선 한 줄씩 (배치,) 배열로 다룬다
+        U = list(np.broadcast_to(u, batch + (n,)).reshape(-1, n).T)
+        C = list(np.broadcast_to(coef, batch + (len(self.edges),)).reshape(-1, len(self.edges)).T)
+        links = self._sources if forward else self._targets
+        x = [None] * n
+
+        components = reversed(self._components) if forward else self._components
+        for members, cyclic in components:
+            if not cyclic:
+                j = members[0]
+                value = U[j]
+                for e, i in links[j]:
+                    value = value + C[e] * x[i]
+                x[j] = value
+                continue
+
+            # 순환 요소: 밖에서 들어오는 값은 상수항으로, 안쪽 간선은 밀집 행렬로
+            local = {int(v): k for k, v in enumerate(members)}
+            size = len(members)
+            rhs = np.stack([U[v] for v in members], axis=-1)
+            M = np.zeros(rhs.shape[:-1] + (size, size))
+            for k, v in enumerate(members):
+                for e, i in links[v]:
+                    if i in local:
+                        M[:, k, local[i]] += C[e]
+                    else:
+                        rhs[:, k] += C[e] * x[i]
+            if np.max(np.abs(np.linalg.eigvals(M))) >= 1.0 - SINGULAR_TOL:
+                names = ", ".join(self.nodes[v] for v in members[:5])
+                raise ValueError(f"그래프 흐름의 해가 없습니다 — 성공률 1 로 닫힌 순환 경로: {names}")
+            solved = np.linalg.solve(np.eye(size) - M, rhs[..., None])[..., 0]
+            for k, v in enumerate(members):
+                x[v] = solved[:, k]
+
+        return np.stack(x, axis=-1).reshape(batch + (n,))
+
+    # ==================== 노드 확률 ====================
+    def _edge_coef(self, s):
+        # 노드 i 성공 유저 중 간선 i → j 로 가는 비율 (성공률 × 비중)
+        return s[..., self._src] * self._share
+
+    def survival(self, success_rate):
+        """노드 i 에 들어온 1명이 사이클을 성공으로 마칠 확률 (engine.survival 의 그래프 버전)"""
+        s = np.asarray(success_rate, dtype=float)
+        return self.solve(s * self.exit_share, self._edge_coef(s), forward=False)
+
+    def throughput(self, success_rate):
+        """노드 i 에 들어온 1명이 사이클 동안 거치는 노드 수 기대값 (engine.throughput 의 그래프 버전)"""
+        s = np.asarray(success_rate, dtype=float)
+        return self.solve(np.ones_like(s), self._edge_coef(s), forward=False)
+
+    def node_totals(self, success_rate, inflow):
+        """노드별 외부 유입 inflow 에서 노드별 총활성 x = inflow + Tᵀ (s · x)"""
+        s = np.asarray(success_rate, dtype=float)
+        return self.solve(inflow, self._edge_coef(s), forward=True)
+
+    def depth(self):
+        """Sankey 배치용 노드 깊이 (앞 노드가 없는 노드에서 가장 긴 경로의 간선 수)
+
+        순환에 걸려 순서를 정할 수 없는 노드는 순서가 정해진 앞 노드의 최대 깊이 + 1.
+        """
+        n = len(self.nodes)
+        indegree = np.bincount(self._dst, minlength=n)
+        successors = [[] for _ in range(n)]
+        for src, dst, _ in self.edges:
+            successors[src].append(dst)
+        depth = np.zeros(n, dtype=int)
+        queue = list(np.flatnonzero(indegree == 0))
+        done = np.zeros(n, dtype=bool)
+        while queue:
+            i = queue.pop()
+            done[i] = True
+            for j in successors[i]:
+                depth[j] = max(depth[j], depth[i] + 1)
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    queue.append(j)
+        for i in np.flatnonzero(~done):
+            preds = [src for src, dst, _ in self.edges if dst == i and done[src]]
+            depth[i] = max((depth[p] for p in preds), default=-1) + 1
+        return depth
+
+
+def loads(text, fmt="json"):
+    """그래프 파일 내용 → FunnelGraph (fmt: "json" 또는 "yaml")"""
+    if fmt in ("yaml", "yml"):
+        import yaml  # YAML 그래프를 쓸 때만 필요
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    return FunnelGraph.from_dict(data)
+
+
+# ==================== 파라미터 ====================
+def funnel_params(graph, success_rate, total_new_users, new_user_weight, re_weight, sur_weight, risk_conversion):
+    """노드 이름 dict 입력 → graph.nodes 순서의 engine.FunnelParams
+
+    dict 에 없는 노드(그래프에만 있는 노드)는 그래프 파일의 노드별 기본값, 그것도 없으면 0 을 쓴다.
+    총 신규 유저는 그래프 전체 노드의 신규 비중으로 다시 나눈다.
+    """
+    defaults = graph.node_defaults()
+
+    def fill(values, key):
+        return {n: values[n] if n in values else defaults[n].get(key, 0.0) for n in graph.nodes}
+
+    new_user_weight = fill(new_user_weight, "new_user_weight")
+    return engine.FunnelParams.from_dicts(
+        fill(success_rate, "success_rate"),
+        engine.split_new_users(total_new_users, new_user_weight),
+        fill(re_weight, "re_weight"),
+        fill(sur_weight, "sur_weight"),
+        risk_conversion,
+        nodes=graph.nodes,
+    )
+
+
+def cycle_operator(graph, success_rate, re_weight, sur_weight, risk_conversion, inflow):
+    """engine.cycle_operator 의 그래프 버전 (이전유지는 진입 비중대로 들어감)"""
+    g = graph.survival(success_rate)
+    return engine.operator_from_survival(
+        g, g @ graph.entry_share, re_weight, sur_weight, risk_conversion, inflow
+    )
+
+
+# ==================== 계산 ====================
+def node_rows(graph, params, retained, react_pool, sur_pool):
+    """engine.node_rows 의 그래프 버전 (이전유지 = 진입 + 앞 노드에서 넘어온 성공 유저)"""
+    new = np.asarray(params.new_users, dtype=float)
+    re_weight = np.asarray(params.re_weight, dtype=float)
+    sur_weight = np.asarray(params.sur_weight, dtype=float)
+    rate = np.asarray(params.success_rate, dtype=float)
+    react_qty = react_pool * re_weight
+    resur_qty = sur_pool * sur_weight
+    total = graph.node_totals(rate, new + react_qty + resur_qty + retained * graph.entry_share)
+    return pd.DataFrame({
+        "노드": list(graph.nodes),
+        "이전유지": total - new - react_qty - resur_qty,
+        "신규": new,
+        "복귀비중": re_weight,
+        "복귀수": react_qty,
+        "부활비중": sur_weight,
+        "부활수": resur_qty,
+        "총활성": total,
+        "성공률": rate,
+        "이탈률": 1 - rate,
+        "성공수": total * rate,
+        "이탈수": total * (1 - rate),
+    })
+
+
+def solve_steady_state(graph, params):
+    """engine.solve_steady_state 의 그래프 버전 (선형 체인에서는 같은 값)"""
+    M, b, _, _ = cycle_operator(
+        graph, params.success_rate, params.re_weight, params.sur_weight,
+        params.risk_conversion, params.new_users,
+    )
+    if engine._spectral_radius(M) >= 1.0 - 1e-12:
+        # 기존 반복 근사와 같게: 표는 POOL_ITERATIONS - 1 회 상태, Pool 은 마지막 상태
+        z = np.zeros(3)
+        for _ in range(engine.POOL_ITERATIONS - 1):
+            z = M @ z + b
+        table = node_rows(graph, params, *z)
+        risk = engine.risk_pipeline(float(table["이탈수"].sum()), params.risk_conversion)
+        return engine.SteadyState(
+            table=table, risk=risk, react_pool=risk.react_pool, sur_pool=risk.sur_pool, exact=False,
+        )
+
+    z = np.linalg.solve(np.eye(3) - M, b)
+    table = node_rows(graph, params, *(float(v) for v in z))
+    risk = engine.risk_pipeline(float(table["이탈수"].sum()), params.risk_conversion)
+    gap = np.abs(np.linalg.matrix_power(M, engine.POOL_ITERATIONS) @ z)
+    return engine.SteadyState(
+        table=table,
+        risk=risk,
+        react_pool=risk.react_pool,
+        sur_pool=risk.sur_pool,
+        iteration_gap=tuple(float(v) for v in gap),
+    )
+
+
+def run_forecast(graph, params):
+    """engine.run_forecast 의 그래프 버전 (params: engine.ForecastParams, 노드별 값은 graph.nodes 순서)"""
+    funnel = params.funnel
+    inflow = engine.forecast_inflow(params.new_user_weight, params.cycle_new_users)
+    M, b, dead_row, dead_b = cycle_operator(
+        graph, funnel.success_rate, funnel.re_weight, funnel.sur_weight, funnel.risk_conversion, inflow,
+    )
+    z0 = np.array([float(params.initial_users), 0.0, 0.0])
+    trajectory = engine.iterate_operator(M, b, dead_row, dead_b, z0, params.num_cycles)
+    return engine.Forecast(table=engine.forecast_frame(trajectory))
@@ -0,0 +1,509 @@
+"""이벤트 로그 → 경기별 노드 퍼널 (스트리밍 집계)
+
+앱 이벤트 로그 (user_id, timestamp, match_id, event) CSV/Parquet 를 청크 단위로 읽어
+경기별·노드별 df 열 (이전유지, 신규, 복귀수, 부활수, 총활성, 성공수, 이탈수) 과
+리스크 파이프라인 (At Risk DAU → WAU → Dead) 표를 만든다.
+
+    python ingest.py logs/*.parquet --kickoffs kickoffs.csv -o out/
+    python ingest.py events.csv --kickoffs kickoffs.csv -o out/ --checkpoint out/ckpt   # 중단 후 같은 명령으로 이어서
+
+킥오프 표는 match_id, kickoff 두 열. 이벤트는 match_id 경기의 킥오프 기준 시각으로 다섯 노드에
+배정한다 (PhaseWindows, 분 단위). 경기 이벤트가 아니거나 창 밖인 이벤트도 리스크 판정용 활동으로 센다.
+
+청크마다 이벤트를 (경기, 유저, 비트마스크) 로 줄이고 같은 (경기, 유저) 끼리 비트 OR 로 합치므로
+메모리는 이벤트 수가 아니라 (유저, 경기) 쌍 수에 비례한다. 비트 OR 은 같은 이벤트를 두 번
+넣어도 결과가 같아서, 체크포인트 사이에 중단돼 일부 청크를 다시 읽어도 집계가 틀어지지 않는다.
+유저는 64비트 해시로 구분한다 (1억 명에서 충돌 확률 ~3e-4).
+
+한 경기 안에서의 유저 경로 = 처음 활동한 노드부터 연속으로 활동한 노드까지.
+- 노드 p 성공: 경로가 p 다음 노드까지 이어짐. 경기직후 성공 = 다음 경기 경기전부터 다시 시작
+  (다음 경기 경기전 이전유지). 경로 뒤 같은 경기에서 다시 나타난 활동은 퍼널에 넣지 않는다.
+- 진입 (경로 시작) 분류: 처음 보는 유저 = 신규, 지난 경기 React Pool = 복귀, 그 밖의 기존 유저 = 부활
+- 리스크: 경기 이탈 유저가 경기 종료 후 dau_days 안에 경기 사이 활동 (노드에 배정되지 않은 이벤트)
+  = At Risk DAU 성공, 아니면 wau_days 안에 활동 = WAU 성공 (둘 다 React Pool), 남은 Dead 단계 중
+  다음 경기에 돌아온 유저 = Dead 성공 (Sur Pool). 다음 경기 이벤트는 판정에 쓰지 않는다.
+
+마지막 경기는 다음 경기가 없으므로 경기직후 유저가 모두 이탈로, Dead 성공이 0 으로 잡힌다.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import batch
+import engine
+
+# 이벤트 로그 열
+EVENT_COLUMNS = ("user_id", "timestamp", "match_id", "event")
+
+# 킥오프 표 열
+KICKOFF_COLUMNS = ("match_id", "kickoff")
+
+# 한 번에 읽을 행 수
+CHUNK_SIZE = 1_000_000
+
+# 이 행 수만큼 쌓이면 (경기, 유저) 쌍을 합친다
+COMPACT_ROWS = 5_000_000
+
+# 체크포인트 저장 간격 (초)
+CHECKPOINT_INTERVAL = 60.0
+
+# 비트마스크: 노드 0~4, 경기 후 DAU 창 활동, WAU 창 활동
+_PHASE_BITS = (1 << len(engine.NODES)) - 1
+_DAU_BIT = 1 << len(engine.NODES)
+_WAU_BIT = 1 << (len(engine.NODES) + 1)
+
+_MINUTE = 60 * 10**9
+_DAY = 24 * 60 * _MINUTE
+
+
+@dataclass(frozen=True)
+class PhaseWindows:
+    """킥오프 기준 노드 경계 (분) 와 경기 후 리스크 판정 창 (일)
+
+    edges[i] ≤ 킥오프 후 경과 < edges[i+1] 인 이벤트가 노드 i. 경기 종료 = 킥오프 + edges[-1].
+    """
+    edges: tuple = (-60, 0, 50, 65, 115, 175)
+    dau_days: float = 1.0
+    wau_days: float = 7.0
+
+    def __post_init__(self):
+        if len(self.edges) != len(engine.NODES) + 1 or any(a >= b for a, b in zip(self.edges, self.edges[1:])):
+            raise ValueError(f"노드 경계는 증가하는 {len(engine.NODES) + 1}개 값이어야 합니다")
+        if not 0 < self.dau_days <= self.wau_days:
+            raise ValueError("리스크 창은 0 < DAU 일수 ≤ WAU 일수 여야 합니다")
+
+
+@dataclass(frozen=True, eq=False)
+class Kickoffs:
+    """킥오프 순서로 정렬한 경기 목록 (시각은 UTC ns)"""
+    match_ids: pd.Index
+    kickoff: np.ndarray
+
+    @classmethod
+    def from_table(cls, table):
+        missing = [c for c in KICKOFF_COLUMNS if c not in table.columns]
+        if missing:
+            raise ValueError(f"킥오프 표에 열이 없습니다: {', '.join(missing)}")
+        kickoff = _to_ns(table["kickoff"])
+        if (kickoff < 0).any():
+            raise ValueError("킥오프 시각을 읽을 수 없는 행이 있습니다")
+        ids = table["match_id"].astype(str).str.strip()
+        if ids.duplicated().any():
+            raise ValueError("킥오프 표에 중복된 match_id 가 있습니다")
+        order = np.argsort(kickoff, kind="stable")
+        return cls(match_ids=pd.Index(ids.to_numpy()[order]), kickoff=kickoff[order])
+
+    def __len__(self):
+        return len(self.match_ids)
+
+    @property
+    def key(self):
+        return engine.digest((tuple(self.match_ids), tuple(int(k) for k in self.kickoff)))
+
+
+@dataclass
+class IngestStats:
+    """처리량 보고용 누계"""
+    rows: int = 0
+    phase_rows: int = 0  # 노드에 배정된 이벤트
+    skipped_rows: int = 0  # 시각을 읽을 수 없거나 event 필터에 걸린 행
+    chunks: int = 0
+    pairs: int = 0  # 합친 뒤 (경기, 유저) 쌍
+    elapsed: float = 0.0
+    files: dict = field(default_factory=dict)  # 파일 경로 → 읽은 행 수
+    done_files: list = field(default_factory=list)
+
+    @property
+    def rows_per_second(self):
+        return self.rows / max(self.elapsed, 1e-9)
+
+
+@dataclass(frozen=True, eq=False)
+class IngestResult:
+    nodes: pd.DataFrame  # 경기 + df 열
+    risk: pd.DataFrame  # 경기 + RiskPipeline.to_frame 열
+    stats: IngestStats
+
+
+# ==================== 읽기 ====================
+def _to_ns(values):
+    """시각 열 → UTC 기준 int64 ns (숫자는 epoch 초, 읽을 수 없으면 -1)"""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        parsed = pd.to_datetime(values, unit="s", utc=True, errors="coerce")
+    else:
+        parsed = pd.to_datetime(values, utc=True, errors="coerce", format="ISO8601")
+    out = parsed.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    return np.where(parsed.isna().to_numpy(), -1, out)
+
+
+def load_kickoffs(path):
+    return Kickoffs.from_table(pd.read_csv(path, dtype={"match_id": str}, encoding="utf-8-sig"))
+
+
+def iter_chunks(path, chunk_size=CHUNK_SIZE, skip_rows=0):
+    """파일을 chunk_size 행씩 읽는다 (앞 skip_rows 행은 건너뜀) → DataFrame 반복자"""
+    path = Path(path)
+    if path.suffix.lower() == ".parquet":
+        if not batch.parquet_available():
+            raise ValueError("parquet 입력에는 pyarrow 가 필요합니다")
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        columns = [c for c in EVENT_COLUMNS if c in parquet.schema_arrow.names]
+        seen = 0
+        for record_batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+            if seen + record_batch.num_rows <= skip_rows:
+                seen += record_batch.num_rows
+                continue
+            frame = record_batch.to_pandas()
+            if seen < skip_rows:
+                frame = frame.iloc[skip_rows - seen:]
+            seen += record_batch.num_rows
+            yield frame
+    else:
+        reader = pd.read_csv(
+            path, chunksize=chunk_size, usecols=lambda c: c in EVENT_COLUMNS,
+            dtype={"user_id": str, "match_id": str, "event": str},
+            skiprows=range(1, skip_rows + 1) if skip_rows else None, encoding="utf-8-sig",
+        )
+        with reader:
+            yield from reader
+
+
+# ==================== 청크 집계 ====================
+def _compact(match, user, mask):
+    """같은 (유저, 경기) 의 비트마스크를 OR 로 합친다 → 유저·경기 순으로 정렬된 배열"""
+    if len(match) == 0:
+        return match, user, mask
+    order = np.lexsort((match, user))
+    match, user, mask = match[order], user[order], mask[order]
+    start = np.flatnonzero(np.r_[True, (user[1:] != user[:-1]) | (match[1:] != match[:-1])])
+    return match[start], user[start], np.bitwise_or.reduceat(mask, start)
+
+
+def chunk_pairs(frame, kickoffs, windows, event_types=None):
+    """이벤트 청크 → (경기 번호, 유저 해시, 비트마스크) 배열과 (노드 배정 행 수, 건너뛴 행 수)"""
+    missing = [c for c in ("user_id", "timestamp") if c not in frame.columns]
+    if missing:
+        raise ValueError(f"이벤트 로그에 열이 없습니다: {', '.join(missing)}")
+    keep = np.ones(len(frame), dtype=bool)
+    if event_types is not None and "event" in frame.columns:
+        keep &= frame["event"].astype(str).isin(event_types).to_numpy()
+    t = _to_ns(frame["timestamp"])
+    keep &= t >= 0
+    skipped = int((~keep).sum())
+    t = t[keep]
+    user = pd.util.hash_array(frame["user_id"].astype(str).to_numpy()[keep])
+
+    parts = []
+    # 노드 배정: 이벤트의 match_id 킥오프 기준 경과 시간
+    between = np.ones(len(t), dtype=bool)  # 노드에 배정되지 않은 (경기 사이) 활동
+    phase_rows = 0
+    if "match_id" in frame.columns:
+        match = kickoffs.match_ids.get_indexer(frame["match_id"].astype(str).str.strip().to_numpy()[keep])
+        known = match >= 0
+        offset = t[known] - kickoffs.kickoff[match[known]]
+        edges = np.round(np.asarray(windows.edges, dtype=float) * _MINUTE).astype(np.int64)
+        phase = np.searchsorted(edges, offset, side="right") - 1
+        inside = (phase >= 0) & (phase < len(engine.NODES))
+        phase_rows = int(inside.sum())
+        between[np.flatnonzero(known)[inside]] = False
+        parts.append((
+            match[known][inside].astype(np.int32),
+            user[known][inside],
+            (1 << phase[inside]).astype(np.uint8),
+        ))
+
+    # 리스크 창: 경기 사이 활동 시각 기준 (t - 창, t) 안에 끝난 모든 경기에 활동 비트
+    t, user = t[between], user[between]
+    ends = kickoffs.kickoff + int(round(windows.edges[-1] * _MINUTE))
+    hi = np.searchsorted(ends, t, side="left")
+    for days, bit in ((windows.wau_days, _WAU_BIT), (windows.dau_days, _DAU_BIT)):
+        lo = np.searchsorted(ends, t - int(days * _DAY), side="left")
+        count = hi - lo
+        rows = np.repeat(np.arange(len(t)), count)
+        first = np.repeat(lo - np.r_[0, np.cumsum(count)[:-1]], count)
+        parts.append((
+            (first + np.arange(len(rows))).astype(np.int32),
+            user[rows],
+            np.full(len(rows), bit, dtype=np.uint8),
+        ))
+
+    match, user, mask = (np.concatenate(a) for a in zip(*parts))
+    return _compact(match, user, mask), phase_rows, skipped
+
+
+class Aggregator:
+    """청크 결과를 쌓고 가끔 합친다 (메모리 ≈ (유저, 경기) 쌍 수)"""
+
+    def __init__(self, pairs=None):
+        empty = (np.empty(0, np.int32), np.empty(0, np.uint64), np.empty(0, np.uint8))
+        self.pairs = pairs if pairs is not None else empty
+        self.pending = []
+        self.pending_rows = 0
+
+    def add(self, pairs):
+        self.pending.append(pairs)
+        self.pending_rows += len(pairs[0])
+        if self.pending_rows > max(COMPACT_ROWS, len(self.pairs[0])):
+            self.compact()
+
+    def compact(self):
+        if self.pending:
+            self.pairs = _compact(*(np.concatenate(a) for a in zip(self.pairs, *self.pending)))
+            self.pending, self.pending_rows = [], 0
+        return self.pairs
+
+
+# ==================== 퍼널 만들기 ====================
+# 노드 비트 → 경로 시작 노드 / 경로 끝 노드 (첫 활동 노드부터 연속 구간)
+_RUN_START = np.array(
+    [(m & -m).bit_length() - 1 if m else -1 for m in range(1 << len(engine.NODES))], dtype=np.int8
+)
+_RUN_END = np.array([
+    -1 if not m else next(
+        (p - 1 for p in range(_RUN_START[m] + 1, len(engine.NODES)) if not m >> p & 1), len(engine.NODES) - 1
+    )
+    for m in range(1 << len(engine.NODES))
+], dtype=np.int8)
+
+
+def build_tables(pairs, kickoffs, risk_labels=engine.RISK_STAGE_LABELS):
+    """유저·경기 순으로 정렬된 (경기, 유저, 비트마스크) → (노드 표, 리스크 표)"""
+    match, user, mask = pairs
+    n_matches, n_nodes = len(kickoffs), len(engine.NODES)
+    last = n_nodes - 1
+    phases = mask & _PHASE_BITS
+    start, end = _RUN_START[phases], _RUN_END[phases]
+    active = phases > 0
+
+    # 같은 유저의 바로 앞/뒤 경기 기록
+    same_prev = np.r_[False, (user[1:] == user[:-1]) & (match[1:] == match[:-1] + 1)]
+    same_next = np.r_[same_prev[1:], False]
+    prev_end = np.where(same_prev, np.roll(end, 1), -1).astype(np.int8)
+    next_start = np.where(same_next, np.roll(start, -1), -1).astype(np.int8)
+
+    carried_in = active & (start == 0) & (prev_end == last)
+    carried_out = active & (end == last) & (next_start == 0)
+    churned = active & ~carried_out
+    dau = churned & ((mask & _DAU_BIT) > 0)
+    wau = churned & ~dau & ((mask & _WAU_BIT) > 0)
+    dead = churned & ~dau & ~wau
+    revived_next = dead & (next_start >= 0)
+
+    # 처음 활동한 경기 (유저별 누적 활동 기록 수가 1 인 기록)
+    new_user = np.r_[True, user[1:] != user[:-1]]
+    seen = np.cumsum(active)
+    group_start = np.maximum.accumulate(np.where(new_user, np.arange(len(user)), 0))
+    first = active & (seen - np.r_[0, seen[:-1]][group_start] == 1)
+
+    prev_react = np.r_[False, (dau | wau)[:-1]] & same_prev
+    entering = active & ~carried_in
+    entry_new = entering & first
+    entry_react = entering & ~first & prev_react
+    entry_revive = entering & ~first & ~prev_react
+
+    def grid(rows, node):
+        return np.bincount(match[rows] * n_nodes + node[rows], minlength=n_matches * n_nodes).reshape(n_matches, n_nodes)
+
+    # 노드별 총활성: 경로 [시작, 끝] 구간에 +1 (차분 후 누적합)
+    span = np.zeros((n_matches, n_nodes + 1), dtype=np.int64)
+    np.add.at(span, (match[active], start[active]), 1)
+    np.add.at(span, (match[active], end[active] + 1), -1)
+    total = np.cumsum(span[:, :n_nodes], axis=1)
+    churn = grid(churned, end)
+    success = total - churn
+    carried = np.zeros((n_matches, n_nodes), dtype=np.int64)
+    carried[:, 0] = np.bincount(match[carried_in], minlength=n_matches)
+    carried[:, 1:] = success[:, :-1]
+
+    ids = np.asarray(kickoffs.match_ids)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = np.where(total > 0, success / np.maximum(total, 1), np.nan)
+    nodes = pd.DataFrame({
+        "경기": np.repeat(ids, n_nodes),
+        "노드": np.tile(engine.NODES, n_matches),
+        "이전유지": carried.ravel(),
+        "신규": grid(entry_new, start).ravel(),
+        "복귀수": grid(entry_react, start).ravel(),
+        "부활수": grid(entry_revive, start).ravel(),
+        "총활성": total.ravel(),
+        "성공률": rate.ravel(),
+        "이탈률": 1 - rate.ravel(),
+        "성공수": success.ravel(),
+        "이탈수": churn.ravel(),
+    })
+
+    count = lambda rows: np.bincount(match[rows], minlength=n_matches)  # noqa: E731
+    dau_pool = count(churned)
+    dau_success = count(dau)
+    wau_pool = dau_pool - dau_success
+    wau_success = count(wau)
+    dead_pool = wau_pool - wau_success
+    dead_success = count(revived_next)
+    stages = (
+        (dau_pool, dau_success), (wau_pool, wau_success), (dead_pool, dead_success),
+    )
+    risk_rows = []
+    for i, match_id in enumerate(ids):
+        for label, (pool, succ) in zip(risk_labels, stages):
+            conversion = succ[i] / pool[i] if pool[i] else np.nan
+            risk_rows.append({
+                "경기": match_id,
+                "단계": label,
+                "인원": pool[i],
+                "전환율": conversion,
+                "성공수": succ[i],
+                "손실율": 1 - conversion,
+                "손실수": pool[i] - succ[i],
+            })
+    return nodes, pd.DataFrame(risk_rows)
+
+
+# ==================== 체크포인트 ====================
+def _checkpoint_meta(kickoffs, windows, chunk_size, event_types):
+    return {
+        "kickoffs": kickoffs.key,
+        "windows": engine.digest(windows),
+        "chunk_size": int(chunk_size),
+        "event_types": sorted(event_types) if event_types is not None else None,
+    }
+
+
+def save_checkpoint(path, aggregator, stats, meta):
+    """(경기, 유저) 쌍과 파일별 읽은 행 수를 저장한다 (임시 파일에 쓴 뒤 교체)"""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    match, user, mask = aggregator.compact()
+    with open(path / "pairs.npz.tmp", "wb") as f:
+        np.savez(f, match=match, user=user, mask=mask)
+    os.replace(path / "pairs.npz.tmp", path / "pairs.npz")
+    state = {"meta": meta, "stats": asdict(stats)}
+    (path / "state.json.tmp").write_text(json.dumps(state, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(path / "state.json.tmp", path / "state.json")
+
+
+def load_checkpoint(path, meta):
+    """저장된 체크포인트 → (Aggregator, IngestStats). 없으면 (None, None), 설정이 다르면 ValueError"""
+    path = Path(path)
+    if not (path / "state.json").exists():
+        return None, None
+    state = json.loads((path / "state.json").read_text(encoding="utf-8"))
+    if state["meta"] != meta:
+        raise ValueError("체크포인트의 킥오프 / 노드 경계 / 청크 크기 / event 필터가 지금 설정과 다릅니다")
+    with np.load(path / "pairs.npz") as data:
+        pairs = (data["match"], data["user"], data["mask"])
+    return Aggregator(pairs), IngestStats(**state["stats"])
+
+
+# ==================== 실행 ====================
+def ingest(paths, kickoffs, windows=PhaseWindows(), chunk_size=CHUNK_SIZE, event_types=None,
+           checkpoint=None, checkpoint_interval=CHECKPOINT_INTERVAL, progress=None):
+    """이벤트 파일들을 청크로 읽어 IngestResult 를 만든다
+
+    checkpoint 폴더가 있으면 저장된 지점부터 이어서 읽고, checkpoint_interval 초마다와 파일이
+    끝날 때 저장한다. progress(IngestStats) 콜백은 청크마다 부른다.
+    """
+    event_types = set(event_types) if event_types is not None else None
+    meta = _checkpoint_meta(kickoffs, windows, chunk_size, event_types)
+    aggregator, stats = load_checkpoint(checkpoint, meta) if checkpoint else (None, None)
+    aggregator = aggregator or Aggregator()
+    stats = stats or IngestStats()
+
+    start = time.perf_counter() - stats.elapsed
+    last_save = time.perf_counter()
+    for path in map(str, paths):
+        if path in stats.done_files:
+            continue
+        for frame in iter_chunks(path, chunk_size, skip_rows=stats.files.get(path, 0)):
+            pairs, phase_rows, skipped = chunk_pairs(frame, kickoffs, windows, event_types)
+            aggregator.add(pairs)
+            stats.rows += len(frame)
+            stats.phase_rows += phase_rows
+            stats.skipped_rows += skipped
+            stats.chunks += 1
+            stats.files[path] = stats.files.get(path, 0) + len(frame)
+            stats.elapsed = time.perf_counter() - start
+            if progress:
+                progress(stats)
+            if checkpoint and time.perf_counter() - last_save > checkpoint_interval:
+                stats.pairs = len(aggregator.compact()[0])
+                save_checkpoint(checkpoint, aggregator, stats, meta)
+                last_save = time.perf_counter()
+        stats.done_files.append(path)
+        if checkpoint:
+            stats.pairs = len(aggregator.compact()[0])
+            save_checkpoint(checkpoint, aggregator, stats, meta)
+            last_save = time.perf_counter()
+
+    pairs = aggregator.compact()
+    stats.pairs = len(pairs[0])
+    nodes, risk = build_tables(pairs, kickoffs)
+    stats.elapsed = time.perf_counter() - start
+    return IngestResult(nodes=nodes, risk=risk, stats=stats)
+
+
+def _print_progress(stats):
+    print(
+        f"\r{stats.rows:,}행 · {stats.rows_per_second:,.0f}행/초 · 청크 {stats.chunks}",
+        end="", file=sys.stderr, flush=True,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="이벤트 로그 → 경기별 노드 퍼널")
+    parser.add_argument("files", nargs="+", help="이벤트 로그 CSV/Parquet 파일")
+    parser.add_argument("--kickoffs", required=True, help="킥오프 표 CSV (match_id, kickoff)")
+    parser.add_argument("-o", "--out", default="ingest_output", help="출력 폴더 (기본: ingest_output)")
+    parser.add_argument("--format", choices=("parquet", "csv"), default=None,
+                        help="출력 형식 (기본: pyarrow 가 있으면 parquet, 없으면 csv)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help=f"한 번에 읽을 행 수 (기본: {CHUNK_SIZE:,})")
+    parser.add_argument("--edges", type=float, nargs=len(engine.NODES) + 1, default=None,
+                        metavar="분", help="킥오프 기준 노드 경계 (분, 6개)")
+    parser.add_argument("--dau-days", type=float, default=PhaseWindows.dau_days, help="At Risk DAU 판정 창 (일)")
+    parser.add_argument("--wau-days", type=float, default=PhaseWindows.wau_days, help="At Risk WAU 판정 창 (일)")
+    parser.add_argument("--event-types", nargs="+", default=None, help="활동으로 셀 event 값 (기본: 전부)")
+    parser.add_argument("--checkpoint", default=None, help="체크포인트 폴더 (있으면 이어서 읽음)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="진행 표시 생략")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if batch.parquet_available() else "csv")
+    if fmt == "parquet" and not batch.parquet_available():
+        parser.error("parquet 출력에는 pyarrow 가 필요합니다 (--format csv 를 쓰세요)")
+    try:
+        windows = PhaseWindows(
+            edges=tuple(args.edges) if args.edges else PhaseWindows.edges,
+            dau_days=args.dau_days, wau_days=args.wau_days,
+        )
+        kickoffs = load_kickoffs(args.kickoffs)
+        result = ingest(
+            args.files, kickoffs, windows, chunk_size=args.chunk_size, event_types=args.event_types,
+            checkpoint=args.checkpoint, progress=None if args.quiet else _print_progress,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    if not args.quiet:
+        print(file=sys.stderr)
+
+    paths = batch.write_tables({"nodes": result.nodes, "risk": result.risk}, args.out, fmt)
+    stats = result.stats
+    print(
+        f"완료: 경기 {len(kickoffs):,}개 · 이벤트 {stats.rows:,}행 (노드 배정 {stats.phase_rows:,} / "
+        f"건너뜀 {stats.skipped_rows:,}) · (경기, 유저) 쌍 {stats.pairs:,}개\n"
+        f"  {stats.elapsed:.2f}초 · 처리량 {stats.rows_per_second:,.0f}행/초",
+        file=sys.stderr,
+    )
+    for path in paths:
+        print(f"  → {path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""동시 세션 부하 테스트 (AppTest 세션을 워커 프로세스에서 동시에 실행)
+
+팀 전체가 서버 하나를 쓸 때 여러 명이 동시에 슬라이더를 움직이면 얼마나 느려지는지 잰다.
+세션 수마다 워커 프로세스 N 개가 각각 app.py 세션을 열고, 준비가 끝나면 동시에 상호작용
+스크립트를 재생한다:
+
+  drag    콘텐츠 점수 슬라이더(endo_val_*)를 몇 칸 연속으로 움직이고 ✅ 대시보드에 반영
+  view    다른 화면으로 전환
+  cycles  예측 사이클 수(num_cycles) 변경 (예상치 관리 화면이 아니면 먼저 전환)
+
+    python loadtest.py --sessions 1 2 4 8 --actions 20 -o loadtest_results.json
+    python loadtest.py --sessions 4 8 --baseline loadtest_baseline.json   # p95 배율로 회귀 확인
+
+재실행 지연 백분위수(ms), 처리량(재실행/초), CPU 시간·사용률, 워커 최대 RSS 를 세션 수별로 보고한다.
+워커는 프로세스마다 st.cache_data 를 따로 가지므로 한 서버 프로세스에서 캐시를 공유하는 실제
+배포보다 캐시 적중이 적다 (지연은 보수적으로 나온다).
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from multiprocessing import Manager
+from pathlib import Path
+
+import numpy as np
+
+import bench
+
+try:
+    import resource  # Unix 전용 (최대 RSS)
+except ImportError:
+    resource = None
+
+# 결과 파일 형식 버전
+RESULTS_VERSION = 1
+
+# 상호작용 종류와 선택 비중
+ACTIONS = {"drag": 0.5, "view": 0.3, "cycles": 0.2}
+# 보고할 지연 백분위수
+PERCENTILES = (50, 90, 95, 99)
+# 슬라이더 한 칸 (app 의 endo_val_* step)
+SLIDER_STEP = 0.05
+
+
+@dataclass(frozen=True)
+class LoadSettings:
+    """세션 하나의 재생 설정"""
+    actions: int = 20
+    think: float = 0.3  # 상호작용 사이 평균 대기 (초)
+    seed: int = 0
+    timeout: float = 120.0  # AppTest 실행 1회 제한 (초)
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 는 KB, macOS 는 byte
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def interaction_script(rng, slider_keys, views, actions):
+    """무작위 상호작용 목록 [(종류, 인자…)]"""
+    kinds = list(ACTIONS)
+    weights = np.array(list(ACTIONS.values()))
+    script = []
+    for kind in rng.choice(kinds, size=actions, p=weights / weights.sum()):
+        if kind == "drag":
+            script.append(("drag", str(rng.choice(slider_keys)), int(rng.choice([-1, 1])), int(rng.integers(2, 6))))
+        elif kind == "view":
+            script.append(("view", str(rng.choice(views))))
+        else:
+            script.append(("cycles", int(rng.integers(1, 51))))
+    return script
+
+
+class Session:
+    """AppTest 세션 하나 — 실행마다 (종류, 지연 ms) 를 기록한다
+
+    실행이 실패하면 (스크립트 예외, 시간 초과) 지연 대신 errors 에 남기고 계속한다.
+    """
+
+    def __init__(self, script_path, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(script_path, default_timeout=timeout)
+        self.latencies = []
+        self.errors = []
+
+    def run(self, kind):
+        start = time.perf_counter()
+        try:
+            self.at.run()
+        except Exception as e:  # AppTest 시간 초과 등: 이 실행만 실패로 기록
+            self.errors.append(f"{kind}: {type(e).__name__}: {e}")
+            return
+        self.latencies.append((kind, (time.perf_counter() - start) * 1000))
+        if self.at.exception:
+            self.errors.append(f"{kind}: {self.at.exception[0].value}")
+
+    @property
+    def views(self):
+        return list(self.at.radio(key="view").options)
+
+    def show(self, view):
+        self.at.radio(key="view").set_value(view)
+        self.run("view")
+
+    def drag(self, key, direction, steps):
+        slider = self.at.slider(key=key)
+        value = float(slider.value)
+        for _ in range(steps):
+            value = min(max(round(value + direction * SLIDER_STEP, 2), 0.0), 1.0)
+            self.at.slider(key=key).set_value(value)
+            self.run("drag")
+        self.at.button(key="factor_apply").click()
+        self.run("apply")
+
+    def set_cycles(self, num_cycles):
+        if not any(s.key == "num_cycles" for s in self.at.slider):
+            self.show(self.views[0])  # 예상치 관리 (VIEWS 첫 화면)
+        self.at.slider(key="num_cycles").set_value(num_cycles)
+        self.run("cycles")
+
+
+def run_session(index, settings, barrier):
+    """워커: 세션을 열고 모두 준비되면 스크립트를 재생한다 → 세션 결과 dict"""
+    rng = np.random.default_rng([settings.seed, index])
+    try:
+        session = Session(str(Path(__file__).with_name("app.py")), settings.timeout)
+        session.run("first_run")
+        if not session.latencies:
+            raise RuntimeError(f"첫 실행 실패 — {session.errors[-1]}")
+        slider_keys = [s.key for s in session.at.slider if s.key and s.key.startswith("endo_val_")]
+        script = interaction_script(rng, slider_keys, session.views, settings.actions)
+    except BaseException:
+        barrier.abort()  # 다른 워커가 기다리지 않도록
+        raise
+    first_run = session.latencies.pop()
+    ready_rss = _peak_rss_mb()
+
+    barrier.wait()
+    cpu_start = time.process_time()
+    wall_start = time.time()
+    for action in script:
+        time.sleep(settings.think * rng.uniform(0.5, 1.5))
+        kind, *args = action
+        try:
+            if kind == "drag":
+                session.drag(*args)
+            elif kind == "view":
+                session.show(*args)
+            else:
+                session.set_cycles(*args)
+        except Exception as e:  # 앞 실행이 실패해 위젯이 없는 경우 등: 이 동작만 실패로 기록
+            session.errors.append(f"{kind}: {type(e).__name__}: {e}")
+    return {
+        "index": index,
+        "first_run_ms": first_run[1],
+        "latencies": session.latencies,
+        "errors": session.errors,
+        "cpu_s": time.process_time() - cpu_start,
+        "wall_start": wall_start,
+        "wall_end": time.time(),
+        "ready_rss_mb": ready_rss,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def run_load(sessions, settings):
+    """세션 N 개를 워커 프로세스 N 개에서 동시에 재생 → 세션 결과 목록"""
+    with Manager() as manager:
+        barrier = manager.Barrier(sessions)
+        with ProcessPoolExecutor(max_workers=sessions) as pool:
+            futures = [pool.submit(run_session, i, settings, barrier) for i in range(sessions)]
+            return [f.result() for f in futures]
+
+
+def _percentiles(values):
+    if not values:
+        return {f"p{p}": None for p in PERCENTILES}
+    return {f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def summarize(sessions, results):
+    """세션 결과 → 세션 수 하나의 요약 행"""
+    latencies = [ms for r in results for _, ms in r["latencies"]]
+    wall = max(r["wall_end"] for r in results) - min(r["wall_start"] for r in results)
+    cpu = sum(r["cpu_s"] for r in results)
+    by_action = {}
+    for kind in dict.fromkeys(kind for r in results for kind, _ in r["latencies"]):
+        values = [ms for r in results for k, ms in r["latencies"] if k == kind]
+        by_action[kind] = {"count": len(values), **_percentiles(values)}
+    peaks = [r["peak_rss_mb"] for r in results if r["peak_rss_mb"] is not None]
+    growth = [r["peak_rss_mb"] - r["ready_rss_mb"] for r in results if r["peak_rss_mb"] is not None]
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "errors": [e for r in results for e in r["errors"]],
+        **_percentiles(latencies),
+        "max": max(latencies, default=None),
+        "first_run_p50": statistics.median(r["first_run_ms"] for r in results),
+        "wall_s": wall,
+        "reruns_per_s": len(latencies) / max(wall, 1e-9),
+        "cpu_s": cpu,
+        "cpu_util": cpu / max(wall * (os.cpu_count() or 1), 1e-9),
+        "peak_rss_mb": max(peaks, default=None),
+        "rss_growth_mb": statistics.mean(growth) if growth else None,
+        "by_action": by_action,
+    }
+
+
+def compare(rows, baseline, threshold):
+    """같은 세션 수의 p95 배율 (현재 / 기준선)"""
+    base = {r["sessions"]: r for r in baseline.get("results", []) if r.get("p95")}
+    out = []
+    for r in rows:
+        if r["sessions"] not in base or not r["p95"]:
+            continue
+        ratio = r["p95"] / base[r["sessions"]]["p95"]
+        out.append({
+            "sessions": r["sessions"],
+            "baseline_p95": base[r["sessions"]]["p95"],
+            "p95": r["p95"],
+            "ratio": ratio,
+            "regression": bool(ratio > threshold),
+        })
+    return out
+
+
+def _fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def _print_report(rows, comparison):
+    ratios = {c["sessions"]: c for c in comparison}
+    print(f"{'세션':>4} {'재실행':>6} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'최대':>8} "
+          f"{'재실행/초':>9} {'CPU초':>7} {'CPU%':>5} {'RSS MB':>7} {'증가 MB':>7}")
+    for r in rows:
+        line = (
+            f"{r['sessions']:>4} {r['reruns']:>6} {_fmt(r['p50'], '8.0f')} {_fmt(r['p90'], '8.0f')} "
+            f"{_fmt(r['p95'], '8.0f')} {_fmt(r['p99'], '8.0f')} {_fmt(r['max'], '8.0f')} "
+            f"{r['reruns_per_s']:>9.1f} {r['cpu_s']:>7.1f} {r['cpu_util']:>5.0%} "
+            f"{_fmt(r['peak_rss_mb'], '7.0f')} {_fmt(r['rss_growth_mb'], '7.1f')}"
+        )
+        c = ratios.get(r["sessions"])
+        if c is not None:
+            line += f"  p95 ×{c['ratio']:.2f}" + (" ⚠️ 회귀" if c["regression"] else "")
+        print(line)
+        for error in r["errors"][:3]:
+            print(f"     ✗ {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DAU Funnel 동시 세션 부하 테스트")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8], help="동시 세션 수 (기본: 1 2 4 8)")
+    parser.add_argument("--actions", type=int, default=LoadSettings.actions, help="세션별 상호작용 수 (기본: 20)")
+    parser.add_argument("--think", type=float, default=LoadSettings.think,
+                        help="상호작용 사이 평균 대기 초 (기본: 0.3, 0 이면 쉬지 않음)")
+    parser.add_argument("--seed", type=int, default=LoadSettings.seed, help="스크립트 난수 시드")
+    parser.add_argument("-o", "--out", default="loadtest_results.json", help="결과 JSON (기본: loadtest_results.json)")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON (세션 수별 p95)")
+    parser.add_argument("--threshold", type=float, default=1.25, help="회귀로 볼 p95 배율 (기본: 1.25)")
+    args = parser.parse_args(argv)
+
+    if any(n < 1 for n in args.sessions):
+        parser.error("--sessions 는 1 이상이어야 합니다")
+    if args.baseline and not Path(args.baseline).exists():
+        parser.error(f"기준선 파일이 없습니다: {args.baseline}")
+    settings = LoadSettings(actions=args.actions, think=args.think, seed=args.seed)
+
+    start = time.perf_counter()
+    rows = []
+    # 세션이 사용자의 시나리오 저장소를 건드리지 않도록 임시 DB 를 쓴다
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("DAU_FUNNEL_DB", str(Path(tmp) / "scenarios.db"))
+        for n in args.sessions:
+            print(f"세션 {n}개 실행 중…", file=sys.stderr, flush=True)
+            rows.append(summarize(n, run_load(n, settings)))
+
+    comparison = []
+    if args.baseline:
+        comparison = compare(rows, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.threshold)
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": bench.machine_info(),
+        "settings": asdict(settings),
+        "results": rows,
+        "baseline": args.baseline,
+        "comparison": comparison,
+    }
+    Path(args.out).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    _print_report(rows, comparison)
+    errors = sum(len(r["errors"]) for r in rows)
+    regressions = [c for c in comparison if c["regression"]]
+    print(f"\n완료 {time.perf_counter() - start:.1f}초 · CPU {os.cpu_count()}개 · → {args.out}", file=sys.stderr)
+    if errors:
+        print(f"  ✗ 앱 오류 {errors}건", file=sys.stderr)
+    if comparison:
+        print(f"  기준선 비교 {len(comparison)}개 · 회귀 {len(regressions)}개 (p95 ×{args.threshold:g} 초과)",
+              file=sys.stderr)
+    return 1 if errors or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""유저 단위 마이크로시뮬레이션
+
+engine.run_forecast 는 유저 수를 소수로 흘려보내지만 (총활성 × 성공률), 여기서는 유저 한 명이
+압축된 NumPy 배열의 한 행이다 (상태 int8, 위험 사이클 수 uint16, 유입 코호트 uint16).
+매 사이클 유저는 진입 노드에서부터 노드마다 성공률대로 통과/이탈을 뽑고, 이탈한 유저는
+At Risk DAU → WAU → Dead 파이프라인을 전환율대로 거쳐 React Pool / Sur Pool / 완전 이탈이 된다.
+
+사이클마다 살아 있는 유저를 CHUNK_SIZE 행씩 나눠 처리하고, 완전 이탈한 유저는 코호트별 개수만
+남기고 배열에서 지우므로 메모리는 살아 있는 유저 수 × 5바이트 + 청크 임시 배열로 묶인다.
+집계(Forecast 표 / 노드 표 / 리스크 표)의 기댓값은 결정론 결과 (sim_df / df) 와 같다.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import engine
+
+# 유저 상태 (int8)
+ACTIVE, REACT, SUR, DEAD, LAPSED = range(5)
+STATE_LABELS = ("활성", "React Pool", "Sur Pool", "완전 이탈", "미복귀")
+
+# 한 번에 처리할 유저 수 (청크 임시 배열 상한)
+CHUNK_SIZE = 1_000_000
+
+# 노드 표 / 리스크 표 열
+NODE_COUNT_COLUMNS = ("총활성", "성공수", "이탈수")
+RISK_COUNT_COLUMNS = (
+    "at_risk_dau_pool", "at_risk_dau_success",
+    "at_risk_wau_pool", "at_risk_wau_success",
+    "dead_users_pool", "dead_users_success",
+)
+
+_DAYS_MAX = np.iinfo(np.uint16).max
+
+
+@dataclass(frozen=True, eq=False)
+class Population:
+    """살아 있는 유저 (행 = 유저)"""
+    state: np.ndarray   # int8, ACTIVE / REACT / SUR
+    days: np.ndarray    # uint16, 마지막 성공 이후 위험 상태로 보낸 사이클 수
+    cohort: np.ndarray  # uint16, 유입 사이클 (0 = 초기 유저)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros(0, np.int8), np.zeros(0, np.uint16), np.zeros(0, np.uint16))
+
+    def __len__(self):
+        return len(self.state)
+
+    @property
+    def nbytes(self):
+        return self.state.nbytes + self.days.nbytes + self.cohort.nbytes
+
+
+@dataclass(frozen=True, eq=False)
+class MicroResult:
+    """마이크로시뮬레이션 집계
+
+    forecast: (사이클, FORECAST_COLUMNS), nodes: (사이클, 노드, NODE_COUNT_COLUMNS),
+    risk: (사이클, RISK_COUNT_COLUMNS), cohort_active: (사이클, 코호트) 사이클 끝 활성 유저 수,
+    population: 마지막 사이클 뒤 살아 있는 유저, peak_users: 한 사이클에 처리한 최대 유저 수.
+    """
+    forecast: np.ndarray
+    nodes: np.ndarray
+    risk: np.ndarray
+    cohort_active: np.ndarray
+    population: Population
+    peak_users: int
+    elapsed: float
+
+    @property
+    def table(self):
+        """sim_df 와 같은 열의 표 (정수 유저 수)"""
+        return engine.forecast_frame(self.forecast)
+
+    def node_frame(self, cycle=-1):
+        """사이클 하나의 노드별 총활성/성공수/이탈수 (df 와 같은 열 이름)"""
+        frame = pd.DataFrame(self.nodes[cycle], columns=list(NODE_COUNT_COLUMNS))
+        frame.insert(0, "노드", list(engine.NODES))
+        return frame
+
+    def days_at_risk(self):
+        """Pool 에 있는 유저의 위험 사이클 수 분포 (사이클 수 → 유저 수)"""
+        pooled = self.population.state != ACTIVE
+        return pd.Series(np.bincount(self.population.days[pooled])).rename_axis("위험 사이클").rename("유저 수")
+
+
+# ==================== 전이 확률 ====================
+def _pass_thresholds(success_rate):
+    """C[k, j] = 노드 k 로 들어온 유저가 노드 j 까지 통과할 확률 (j < k 는 1)"""
+    rates = np.asarray(success_rate, dtype=float)
+    n = len(rates)
+    C = np.ones((n, n))
+    for k in range(n):
+        C[k, k:] = np.cumprod(rates[k:])
+    return C.astype(np.float32)
+
+
+def _route_thresholds(weight):
+    """Pool 유저의 진입 노드 누적 확률 (비중 합계가 1 보다 작으면 나머지는 미복귀, 크면 정규화)"""
+    weight = np.asarray(weight, dtype=float)
+    total = weight.sum()
+    if total > 1.0:
+        weight = weight / total
+    return np.cumsum(weight).astype(np.float32)
+
+
+def _risk_thresholds(risk_conversion):
+    """이탈 유저 한 명의 누적 확률 (React 로 복귀, Sur 로 부활) — 나머지는 완전 이탈"""
+    dau, wau, dead = risk_conversion
+    a = dau
+    b = a + (1 - dau) * wau
+    return np.float32(a), np.float32(b), np.float32(b + (1 - dau) * (1 - wau) * dead)
+
+
+def _stochastic_round(rng, x):
+    x = np.asarray(x, dtype=float)
+    base = np.floor(x)
+    return (base + (rng.random(x.shape) < x - base)).astype(np.int64)
+
+
+# ==================== 한 청크 ====================
+def _step(rng, entry, days, thresholds, counts):
+    """진입 노드 entry (-1 = 이번 사이클 미진입) 유저들의 한 사이클 → (새 상태, 새 위험 사이클 수)
+
+    counts 의 nodes (노드, 3) / risk (6,) 에 더한다.
+    """
+    C, (a, b, c) = thresholds["pass"], thresholds["risk"]
+    n_nodes = C.shape[0]
+    state = np.full(len(entry), LAPSED, dtype=np.int8)
+    entered = entry >= 0
+    k = entry[entered]
+
+    # 노드 통과: 통과한 노드 수 = 진입 전 노드 수 + (u < 누적 통과 확률) 개수, n_nodes 면 끝까지 성공
+    u = rng.random(len(k), dtype=np.float32)
+    end = (u[:, None] < C[k]).sum(1)
+    success = end == n_nodes
+
+    # 노드별 방문 = 진입 노드부터 이탈(또는 마지막) 노드까지 (차분 배열)
+    last = np.minimum(end, n_nodes - 1)
+    visits = np.cumsum(np.bincount(k, minlength=n_nodes + 1) - np.bincount(last + 1, minlength=n_nodes + 1))
+    churn = np.bincount(end[~success], minlength=n_nodes)
+    counts["nodes"][:, 0] += visits[:n_nodes]
+    counts["nodes"][:, 1] += visits[:n_nodes] - churn
+    counts["nodes"][:, 2] += churn
+
+    # 리스크 파이프라인: v < a → DAU 에서 React, v < b → WAU 에서 React, v < c → Sur, 나머지 완전 이탈
+    v = rng.random(int((~success).sum()), dtype=np.float32)
+    to_react_dau = v < a
+    to_react_wau = (v >= a) & (v < b)
+    to_sur = (v >= b) & (v < c)
+    counts["risk"] += (
+        len(v), to_react_dau.sum(),
+        (v >= a).sum(), to_react_wau.sum(),
+        (v >= b).sum(), to_sur.sum(),
+    )
+
+    outcome = np.full(len(k), ACTIVE, dtype=np.int8)
+    outcome[~success] = np.where(v < b, REACT, np.where(to_sur, SUR, DEAD))
+    state[entered] = outcome
+
+    new_days = np.where(state == ACTIVE, 0, np.minimum(days.astype(np.int32) + 1, _DAYS_MAX)).astype(np.uint16)
+    return state, new_days
+
+
+def _entry_nodes(rng, state, thresholds):
+    """살아 있는 유저의 이번 사이클 진입 노드 (활성 = 첫 노드, Pool = 비중대로, 미복귀 = -1)"""
+    entry = np.zeros(len(state), dtype=np.int64)
+    for pool, cumulative in ((REACT, thresholds["re"]), (SUR, thresholds["sur"])):
+        members = state == pool
+        u = rng.random(int(members.sum()), dtype=np.float32)
+        node = np.searchsorted(cumulative, u, side="right")
+        entry[members] = np.where(node < len(cumulative), node, -1)
+    return entry
+
+
+# ==================== 실행 ====================
+def simulate(params, seed=0, chunk_size=CHUNK_SIZE, progress=None):
+    """ForecastParams 를 유저 단위로 num_cycles 사이클 시뮬레이션한다
+
+    사이클당 신규 유저와 초기 유저는 노드별 기대값을 확률적으로 반올림해 정수로 만든다.
+    progress(완료 사이클, 전체 사이클) 콜백.
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    funnel = params.funnel
+    n_nodes = len(funnel.success_rate)
+    num_cycles = int(params.num_cycles)
+    if num_cycles >= _DAYS_MAX:
+        raise ValueError(f"사이클 수는 {_DAYS_MAX - 1} 이하여야 합니다 (코호트 uint16)")
+    thresholds = {
+        "pass": _pass_thresholds(funnel.success_rate),
+        "re": _route_thresholds(funnel.re_weight),
+        "sur": _route_thresholds(funnel.sur_weight),
+        "risk": _risk_thresholds(funnel.risk_conversion),
+    }
+    inflow = engine.forecast_inflow(params.new_user_weight, params.cycle_new_users)
+
+    initial = int(_stochastic_round(rng, params.initial_users))
+    population = Population(
+        np.full(initial, ACTIVE, np.int8), np.zeros(initial, np.uint16), np.zeros(initial, np.uint16)
+    )
+    forecast = np.zeros((num_cycles, len(engine.FORECAST_COLUMNS)))
+    nodes = np.zeros((num_cycles, n_nodes, len(NODE_COUNT_COLUMNS)), dtype=np.int64)
+    risk = np.zeros((num_cycles, len(RISK_COUNT_COLUMNS)), dtype=np.int64)
+    cohort_active = np.zeros((num_cycles, num_cycles + 1), dtype=np.int64)
+    peak = 0
+
+    for t in range(num_cycles):
+        # 이번 사이클 신규 유저 (노드별 정수, 코호트 t+1) 를 살아 있는 유저 뒤에 붙인다
+        new_counts = _stochastic_round(rng, inflow)
+        n_new = int(new_counts.sum())
+        new_entry = np.repeat(np.arange(n_nodes), new_counts)
+        counts = {"nodes": nodes[t], "risk": risk[t]}
+        total = len(population) + n_new
+        peak = max(peak, total)
+
+        states, days, cohorts = [], [], []
+        for lo in range(0, total, chunk_size):
+            hi = min(lo + chunk_size, total)
+            old_hi = min(hi, len(population))
+            parts_entry, parts_days, parts_cohort = [], [], []
+            if lo < len(population):
+                sl = slice(lo, old_hi)
+                parts_entry.append(_entry_nodes(rng, population.state[sl], thresholds))
+                parts_days.append(population.days[sl])
+                parts_cohort.append(population.cohort[sl])
+            if hi > len(population):
+                new_sl = slice(max(lo, len(population)) - len(population), hi - len(population))
+                parts_entry.append(new_entry[new_sl])
+                parts_days.append(np.zeros(new_sl.stop - new_sl.start, np.uint16))
+                parts_cohort.append(np.full(new_sl.stop - new_sl.start, t + 1, np.uint16))
+            entry = np.concatenate(parts_entry)
+            chunk_cohort = np.concatenate(parts_cohort)
+            chunk_state, chunk_days = _step(rng, entry, np.concatenate(parts_days), thresholds, counts)
+
+            # 완전 이탈 / 미복귀 유저는 집계만 남기고 버린다
+            forecast[t, 4] += (chunk_state == DEAD).sum()
+            keep = chunk_state <= SUR
+            states.append(chunk_state[keep])
+            days.append(chunk_days[keep])
+            cohorts.append(chunk_cohort[keep])
+            active = chunk_state == ACTIVE
+            cohort_active[t] += np.bincount(chunk_cohort[active], minlength=num_cycles + 1)
+
+        population = Population(
+            np.concatenate(states) if states else np.zeros(0, np.int8),
+            np.concatenate(days) if days else np.zeros(0, np.uint16),
+            np.concatenate(cohorts) if cohorts else np.zeros(0, np.uint16),
+        )
+        forecast[t, :3] = np.bincount(population.state, minlength=3)[:3]
+        if progress:
+            progress(t + 1, num_cycles)
+
+    forecast[:, 3] = forecast[:, :3].sum(-1)
+    return MicroResult(
+        forecast=forecast,
+        nodes=nodes,
+        risk=risk,
+        cohort_active=cohort_active,
+        population=population,
+        peak_users=peak,
+        elapsed=time.perf_counter() - start,
+    )
+
+
+def compare(result, sim_df):
+    """마이크로시뮬레이션 Forecast 와 결정론 sim_df 의 열별 차이 (최종 사이클 / 전체 사이클 최대 상대오차)"""
+    micro = result.forecast
+    exact = sim_df[list(engine.FORECAST_COLUMNS)].to_numpy(dtype=float)
+    rel = np.abs(micro - exact) / np.maximum(np.abs(exact), 1.0)
+    return pd.DataFrame({
+        "항목": list(engine.FORECAST_COLUMNS),
+        "결정론 (최종)": exact[-1],
+        "마이크로 (최종)": micro[-1],
+        "최종 오차": rel[-1],
+        "최대 오차": rel.max(0),
+    })
@@ -0,0 +1,198 @@
+"""예측 불확실성 (Monte Carlo)
+
+두 가지 불확실성을 샘플링해 사이클별 백분위 밴드(P5/P50/P95)를 만든다.
+
+- 파라미터: 노드별 성공률과 리스크 전환율을 슬라이더 값을 평균으로 하는 Beta 분포에서 뽑아
+  engine.simulate_batch 로 한꺼번에 돌린다.
+- 정수 유저: 유저 수를 정수로 두고 노드 통과와 리스크 단계마다 이항(Pool 라우팅은 다항) 개수를
+  뽑는다. 결정론 예측의 소수 유저 대신 작은 세그먼트의 실제 분산을 보여준다. 반복 실행(draw)
+  축으로 벡터화해 수천 번도 한 번에 돈다.
+
+둘을 함께 쓰면 draw 마다 Beta 로 뽑은 확률로 이항 개수를 뽑는다.
+공유 서버에서도 응답이 끊기지 않도록 draw 수와 시간 예산을 둘 다 제한한다.
+"""
+import time
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+
+import engine
+
+# 밴드로 보여줄 백분위와 대상 컬럼
+PERCENTILES = (5, 50, 95)
+BAND_COLUMNS = ("총 유저", "활성 유저")
+
+# 한 번에 계산할 draw 수 (메모리 상한)
+CHUNK_SIZE = 10_000
+
+# Beta 평균을 0/1 에서 살짝 떼어 놓는다 (a, b > 0 이어야 함)
+_EPS = 1e-4
+
+# simulate_binomial 의 노드별 개수 열 (df 열 이름)
+NODE_COUNT_COLUMNS = ("총활성", "성공수", "이탈수", "복귀수", "부활수")
+
+# 불확실성 종류
+SOURCES = {
+    "parameter": "파라미터 (Beta)",
+    "binomial": "정수 유저 (이항/다항)",
+    "both": "둘 다",
+}
+
+
+@dataclass(frozen=True)
+class MonteCarloSettings:
+    """샘플링 설정 (concentration 이 클수록 슬라이더 값 주변에 좁게 분포)"""
+    draws: int = 100_000
+    rate_concentration: float = 50.0
+    risk_concentration: float = 50.0
+    seed: int = 42
+    time_budget: float = 2.0  # 초
+    source: str = "parameter"  # SOURCES 키
+
+    @cached_property
+    def key(self):
+        return engine.digest(self)
+
+
+@dataclass(frozen=True, eq=False)
+class FanChart:
+    """사이클별 백분위 밴드
+
+    bands[컬럼] 은 (len(PERCENTILES), num_cycles) 배열.
+    draws 는 실제로 계산된 draw 수 (시간 예산에 걸리면 settings.draws 보다 작다).
+    """
+    cycles: np.ndarray
+    bands: dict
+    draws: int
+    elapsed: float
+    truncated: bool
+
+
+def sample_beta(rng, mean, concentration, size):
+    """평균 mean, 농도 concentration 인 Beta 분포에서 (size, len(mean)) 개를 뽑는다"""
+    mean = np.clip(np.asarray(mean, dtype=float), _EPS, 1 - _EPS)
+    return rng.beta(mean * concentration, (1 - mean) * concentration, size=(size,) + mean.shape)
+
+
+def _route_probs(weight, floor=None):
+    """라우팅 비중 → 다항 확률 (마지막 칸 = 아무 노드로도 가지 않음)
+
+    floor 가 있으면 forecast_inflow 처럼 합계를 max(합계, floor) 로 나누고, 없으면 합계가 1 을
+    넘을 때만 나눈다 (Pool 유저는 한 노드로만 갈 수 있으므로).
+    """
+    weight = np.asarray(weight, dtype=float)
+    total = weight.sum(-1, keepdims=True)
+    scale = np.maximum(total, floor) if floor is not None else np.maximum(total, 1.0)
+    probs = weight / scale
+    return np.concatenate([probs, np.clip(1.0 - probs.sum(-1, keepdims=True), 0.0, 1.0)], -1)
+
+
+def _stochastic_round(rng, x, size):
+    x = np.broadcast_to(np.asarray(x, dtype=float), size)
+    base = np.floor(x)
+    return (base + (rng.random(size) < x - base)).astype(np.int64)
+
+
+def simulate_binomial(rng, success_rate, re_weight, sur_weight, risk_conversion,
+                      new_user_weight, cycle_new_users, initial_users, num_cycles, size, node_counts=None):
+    """정수 유저 예측 size 회 (engine.simulate_batch 의 이항/다항 버전)
+
+    success_rate, risk_conversion 은 노드(단계) 벡터 또는 draw 별 (size, …) 배열.
+    사이클마다 신규 유저 수(소수면 확률적 반올림)를 비중대로 다항 분배하고, Pool 유저도 비중대로
+    노드에 다항 분배한 뒤 노드마다 성공 ~ 이항(총활성, 성공률), 이탈 합계는 At Risk DAU → WAU → Dead
+    를 단계별 이항으로 흘려보낸다. 반환: (size, num_cycles, len(FORECAST_COLUMNS)) 정수 배열
+    node_counts 에 (size, num_cycles, 노드, len(NODE_COUNT_COLUMNS)) 배열을 넘기면 노드별 개수를 채운다.
+    """
+    rates = np.broadcast_to(np.asarray(success_rate, dtype=float), (size, len(engine.NODES)))
+    conversion = np.broadcast_to(np.asarray(risk_conversion, dtype=float), (size, len(engine.RISK_STAGES)))
+    new_probs = _route_probs(new_user_weight, floor=0.01)
+    re_probs = _route_probs(re_weight)
+    sur_probs = _route_probs(sur_weight)
+    n_nodes = len(engine.NODES)
+
+    retained = _stochastic_round(rng, initial_users, size)
+    react = np.zeros(size, dtype=np.int64)
+    sur = np.zeros(size, dtype=np.int64)
+    out = np.empty((size, int(num_cycles), len(engine.FORECAST_COLUMNS)), dtype=np.int64)
+    for t in range(int(num_cycles)):
+        returned = rng.multinomial(react, re_probs)[:, :n_nodes]
+        revived = rng.multinomial(sur, sur_probs)[:, :n_nodes]
+        inflow = rng.multinomial(_stochastic_round(rng, cycle_new_users, size), new_probs)[:, :n_nodes]
+        inflow += returned + revived
+
+        carried = retained
+        lost = np.zeros(size, dtype=np.int64)
+        for i in range(n_nodes):
+            total = carried + inflow[:, i]
+            carried = rng.binomial(total, rates[:, i])
+            lost += total - carried
+            if node_counts is not None:
+                node_counts[:, t, i] = np.stack(
+                    [total, carried, total - carried, returned[:, i], revived[:, i]], -1
+                )
+
+        dau_success = rng.binomial(lost, conversion[:, 0])
+        wau_pool = lost - dau_success
+        wau_success = rng.binomial(wau_pool, conversion[:, 1])
+        dead_pool = wau_pool - wau_success
+        dead_success = rng.binomial(dead_pool, conversion[:, 2])
+
+        retained, react, sur = carried, dau_success + wau_success, dead_success
+        out[:, t, 0] = retained
+        out[:, t, 1] = react
+        out[:, t, 2] = sur
+        out[:, t, 4] = dead_pool - dead_success
+    out[..., 3] = out[..., :3].sum(-1)
+    return out
+
+
+def _sample_chunk(rng, params, settings, size):
+    funnel = params.funnel
+    if settings.source in ("parameter", "both"):
+        success_rate = sample_beta(rng, funnel.success_rate, settings.rate_concentration, size)
+        risk_conversion = sample_beta(rng, funnel.risk_conversion, settings.risk_concentration, size)
+    else:
+        success_rate, risk_conversion = funnel.success_rate, funnel.risk_conversion
+    inputs = dict(
+        success_rate=success_rate,
+        re_weight=funnel.re_weight,
+        sur_weight=funnel.sur_weight,
+        risk_conversion=risk_conversion,
+        new_user_weight=params.new_user_weight,
+        cycle_new_users=params.cycle_new_users,
+        initial_users=params.initial_users,
+        num_cycles=params.num_cycles,
+    )
+    if settings.source == "parameter":
+        return engine.simulate_batch(**inputs)
+    return simulate_binomial(rng, size=size, **inputs)
+
+
+def sample_forecast(params, settings):
+    """ForecastParams 주변의 불확실성을 샘플링해 FanChart 를 만든다"""
+    if settings.source not in SOURCES:
+        raise ValueError(f"알 수 없는 불확실성 종류: {settings.source}")
+    rng = np.random.default_rng(settings.seed)
+    column_idx = [engine.FORECAST_COLUMNS.index(c) for c in BAND_COLUMNS]
+
+    chunks = []
+    done = 0
+    start = time.perf_counter()
+    while done < settings.draws:
+        size = min(CHUNK_SIZE, settings.draws - done)
+        trajectory = _sample_chunk(rng, params, settings, size)
+        chunks.append(trajectory[..., column_idx].astype(np.float32))
+        done += size
+        if time.perf_counter() - start > settings.time_budget:
+            break
+
+    samples = np.concatenate(chunks)
+    quantiles = np.percentile(samples, PERCENTILES, axis=0)  # (percentile, cycle, column)
+    return FanChart(
+        cycles=np.arange(1, params.num_cycles + 1),
+        bands={col: quantiles[..., k] for k, col in enumerate(BAND_COLUMNS)},
+        draws=done,
+        elapsed=time.perf_counter() - start,
+        truncated=done < settings.draws,
+    )
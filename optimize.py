@@ -0,0 +1,274 @@
+"""투자/라우팅 최적화
+
+ScenarioSpace.evaluate 의 배치 평가 위에서 동작한다. 후보 해를 한 행씩 쌓아 한 번에
+평가하므로 콘텐츠가 50개 이상이어도 반복마다 엔진 호출은 한 번이다.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import engine
+
+
+# ==================== 콘텐츠 투자 ====================
+@dataclass(frozen=True, eq=False)
+class InvestmentPlan:
+    """콘텐츠 점수 개선 배분 결과
+
+    top 은 상위 배분 표 (순위, KPI, 증가, 비용, 배분 요약),
+    deltas 는 상위 배분별 콘텐츠 점수 증가량 (top 순서, 콘텐츠 수) 배열.
+    """
+    items: list
+    current: np.ndarray
+    deltas: np.ndarray
+    top: pd.DataFrame
+    base_kpi: float
+    evaluations: int
+
+
+def step_cost(unit_cost, steps, exponent):
+    """steps 단계 개선 비용: 단계당 비용 × steps^exponent (exponent > 1 이면 뒤 단계일수록 비쌈)"""
+    return np.asarray(unit_cost) * np.power(np.asarray(steps, dtype=float), exponent)
+
+
+def invest_content(space, budget, unit_cost, kpi="steady_active", step=0.05, exponent=1.0,
+                   top_k=5, candidates=5_000, seed=0):
+    """콘텐츠별 점수 개선(step 단위)을 예산 안에서 배분해 KPI 를 최대화한다
+
+    1) 탐욕: 모든 콘텐츠의 +step 후보를 한 번에 평가해 (KPI 증가 / 추가 비용) 최대를 고른다
+    2) 국소 탐색: 한 콘텐츠에서 step 을 빼 다른 콘텐츠로 옮기는 모든 쌍을 한 번에 평가한다
+    3) 무작위 배분 candidates 개를 한 번에 평가해 상위 후보의 다양성을 보탠다
+    unit_cost: 콘텐츠별 step 1단계 비용 (space.group("endo_value") 순서)
+    """
+    value_slice = space.group("endo_value")
+    idx = np.arange(len(space))[value_slice]
+    items = [f"{space.params[i].node} · {space.params[i].item}" for i in idx]
+    current = space.base[idx]
+    unit_cost = np.broadcast_to(np.asarray(unit_cost, dtype=float), current.shape)
+    max_steps = np.floor((space.upper[idx] - current) / step + 1e-9).astype(int)
+
+    evaluations = 0
+
+    def evaluate(steps):
+        nonlocal evaluations
+        X = np.repeat(space.base[None, :], len(steps), axis=0)
+        X[:, value_slice] = current + steps * step
+        evaluations += len(steps)
+        return space.evaluate(X, (kpi,))[kpi]
+
+    def cost(steps):
+        return step_cost(unit_cost, steps, exponent).sum(-1)
+
+    base_kpi = float(evaluate(np.zeros((1, len(idx)), dtype=int))[0])
+    n = len(idx)
+    pool = []
+
+    if n:
+        # 1) 탐욕 배분
+        steps = np.zeros(n, dtype=int)
+        value = base_kpi
+        while True:
+            trial = steps[None, :] + np.eye(n, dtype=int)
+            extra = cost(trial) - cost(steps[None, :])
+            ok = (trial <= max_steps).all(-1) & (cost(trial) <= budget + 1e-9)
+            if not ok.any():
+                break
+            gains = evaluate(trial) - value
+            score = np.where(ok & (gains > 0), gains / np.maximum(extra, 1e-12), -np.inf)
+            best = int(np.argmax(score))
+            if not np.isfinite(score[best]):
+                break
+            steps = trial[best]
+            value += gains[best]
+
+        # 2) step 옮기기 국소 탐색 (i → j 모든 쌍을 한 배치로)
+        while True:
+            src, dst = np.nonzero(~np.eye(n, dtype=bool))
+            keep = steps[src] > 0
+            src, dst = src[keep], dst[keep]
+            if not len(src):
+                break
+            trial = np.repeat(steps[None, :], len(src), axis=0)
+            trial[np.arange(len(src)), src] -= 1
+            trial[np.arange(len(src)), dst] += 1
+            ok = (trial <= max_steps).all(-1) & (cost(trial) <= budget + 1e-9)
+            if not ok.any():
+                break
+            trial = trial[ok]
+            values = evaluate(trial)
+            best = int(np.argmax(values))
+            if values[best] <= value + 1e-9:
+                # 더 나아지지 않으면 마지막 이웃들은 차선 배분 후보로 남긴다
+                pool.extend(zip(trial, values))
+                break
+            steps, value = trial[best], float(values[best])
+        pool.append((steps, value))
+
+        # 3) 무작위 배분 (몇 개 콘텐츠에 예산을 나눠 준다)
+        rng = np.random.default_rng(seed)
+        share = rng.dirichlet(np.full(n, 0.3), size=candidates)
+        affordable = budget * share / np.maximum(unit_cost, 1e-12)
+        random_steps = np.minimum(
+            np.floor(np.power(affordable, 1.0 / exponent)).astype(int), max_steps
+        )
+        random_steps = random_steps[cost(random_steps) <= budget + 1e-9]
+        if len(random_steps):
+            pool.extend(zip(random_steps, evaluate(random_steps)))
+
+    # 같은 배분은 한 번만, KPI 내림차순 상위 top_k
+    seen = set()
+    ranked = []
+    for steps, value in sorted(pool, key=lambda p: -p[1]):
+        key = tuple(steps)
+        if key in seen:
+            continue
+        seen.add(key)
+        ranked.append((steps, value))
+        if len(ranked) == top_k:
+            break
+
+    rows = []
+    for rank, (steps, value) in enumerate(ranked, 1):
+        changed = np.nonzero(steps)[0]
+        rows.append({
+            "순위": rank,
+            "KPI": value,
+            "증가": value - base_kpi,
+            "비용": float(cost(steps[None, :])[0]),
+            "배분": ", ".join(f"{items[i]} +{steps[i] * step:.2f}" for i in changed) or "(변경 없음)",
+        })
+
+    return InvestmentPlan(
+        items=items,
+        current=current,
+        deltas=np.array([s * step for s, _ in ranked]).reshape(len(ranked), n),
+        top=pd.DataFrame(rows, columns=["순위", "KPI", "증가", "비용", "배분"]),
+        base_kpi=base_kpi,
+        evaluations=evaluations,
+    )
+
+
+# ==================== 유입/복귀 라우팅 ====================
+# 라우팅 대상 비중 벡터 (이름 → 표시 라벨)
+ROUTING_VECTORS = {
+    "new_user_weight": "신규 비중",
+    "re_weight": "복귀 비중",
+    "sur_weight": "부활 비중",
+}
+
+# 라우팅 목표 (사이클당 신규 유저를 계속 넣을 때의 수렴값)
+ROUTING_OBJECTIVES = {
+    "long_run_total": "장기 총 유저 (활성 + Pool)",
+    "long_run_active": "장기 총활성 (노드 합계)",
+}
+
+
+@dataclass(frozen=True, eq=False)
+class RoutingPlan:
+    """비중 벡터별 현재/최적 배분
+
+    table: 노드 × (벡터별 현재, 최적, 상한), current_kpi / optimal_kpi: 목표 값,
+    linear_gap: 선형 예측과 실제 재평가 값의 차이 (수치 오차 수준이어야 함).
+    """
+    table: pd.DataFrame
+    current: dict
+    optimal: dict
+    current_kpi: float
+    optimal_kpi: float
+    linear_gap: float
+
+
+def _normalized(weight):
+    weight = np.clip(np.asarray(weight, dtype=float), 0.0, None)
+    total = weight.sum()
+    return weight / total if total > 0 else np.full(weight.shape, 1.0 / len(weight))
+
+
+def routing_kpi(objective, success_rate, risk_conversion, cycle_new_users,
+                new_user_weight, re_weight, sur_weight):
+    """라우팅 목표값 (비중 인자는 (..., 노드) 배열로 배치 평가)"""
+    if objective == "long_run_total":
+        limit = engine.forecast_limit(
+            success_rate, re_weight, sur_weight, risk_conversion, new_user_weight, cycle_new_users
+        )
+        return limit[..., engine.FORECAST_COLUMNS.index("총 유저")]
+    steady = engine.steady_state_batch(
+        success_rate, re_weight, sur_weight, risk_conversion,
+        engine.forecast_inflow(new_user_weight, cycle_new_users),
+    )
+    return steady[..., engine.STEADY_COLUMNS.index("총활성")]
+
+
+def fill_simplex(score, caps):
+    """max score·w  s.t. Σw = 1, 0 ≤ w ≤ caps 의 정확해 (점수 높은 노드부터 상한까지 채움)"""
+    caps = np.asarray(caps, dtype=float)
+    if caps.sum() < 1.0 - 1e-9:
+        raise ValueError(f"노드별 상한 합계가 100% 미만입니다 ({caps.sum():.0%})")
+    w = np.zeros_like(caps)
+    remaining = 1.0
+    for i in np.argsort(-np.asarray(score), kind="stable"):
+        w[i] = min(caps[i], remaining)
+        remaining -= w[i]
+        if remaining <= 1e-12:
+            break
+    return w
+
+
+def optimize_routing(success_rate, risk_conversion, cycle_new_users,
+                     new_user_weight, re_weight, sur_weight,
+                     objective="long_run_total", caps=None):
+    """신규/복귀/부활 비중을 노드별 상한 안에서 최적 배분한다
+
+    정상상태에서 이탈 합계 A 는 (비중 합계가 1 인 한) 배분과 무관하므로 목표는 세 비중
+    벡터에 대해 선형이다. 각 노드 단위벡터를 넣은 15개 행을 한 번에 평가해 계수를 구하고,
+    벡터마다 상한이 있는 단체(simplex) 위 LP 를 fill_simplex 로 정확히 푼다.
+    caps: {벡터 이름: (노드 수,) 상한} (없으면 1.0)
+    """
+    n = len(success_rate)
+    caps = {k: np.ones(n) if caps is None or k not in caps else np.asarray(caps[k], dtype=float)
+            for k in ROUTING_VECTORS}
+    current = {
+        "new_user_weight": np.asarray(new_user_weight, dtype=float),
+        "re_weight": np.asarray(re_weight, dtype=float),
+        "sur_weight": np.asarray(sur_weight, dtype=float),
+    }
+    reference = {k: _normalized(v) for k, v in current.items()}
+
+    def evaluate(weights):
+        return routing_kpi(objective, success_rate, risk_conversion, cycle_new_users, **weights)
+
+    # 기준 1행 + 벡터별 단위벡터 n 행
+    rows = {k: np.repeat(v[None, :], 1 + len(ROUTING_VECTORS) * n, axis=0) for k, v in reference.items()}
+    for v_idx, name in enumerate(ROUTING_VECTORS):
+        block = slice(1 + v_idx * n, 1 + (v_idx + 1) * n)
+        rows[name][block] = np.eye(n)
+    values = evaluate(rows)
+    if not np.all(np.isfinite(values)):
+        raise ValueError("현재 전환율로는 장기 수렴값이 없습니다 (Pool 이 발산)")
+
+    base = values[0]
+    optimal = {}
+    predicted = base
+    for v_idx, name in enumerate(ROUTING_VECTORS):
+        delta = values[1 + v_idx * n:1 + (v_idx + 1) * n] - base
+        optimal[name] = fill_simplex(delta, caps[name])
+        predicted += delta @ optimal[name]
+
+    optimal_kpi = float(evaluate({k: v[None, :] for k, v in optimal.items()})[0])
+    current_kpi = float(evaluate({k: v[None, :] for k, v in current.items()})[0])
+
+    table = pd.DataFrame({"노드": list(engine.NODES) if n == len(engine.NODES) else list(range(n))})
+    for name, label in ROUTING_VECTORS.items():
+        table[f"{label} 현재"] = current[name]
+        table[f"{label} 최적"] = optimal[name]
+        table[f"{label} 상한"] = caps[name]
+
+    return RoutingPlan(
+        table=table,
+        current=current,
+        optimal=optimal,
+        current_kpi=current_kpi,
+        optimal_kpi=optimal_kpi,
+        linear_gap=abs(optimal_kpi - predicted),
+    )
@@ -0,0 +1,172 @@
+"""스크립트 실행(rerun) 구간별 시간 측정과 cProfile 캡처 (Streamlit 비의존)
+
+실행 하나를 단계(phase: 사이드바 → 정상상태 → 화면 …, 합계 = 전체 시간)로 나누고, 그 안의
+세부 구간(section: 그림 생성, Styler, CSV, 예측 등)을 이름별로 누적한다. 현재 Recorder 는
+ContextVar 에 두므로 Streamlit 세션(스크립트 스레드)끼리 섞이지 않고, 측정을 켜지 않은
+실행에서 section() 은 아무것도 하지 않는다.
+
+    recorder = perf.start()
+    perf.phase("사이드바")
+    with perf.section("그림 · forecast"):
+        ...
+    timing = perf.stop(recorder)
+"""
+import contextlib
+import contextvars
+import cProfile
+import marshal
+import pstats
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+# 실행 기록 보관 수
+HISTORY_SIZE = 50
+# 프로파일 요약 표 행 수
+PROFILE_TOP = 25
+
+_current = contextvars.ContextVar("perf_recorder", default=None)
+
+
+@dataclass(frozen=True)
+class RerunTiming:
+    """실행 하나의 측정 결과 (초)"""
+    started: datetime
+    total: float
+    phases: tuple  # ((이름, 초), ...) — 합계 = total
+    sections: tuple  # ((이름, 초, 횟수), ...) — 단계 안에 겹쳐 있음
+
+    def phase_frame(self):
+        return pd.DataFrame(
+            [(name, seconds * 1000, seconds / max(self.total, 1e-12)) for name, seconds in self.phases],
+            columns=["단계", "시간 (ms)", "비율"],
+        )
+
+    def section_frame(self):
+        rows = sorted(self.sections, key=lambda s: -s[1])
+        return pd.DataFrame(
+            [(name, seconds * 1000, count) for name, seconds, count in rows],
+            columns=["구간", "시간 (ms)", "횟수"],
+        )
+
+
+class Recorder:
+    """한 번의 실행에서 단계와 세부 구간 시간을 모은다"""
+
+    def __init__(self):
+        self.started = datetime.now()
+        self.start = time.perf_counter()
+        self.phases = []
+        self.sections = {}
+        self._phase = None
+        self._phase_start = self.start
+
+    def phase(self, name):
+        """지금까지를 직전 단계로 닫고 새 단계를 시작한다"""
+        now = time.perf_counter()
+        if self._phase is not None:
+            self.phases.append((self._phase, now - self._phase_start))
+        self._phase, self._phase_start = name, now
+
+    @contextlib.contextmanager
+    def section(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds, count = self.sections.get(name, (0.0, 0))
+            self.sections[name] = (seconds + time.perf_counter() - start, count + 1)
+
+    def finish(self):
+        self.phase(None)
+        return RerunTiming(
+            started=self.started,
+            total=time.perf_counter() - self.start,
+            phases=tuple(self.phases),
+            sections=tuple((name, seconds, count) for name, (seconds, count) in self.sections.items()),
+        )
+
+
+def start():
+    """새 Recorder 를 현재 실행의 측정기로 둔다"""
+    recorder = Recorder()
+    recorder.phase("시작")
+    _current.set(recorder)
+    return recorder
+
+
+def stop(recorder):
+    """측정을 끝내고 RerunTiming 을 돌려준다 (이후 section() 은 기록하지 않음)"""
+    if _current.get() is recorder:
+        _current.set(None)
+    return recorder.finish()
+
+
+def phase(name):
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.phase(name)
+
+
+def section(name):
+    """현재 측정기에 구간 시간을 더한다 (측정 중이 아니면 아무것도 안 함)"""
+    recorder = _current.get()
+    return recorder.section(name) if recorder is not None else contextlib.nullcontext()
+
+
+def history_frame(history):
+    """RerunTiming 목록 → 실행별 단계 시간(ms) 표 (열: 단계, 행: 실행 시각)"""
+    rows = []
+    for timing in history:
+        row = {"실행": timing.started.strftime("%H:%M:%S.%f")[:-3]}
+        for name, seconds in timing.phases:
+            row[name] = row.get(name, 0.0) + seconds * 1000
+        rows.append(row)
+    return pd.DataFrame(rows).set_index("실행").fillna(0.0) if rows else pd.DataFrame()
+
+
+# ==================== 프로파일 ====================
+@dataclass(frozen=True, eq=False)
+class ProfileCapture:
+    """cProfile 결과 (data 는 pstats.Stats 로 읽을 수 있는 marshal 바이트)"""
+    created: datetime
+    total: float
+    calls: int
+    data: bytes
+    top: pd.DataFrame
+
+    @property
+    def file_name(self):
+        return f"rerun_{self.created:%Y%m%d_%H%M%S}.pstats"
+
+
+def start_profile():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _label(func):
+    file, line, name = func
+    return name if file == "~" else f"{name} ({Path(file).name}:{line})"
+
+
+def finish_profile(profiler, top=PROFILE_TOP):
+    """프로파일을 멈추고 ProfileCapture 로 만든다 (누적 시간 상위 top 개 요약 포함)"""
+    profiler.disable()
+    stats = pstats.Stats(profiler)
+    rows = [
+        (_label(func), nc, tt * 1000, ct * 1000)
+        for func, (_, nc, tt, ct, _) in stats.stats.items()
+    ]
+    table = pd.DataFrame(rows, columns=["함수", "호출", "자체 (ms)", "누적 (ms)"])
+    return ProfileCapture(
+        created=datetime.now(),
+        total=stats.total_tt,
+        calls=stats.total_calls,
+        data=marshal.dumps(stats.stats),
+        top=table.sort_values("누적 (ms)", ascending=False).head(top).reset_index(drop=True),
+    )
@@ -0,0 +1,335 @@
+"""사후 분포 추론 (앙상블 MCMC)
+
+calibrate.fit 은 점추정만 준다. 여기서는 같은 과거 데이터로 성공률 · 복귀/부활 비중 · 리스크
+전환율의 사후 분포를 뽑아 신용구간과 사후 예측 밴드를 만든다.
+
+- 우도: 성공수 ~ 이항(총활성, 성공률), 복귀수 / 부활수 ~ 포아송(calibrate.predict 의 예측값)
+- 사전분포: [0, 1] 균등 × calibrate 와 같은 현재 값 중심 정규 벌점 (prior_weight).
+  Pool 유저는 한 노드로만 돌아오므로 복귀 / 부활 비중의 합은 1 이하 (엔진도 1 을 넘으면 나눈다)
+- 표본기: walker 앙상블 (Goodman & Weare stretch move + differential evolution move 혼합).
+  walker 절반씩 한 번의 배치 로그확률 호출로 평가하고, 독립 앙상블(chain)을 프로세스마다
+  하나씩 돌려 코어를 모두 쓴다.
+
+데이터가 정하는 것은 복귀 비중 × (DAU+WAU 전환율), 부활 비중 × Dead 전환율 같은 곱뿐이라
+리스크 전환율 세 개 중 일부 방향은 사전분포로만 묶인다. 원래 좌표에서는 이 방향이 휘어진
+능선이 되어 walker 가 거의 움직이지 못하므로, 표본기는 곱 자체(φ)를 좌표로 쓰고 야코비안을
+더한다. 이 방향의 신용구간이 넓은 것은 표본기 문제가 아니라 데이터가 말해 주지 않기 때문이다.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+import calibrate
+import engine
+import montecarlo
+
+# 로그를 취할 때 [0, 1] 경계에서 떼어 놓는 거리
+_EPS = 1e-9
+
+# 파라미터 벡터 구간 (calibrate.PARAM_GROUPS 순서)
+_N = len(engine.NODES)
+_RE = slice(_N, 2 * _N)
+_SUR = slice(2 * _N, 3 * _N)
+_RISK = slice(3 * _N, None)
+
+
+@dataclass(frozen=True)
+class PosteriorSettings:
+    """표본기 설정 (chain 하나 = walkers 개 walker 의 앙상블)"""
+    walkers: int = 64
+    steps: int = 10_000
+    burn: int = 2_500
+    thin: int = 10
+    chains: int = 0  # 0 = CPU 수
+    prior_weight: float = calibrate.PRIOR_WEIGHT
+    de_fraction: float = 0.8  # differential evolution move 비율 (나머지는 stretch move)
+    max_samples: int = 20_000  # 보관할 표본 수 상한 (R-hat / ESS 는 전체 표본으로 계산)
+    seed: int = 42
+
+    @cached_property
+    def key(self):
+        return engine.digest(self)
+
+
+@dataclass(frozen=True, eq=False)
+class Posterior:
+    """사후 표본 (표본, 파라미터) — 파라미터 순서는 calibrate.PARAM_GROUPS
+
+    samples 는 전체 draws 개 표본을 고르게 솎아 settings.max_samples 개 이하로 줄인 것이다
+    (st.cache_data 가 매 실행 피클링하므로 크기를 묶어 둔다).
+    """
+    samples: np.ndarray
+    draws_total: int
+    acceptance: float
+    r_hat: np.ndarray
+    ess: np.ndarray
+    chains: int
+    elapsed: float
+    key: str
+
+    def summary(self):
+        """파라미터별 평균 / 표준편차 / 90% 신용구간 / R-hat / 유효 표본 수"""
+        labels = [(g, k) for g, keys in calibrate.PARAM_GROUPS for k in keys]
+        p5, p50, p95 = np.percentile(self.samples, (5, 50, 95), axis=0)
+        return pd.DataFrame({
+            "항목": [g for g, _ in labels],
+            "노드/단계": [k for _, k in labels],
+            "평균": self.samples.mean(0),
+            "표준편차": self.samples.std(0),
+            "P5": p5,
+            "P50": p50,
+            "P95": p95,
+            "R-hat": self.r_hat,
+            "ESS": self.ess,
+        })
+
+    def draws(self, n, rng):
+        """예측에 쓸 파라미터 n 개 (복원추출) → PARAM_GROUPS 이름별 (n, …) 배열"""
+        theta = self.samples[rng.integers(len(self.samples), size=n)]
+        out, i = {}, 0
+        for group, keys in calibrate.PARAM_GROUPS:
+            out[group] = theta[:, i:i + len(keys)]
+            i += len(keys)
+        return out
+
+
+# ==================== 로그 사후확률 ====================
+def log_likelihood(theta, history):
+    """(..., 18) 파라미터 → (...) 로그우도 (상수항 제외). 모든 경기·노드를 한 번에"""
+    _, returned, revived = calibrate.predict(theta, history)
+    rate = np.clip(theta[..., :_N], _EPS, 1 - _EPS)[..., None, :]
+    ll = (history.success * np.log(rate) + history.churn * np.log1p(-rate)).sum((-1, -2))
+    for observed, mean in ((history.returned[1:], returned), (history.revived[1:], revived)):
+        mean = np.maximum(mean, 1e-12)
+        ll = ll + (observed * np.log(mean) - mean).sum((-1, -2))
+    return ll
+
+
+def log_posterior(theta, history, prior, prior_weight):
+    inside = (
+        np.all((theta > 0.0) & (theta < 1.0), -1)
+        & (theta[..., _RE].sum(-1) <= 1.0)
+        & (theta[..., _SUR].sum(-1) <= 1.0)
+    )
+    lp = np.full(theta.shape[:-1], -np.inf)
+    if inside.any():
+        t = theta[inside]
+        lp[inside] = log_likelihood(t, history) - 0.5 * prior_weight * ((t - prior) ** 2).sum(-1)
+    return lp
+
+
+# ==================== 표본기 좌표 ====================
+def _reach(risk):
+    """리스크 전환율 → (React Pool 로 가는 비율, Sur Pool 로 가는 비율)"""
+    dau, wau, dead = risk[..., 0], risk[..., 1], risk[..., 2]
+    return dau + (1 - dau) * wau, (1 - dau) * (1 - wau) * dead
+
+
+def to_theta(phi):
+    """표본기 좌표 φ (복귀/부활 비중 대신 비중 × 도달 비율) → 파라미터 θ"""
+    to_react, to_sur = _reach(phi[..., _RISK])
+    theta = np.array(phi, dtype=float, copy=True)
+    theta[..., _RE] /= np.maximum(to_react, 1e-300)[..., None]
+    theta[..., _SUR] /= np.maximum(to_sur, 1e-300)[..., None]
+    return theta
+
+
+def from_theta(theta):
+    to_react, to_sur = _reach(theta[..., _RISK])
+    phi = np.array(theta, dtype=float, copy=True)
+    phi[..., _RE] *= to_react[..., None]
+    phi[..., _SUR] *= to_sur[..., None]
+    return phi
+
+
+def log_prob(phi, history, prior, prior_weight):
+    """φ 좌표의 로그 사후확률 (θ 의 로그 사후확률 + log |∂θ/∂φ|)"""
+    lp = log_posterior(to_theta(phi), history, prior, prior_weight)
+    ok = np.isfinite(lp)
+    to_react, to_sur = _reach(phi[ok][:, _RISK])
+    lp[ok] -= _N * (np.log(to_react) + np.log(to_sur))
+    return lp
+
+
+# ==================== 표본기 ====================
+def initial_walkers(rng, theta, walkers, history, prior, prior_weight, max_tries=100):
+    """시작 앙상블: 데이터가 정하는 좌표는 최적값 주변 작은 공, 리스크 전환율은 [0, 1] 균등
+
+    사후확률이 0 인 (비중 합이 1 을 넘는) walker 는 다시 뽑는다.
+    """
+    center = from_theta(np.clip(theta, 1e-6, 1 - 1e-6))
+    out = np.empty((0, len(center)))
+    for _ in range(max_tries):
+        candidate = center + 1e-4 * np.abs(center) * rng.standard_normal((walkers, len(center)))
+        candidate[:, _RISK] = rng.random((walkers, 3))
+        finite = np.isfinite(log_prob(candidate, history, prior, prior_weight))
+        out = np.concatenate([out, candidate[finite]])[:walkers]
+        if len(out) == walkers:
+            return out
+    # 균등 시작점이 거의 다 막히면 최적값 주변에서 시작한다
+    ball = center + 1e-4 * rng.standard_normal((walkers - len(out), len(center)))
+    return np.concatenate([out, ball])
+
+
+def run_ensemble(history, start, prior, settings, seed):
+    """앙상블 하나를 settings.steps 번 움직인다 → (burn 이후 thin 간격 표본 (걸음, walker, 파라미터), 채택률)
+
+    start, 표본 모두 φ 좌표.
+    """
+    rng = np.random.default_rng(seed)
+    X = np.array(start, dtype=float)
+    n, dim = X.shape
+    lp = log_prob(X, history, prior, settings.prior_weight)
+    half = n // 2
+    halves = (np.arange(half), np.arange(half, n))
+    gamma = 2.38 / np.sqrt(2 * dim)
+    kept = []
+    accepted = 0
+    for step in range(settings.steps):
+        de = rng.random() < settings.de_fraction
+        for active, other in (halves, halves[::-1]):
+            m = len(active)
+            if de:
+                # 다른 절반의 두 walker 차이만큼 이동: Y = X + γ (X_j - X_k)
+                j = rng.integers(len(other), size=m)
+                k = (j + 1 + rng.integers(len(other) - 1, size=m)) % len(other)
+                g = gamma * (1 + 0.1 * rng.standard_normal(m))
+                proposal = X[active] + g[:, None] * (X[other[j]] - X[other[k]])
+                log_z = 0.0
+            else:
+                # 다른 절반의 walker 쪽으로 늘이거나 줄인다: Y = X_j + z (X - X_j), z ~ g(z) ∝ 1/√z
+                z = (rng.random(m) + 1) ** 2 / 2
+                partner = X[other[rng.integers(len(other), size=m)]]
+                proposal = partner + z[:, None] * (X[active] - partner)
+                log_z = (dim - 1) * np.log(z)
+            lp_new = log_prob(proposal, history, prior, settings.prior_weight)
+            accept = np.log(rng.random(m)) < log_z + lp_new - lp[active]
+            X[active[accept]] = proposal[accept]
+            lp[active[accept]] = lp_new[accept]
+            if step >= settings.burn:
+                accepted += int(accept.sum())
+        if step >= settings.burn and (step - settings.burn) % settings.thin == 0:
+            kept.append(X.copy())
+    counted = max((settings.steps - settings.burn) * n, 1)
+    return np.array(kept), accepted / counted
+
+
+def _run_chain(args):
+    return run_ensemble(*args)
+
+
+def split_r_hat(paths):
+    """(경로, 걸음, 파라미터) 표본의 split R-hat (각 경로를 반으로 나눠 비교)"""
+    half = paths.shape[1] // 2
+    if half < 2:
+        return np.full(paths.shape[-1], np.nan)
+    split = np.concatenate([paths[:, :half], paths[:, half:2 * half]])
+    within = split.var(1, ddof=1).mean(0)
+    between = half * split.mean(1).var(0, ddof=1)
+    var = (half - 1) / half * within + between / half
+    return np.sqrt(var / np.maximum(within, 1e-300))
+
+
+def autocorr_time(paths, c=5.0):
+    """(경로, 걸음, 파라미터) → 파라미터별 적분 자기상관 시간 (표본 간격 단위)
+
+    경로별 자기상관 함수를 평균한 뒤 Sokal 의 자동 창 (창 ≥ c·τ 인 첫 지점) 으로 자른다.
+    """
+    x = paths - paths.mean(1, keepdims=True)
+    length = x.shape[1]
+    size = 1 << (2 * length - 1).bit_length()
+    f = np.fft.rfft(x, n=size, axis=1)
+    acf = np.fft.irfft(f * np.conj(f), n=size, axis=1)[:, :length].mean(0)
+    acf /= np.maximum(acf[:1], 1e-300)
+    tau = 2.0 * np.cumsum(acf, axis=0) - 1.0
+    window = np.arange(length)[:, None] >= c * tau
+    idx = np.where(window.any(0), window.argmax(0), length - 1)
+    return np.maximum(tau[idx, np.arange(tau.shape[1])], 1.0)
+
+
+def sample(history, current, settings=PosteriorSettings(), workers=None, start_theta=None):
+    """과거 데이터의 사후 표본을 뽑는다 (current: 현재 값 dict 묶음, prior 중심)
+
+    start_theta 가 없으면 calibrate.fit 의 최적값에서 시작한다. chain 마다 프로세스 하나
+    (workers=1 이면 이 프로세스에서 차례로).
+    """
+    start_time = time.perf_counter()
+    prior = calibrate.pack(**current)
+    if start_theta is None:
+        fitted = calibrate.fit(history, current, prior_weight=settings.prior_weight)
+        start_theta = calibrate.pack(
+            fitted.success_rate, fitted.re_weight, fitted.sur_weight, fitted.risk_conversion
+        )
+    dim = len(prior)
+    walkers = max(settings.walkers, 2 * dim + 2)
+    walkers += walkers % 2
+    chains = settings.chains or os.cpu_count() or 1
+    workers = max(1, min(int(workers or os.cpu_count() or 1), chains))
+
+    jobs = []
+    for seed in np.random.SeedSequence(settings.seed).spawn(chains):
+        rng = np.random.default_rng(seed)
+        start = initial_walkers(rng, start_theta, walkers, history, prior, settings.prior_weight)
+        jobs.append((history, start, prior, settings, seed))
+    if workers == 1:
+        results = [_run_chain(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_chain, jobs))
+
+    kept = to_theta(np.stack([r[0] for r in results]))  # (chain, 걸음, walker, 파라미터)
+    # walker 하나하나를 경로로 본다 (chain × walker 개의 경로)
+    paths = np.moveaxis(kept, 2, 1).reshape(-1, kept.shape[1], dim)
+    samples = kept.reshape(-1, dim)
+    if len(samples) > settings.max_samples:
+        samples = samples[np.linspace(0, len(samples) - 1, settings.max_samples).astype(int)]
+    return Posterior(
+        samples=samples,
+        draws_total=len(paths) * paths.shape[1],
+        acceptance=float(np.mean([r[1] for r in results])),
+        r_hat=split_r_hat(paths),
+        ess=len(paths) * paths.shape[1] / autocorr_time(paths),
+        chains=chains,
+        elapsed=time.perf_counter() - start_time,
+        key=engine.digest((history.to_table().to_csv(), tuple(prior), settings.key)),
+    )
+
+
+# ==================== 사후 예측 ====================
+def predictive(posterior, params, draws=10_000, seed=0, time_budget=2.0):
+    """사후 표본마다 정수 유저 예측(montecarlo.simulate_binomial)을 돌려 사후 예측 밴드를 만든다
+
+    params: engine.ForecastParams (초기/신규 유저, 신규 비중, 사이클 수). 퍼널 값은 사후 표본이 대신한다.
+    montecarlo.sample_forecast 처럼 CHUNK_SIZE 단위로 돌리고 시간 예산에 걸리면 멈춘다.
+    """
+    rng = np.random.default_rng(seed)
+    column_idx = [engine.FORECAST_COLUMNS.index(c) for c in montecarlo.BAND_COLUMNS]
+
+    chunks = []
+    done = 0
+    start = time.perf_counter()
+    while done < draws:
+        size = min(montecarlo.CHUNK_SIZE, draws - done)
+        theta = posterior.draws(size, rng)
+        trajectory = montecarlo.simulate_binomial(
+            rng, theta["success_rate"], theta["re_weight"], theta["sur_weight"], theta["risk_conversion"],
+            params.new_user_weight, params.cycle_new_users, params.initial_users, params.num_cycles, size=size,
+        )
+        chunks.append(trajectory[..., column_idx].astype(np.float32))
+        done += size
+        if time.perf_counter() - start > time_budget:
+            break
+
+    quantiles = np.percentile(np.concatenate(chunks), montecarlo.PERCENTILES, axis=0)
+    return montecarlo.FanChart(
+        cycles=np.arange(1, params.num_cycles + 1),
+        bands={col: quantiles[..., k] for k, col in enumerate(montecarlo.BAND_COLUMNS)},
+        draws=done,
+        elapsed=time.perf_counter() - start,
+        truncated=done < draws,
+    )
@@ -0,0 +1,229 @@
+"""시나리오 파라미터 공간
+
+사이드바 입력 전체(콘텐츠 점수/가중치, 외생 비율, 신규/복귀/부활 비중, 리스크 전환율,
+예측 설정)를 이름 붙은 1차원 벡터로 펼친다. 벡터를 여러 줄 쌓은 행렬 X (시나리오, 파라미터)
+를 evaluate 에 넘기면 KPI 를 엔진 배치 호출 한 번으로 계산하므로, 민감도·스윕·최적화가
+파라미터마다 재실행하지 않고 같은 경로를 쓴다.
+"""
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+
+import engine
+
+# KPI 이름 → 표시 라벨
+KPIS = {
+    "forecast_total": "최종 총 유저 (예측)",
+    "forecast_active": "최종 활성 유저 (예측)",
+    "steady_active": "정상상태 총활성",
+    "steady_success": "정상상태 성공수",
+    "react_pool": "React Pool",
+    "sur_pool": "Sur Pool",
+}
+
+# 상한이 없는 (유저 수) 파라미터 그룹
+_COUNT_GROUPS = ("total_new_users", "initial_users", "cycle_new_users")
+
+# 그룹 → 라벨 형식
+_GROUP_LABELS = {
+    "endo_value": "{node} · {item} 점수",
+    "endo_weight": "{node} · {item} 가중치",
+    "exo_ratio": "외생변수 비율",
+    "new_user_weight": "{node} 신규 비중",
+    "total_new_users": "총 신규 유저 수",
+    "re_weight": "{node} 복귀비중",
+    "sur_weight": "{node} 부활비중",
+    "risk_conversion": "{item} 전환율",
+    "initial_users": "초기 유저 수",
+    "cycle_new_users": "사이클당 신규 유저",
+}
+
+
+@dataclass(frozen=True)
+class Parameter:
+    """벡터의 한 칸 (group, node, item) 과 허용 범위"""
+    group: str
+    node: str = ""
+    item: str = ""
+    lower: float = 0.0
+    upper: float = 1.0
+
+    @property
+    def label(self):
+        return _GROUP_LABELS[self.group].format(node=self.node, item=self.item)
+
+
+class ScenarioSpace:
+    """시나리오 입력 ↔ 파라미터 벡터 변환과 배치 KPI 평가"""
+
+    def __init__(self, endo_factors, exo_ratio, total_new_users, new_user_weight,
+                 re_weight, sur_weight, risk_conversion,
+                 num_cycles, initial_users, cycle_new_users):
+        params = []
+        base = []
+
+        def add(value, group, node="", item=""):
+            upper = np.inf if group in _COUNT_GROUPS else 1.0
+            params.append(Parameter(group, node, item, 0.0, upper))
+            base.append(float(value))
+
+        factor_node = []
+        for node_idx, node in enumerate(engine.NODES):
+            for item, data in endo_factors.get(node, {}).items():
+                add(data["value"], "endo_value", node, item)
+                factor_node.append(node_idx)
+        for node in engine.NODES:
+            for item, data in endo_factors.get(node, {}).items():
+                add(data["weight"], "endo_weight", node, item)
+        add(exo_ratio, "exo_ratio")
+        for node in engine.NODES:
+            add(new_user_weight[node], "new_user_weight", node)
+        add(total_new_users, "total_new_users")
+        for node in engine.NODES:
+            add(re_weight[node], "re_weight", node)
+        for node in engine.NODES:
+            add(sur_weight[node], "sur_weight", node)
+        for stage, label in zip(engine.RISK_STAGES, engine.RISK_STAGE_LABELS):
+            add(risk_conversion[stage], "risk_conversion", item=label)
+        add(initial_users, "initial_users")
+        add(cycle_new_users, "cycle_new_users")
+
+        self.params = tuple(params)
+        self.base = np.array(base)
+        self.num_cycles = int(num_cycles)
+        self.factor_node = np.array(factor_node, dtype=int)
+        self.lower = np.array([p.lower for p in params])
+        self.upper = np.array([p.upper for p in params])
+
+        self._slices = {}
+        for i, p in enumerate(params):
+            start, _ = self._slices.get(p.group, (i, i))
+            self._slices[p.group] = (start, i + 1)
+
+    @classmethod
+    def from_state(cls, state):
+        """app/시나리오 파일과 같은 키를 가진 dict 로 만든다"""
+        return cls(
+            endo_factors=state["endo_factors"],
+            exo_ratio=state["exo_endo_ratio"],
+            total_new_users=state["total_new_users"],
+            new_user_weight=state["new_user_weight"],
+            re_weight=state["re_weight"],
+            sur_weight=state["sur_weight"],
+            risk_conversion=state["risk_conversion"],
+            num_cycles=state["num_cycles"],
+            initial_users=state["initial_users"],
+            cycle_new_users=state["cycle_new_users"],
+        )
+
+    def with_num_cycles(self, num_cycles):
+        """예측 사이클 수만 바꾼 공간"""
+        return ScenarioSpace.from_state({**self.to_state(self.base), "num_cycles": num_cycles})
+
+    @cached_property
+    def key(self):
+        return engine.digest(self.params + (tuple(self.base), self.num_cycles))
+
+    @cached_property
+    def model_key(self):
+        """예측 사이클 수를 뺀 key (입력이 같으면 예측 길이가 달라도 같은 값)"""
+        return engine.digest(self.params + (tuple(self.base),))
+
+    @property
+    def labels(self):
+        return [p.label for p in self.params]
+
+    def __len__(self):
+        return len(self.params)
+
+    def group(self, name):
+        """그룹에 속한 파라미터의 인덱스 slice"""
+        start, stop = self._slices.get(name, (0, 0))
+        return slice(start, stop)
+
+    def index(self, group, node="", item=""):
+        for i, p in enumerate(self.params):
+            if p.group == group and p.node == node and p.item == item:
+                return i
+        raise KeyError((group, node, item))
+
+    def clip(self, X):
+        return np.clip(X, self.lower, self.upper)
+
+    def to_state(self, x):
+        """파라미터 벡터 한 줄을 from_state 형식 dict 로 되돌린다"""
+        x = np.asarray(x, dtype=float)
+        state = {
+            "endo_factors": {node: {} for node in engine.NODES},
+            "new_user_weight": {},
+            "re_weight": {},
+            "sur_weight": {},
+            "risk_conversion": {},
+            "num_cycles": self.num_cycles,
+        }
+        stages = dict(zip(engine.RISK_STAGE_LABELS, engine.RISK_STAGES))
+        for value, p in zip(x, self.params):
+            value = float(value)
+            if p.group in ("endo_value", "endo_weight"):
+                key = "value" if p.group == "endo_value" else "weight"
+                state["endo_factors"][p.node].setdefault(p.item, {})[key] = value
+            elif p.group in ("new_user_weight", "re_weight", "sur_weight"):
+                state[p.group][p.node] = value
+            elif p.group == "risk_conversion":
+                state["risk_conversion"][stages[p.item]] = value
+            elif p.group == "exo_ratio":
+                state["exo_endo_ratio"] = value
+            else:
+                state[p.group] = value
+        return state
+
+    # ==================== 배치 평가 ====================
+    def engine_arrays(self, X, floor_new_users=True):
+        """X (..., 파라미터) → 엔진 입력 배열 dict (floor_new_users: 노드별 신규 유저 정수 절사)"""
+        X = np.asarray(X, dtype=float)
+        success_rate = engine.success_rates_batch(
+            X[..., self.group("endo_value")],
+            X[..., self.group("endo_weight")],
+            self.factor_node,
+            X[..., self.group("exo_ratio")][..., 0],
+        )
+        new_user_weight = X[..., self.group("new_user_weight")]
+        return dict(
+            success_rate=success_rate,
+            re_weight=X[..., self.group("re_weight")],
+            sur_weight=X[..., self.group("sur_weight")],
+            risk_conversion=X[..., self.group("risk_conversion")],
+            new_users=engine.split_new_users_batch(
+                X[..., self.group("total_new_users")][..., 0], new_user_weight, floor=floor_new_users
+            ),
+            new_user_weight=new_user_weight,
+            initial_users=X[..., self.group("initial_users")][..., 0],
+            cycle_new_users=X[..., self.group("cycle_new_users")][..., 0],
+        )
+
+    def evaluate(self, X, kpis=tuple(KPIS), floor_new_users=True):
+        """X (..., 파라미터) 의 모든 줄을 한 번에 평가해 {kpi: (...) 배열} 을 돌려준다
+
+        floor_new_users=False 면 노드별 신규 유저를 정수로 자르지 않는다 (sensitivity 의 중앙차분용).
+        """
+        a = self.engine_arrays(X, floor_new_users)
+        out = {}
+        if any(k.startswith("forecast_") for k in kpis):
+            final = engine.forecast_at(
+                a["success_rate"], a["re_weight"], a["sur_weight"], a["risk_conversion"],
+                a["new_user_weight"], a["cycle_new_users"], a["initial_users"],
+                cycles=[self.num_cycles],
+            )[..., 0, :]
+            out["forecast_total"] = final[..., engine.FORECAST_COLUMNS.index("총 유저")]
+            out["forecast_active"] = final[..., engine.FORECAST_COLUMNS.index("활성 유저")]
+        if any(not k.startswith("forecast_") for k in kpis):
+            steady = engine.steady_state_batch(
+                a["success_rate"], a["re_weight"], a["sur_weight"], a["risk_conversion"],
+                a["new_users"],
+            )
+            out["steady_active"] = steady[..., engine.STEADY_COLUMNS.index("총활성")]
+            out["steady_success"] = steady[..., engine.STEADY_COLUMNS.index("성공수")]
+            out["react_pool"] = steady[..., engine.STEADY_COLUMNS.index("React Pool")]
+            out["sur_pool"] = steady[..., engine.STEADY_COLUMNS.index("Sur Pool")]
+        return {k: out[k] for k in kpis}
@@ -0,0 +1,164 @@
+"""시즌 일정 예측
+
+engine.run_forecast 는 같은 경기 사이클을 num_cycles 번 반복한다. 시즌 일정은 경기마다
+외생 점수(경기 중요도·기대감)와 신규 유저를 따로 두고, 경기 뒤 휴식 사이클(A매치 휴식기 등)
+동안에는 경기 없이 리스크 파이프라인만 돌린다.
+
+경기 하나 (+ 뒤따르는 휴식) 는 확장 상태 x = (활성, React, Sur, 1, 이번 경기 이탈) 에 대한
+5×5 전이행렬이다. 모든 경기의 행렬을 한 번에 만들고, 경기 k 까지의 누적곱을 병렬 prefix
+스캔(log2(경기 수) 번의 배치 행렬곱)으로 구하므로 수백 경기 시즌도 바로 계산된다.
+
+휴식 사이클 한 번: 활성 유저는 그대로 남고, React Pool 은 돌아올 경기가 없으므로 WAU 단계를
+한 번 더 거쳐 (전환율 at_risk_wau 만큼 남고 나머지는 Dead 단계로), Sur Pool 은 Dead 단계를
+한 번 더 거친다 (dead_users 만큼 남고 나머지는 완전 이탈).
+"""
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+import engine
+
+# 일정 표 열
+SCHEDULE_COLUMNS = ("경기", "외생 점수", "신규 유저", "휴식 사이클")
+
+# 일정 한 번에 넣을 수 있는 최대 경기 수
+MAX_MATCHES = 2000
+
+# 확장 상태 (활성, React, Sur, 상수 1, 이번 경기 이탈)
+_DIM = 5
+
+
+@dataclass(frozen=True)
+class Season:
+    """경기별 덮어쓰기 값 (모두 경기 순서의 튜플)"""
+    names: tuple
+    exo_scores: tuple
+    new_users: tuple
+    gaps: tuple
+
+    @classmethod
+    def repeat(cls, num_matches, new_users, exo_score=0.0):
+        """같은 경기를 num_matches 번 반복하는 일정 (engine.run_forecast 와 같은 결과)"""
+        return cls(
+            names=tuple(f"{i}R" for i in range(1, num_matches + 1)),
+            exo_scores=(float(exo_score),) * num_matches,
+            new_users=(float(new_users),) * num_matches,
+            gaps=(0,) * num_matches,
+        )
+
+    @classmethod
+    def from_table(cls, table):
+        """SCHEDULE_COLUMNS 표 → Season. 빈 경기 이름은 번호로 채우고, 숫자가 아닌 값은 ValueError"""
+        missing = [c for c in SCHEDULE_COLUMNS if c not in table.columns]
+        if missing:
+            raise ValueError(f"일정 표에 열이 없습니다: {', '.join(missing)}")
+        if len(table) == 0:
+            raise ValueError("일정에 경기가 없습니다")
+        if len(table) > MAX_MATCHES:
+            raise ValueError(f"경기는 최대 {MAX_MATCHES}개까지 넣을 수 있습니다")
+        numbers = table[list(SCHEDULE_COLUMNS[1:])].apply(pd.to_numeric, errors="coerce")
+        if numbers.isna().any().any():
+            raise ValueError("외생 점수 / 신규 유저 / 휴식 사이클에 숫자가 아닌 값이 있습니다")
+        names = [
+            str(n).strip() if pd.notna(n) and str(n).strip() else f"{i}R"
+            for i, n in enumerate(table["경기"], start=1)
+        ]
+        return cls(
+            names=tuple(names),
+            exo_scores=tuple(numbers["외생 점수"].clip(0.0, 1.0).astype(float)),
+            new_users=tuple(numbers["신규 유저"].clip(lower=0).astype(float)),
+            gaps=tuple(numbers["휴식 사이클"].clip(lower=0).round().astype(int)),
+        )
+
+    def to_table(self):
+        return pd.DataFrame({
+            "경기": list(self.names),
+            "외생 점수": list(self.exo_scores),
+            "신규 유저": list(self.new_users),
+            "휴식 사이클": list(self.gaps),
+        })
+
+    def __len__(self):
+        return len(self.names)
+
+    @cached_property
+    def key(self):
+        return engine.digest(self)
+
+
+# ==================== 전이행렬 ====================
+def match_operators(funnel, exo_ratio, new_user_weight, season):
+    """경기별 5×5 전이행렬 (경기 수, 5, 5) — 휴식 사이클 제외
+
+    경기 k 의 성공률 = clip(내재 성공률 + 외생 점수_k × 외생 비율) (engine.node_success_rate 와 같은 식,
+    funnel.success_rate 가 외생 0점일 때의 값).
+    """
+    exo = np.asarray(season.exo_scores, dtype=float)[:, None]
+    success_rate = np.clip(np.asarray(funnel.success_rate, dtype=float) + exo * float(exo_ratio), 0.0, 1.0)
+    inflow = engine.forecast_inflow(new_user_weight, np.asarray(season.new_users, dtype=float))
+    M, b, dead_row, dead_b = engine.cycle_operator(
+        success_rate, funnel.re_weight, funnel.sur_weight, funnel.risk_conversion, inflow
+    )
+    A = np.zeros((len(season), _DIM, _DIM))
+    A[:, :3, :3] = M
+    A[:, :3, 3] = b
+    A[:, 3, 3] = 1.0
+    A[:, 4, :3] = dead_row
+    A[:, 4, 3] = dead_b
+    return A
+
+
+def gap_operator(risk_conversion):
+    """휴식 사이클 한 번의 5×5 전이행렬 (이탈 칸은 누적)"""
+    _, wau, dead = (float(v) for v in risk_conversion)
+    G = np.eye(_DIM)
+    G[1, 1] = wau                         # React 중 WAU 단계에서 남는 유저
+    G[2, 1] = (1 - wau) * dead            # React 에서 Dead 단계로 밀려 부활 대상이 된 유저
+    G[2, 2] = dead                        # Sur 중 남는 유저
+    G[4, 1] = (1 - wau) * (1 - dead)      # 완전 이탈
+    G[4, 2] = 1 - dead
+    return G
+
+
+def season_operators(funnel, exo_ratio, new_user_weight, season):
+    """경기별 (경기 + 뒤따르는 휴식) 전이행렬 (경기 수, 5, 5)"""
+    A = match_operators(funnel, exo_ratio, new_user_weight, season)
+    gaps = np.asarray(season.gaps, dtype=int)
+    if gaps.any():
+        G = gap_operator(funnel.risk_conversion)
+        # 휴식 길이별 G^n 을 한 번씩만 만든다
+        for n in np.unique(gaps[gaps > 0]):
+            A[gaps == n] = np.linalg.matrix_power(G, int(n)) @ A[gaps == n]
+    return A
+
+
+def prefix_products(A):
+    """P_k = A_k … A_1 (k = 1 … K) 를 log2(K) 번의 배치 행렬곱으로 구한다 (Hillis–Steele 스캔)"""
+    P = np.array(A, copy=True)
+    step = 1
+    while step < len(P):
+        P[step:] = P[step:] @ P[:-step]
+        step *= 2
+    return P
+
+
+# ==================== 예측 ====================
+def run_season(params, exo_ratio, season):
+    """ForecastParams(초기 유저, 신규 비중, 퍼널) 와 Season 으로 경기별 예측 표를 만든다
+
+    반환 표: 사이클(경기 번호), 경기, 휴식 사이클, 누적 사이클 + FORECAST_COLUMNS.
+    이탈 (Dead) 는 경기와 뒤따르는 휴식 동안의 완전 이탈 합계.
+    """
+    A = season_operators(params.funnel, exo_ratio, params.new_user_weight, season)
+    x0 = np.zeros(_DIM)
+    x0[0] = float(params.initial_users)
+    x0[3] = 1.0
+    X = prefix_products(A) @ x0  # (경기 수, 5)
+
+    table = engine.forecast_frame(np.column_stack([X[:, :3], X[:, :3].sum(-1), X[:, 4]]))
+    table.insert(1, "경기", list(season.names))
+    table.insert(2, "휴식 사이클", list(season.gaps))
+    table.insert(3, "누적 사이클", np.cumsum(1 + np.asarray(season.gaps, dtype=int)))
+    return table
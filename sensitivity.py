@@ -0,0 +1,102 @@
+"""국소 민감도 (tornado) 분석
+
+ScenarioSpace 의 모든 파라미터를 하나씩 흔든 행을 행렬로 쌓아 배치 evaluate 로
+미분(중앙차분)·탄력성·±스윙 KPI 를 구한다. 콘텐츠가 노드마다 수십 개여도 호출은 두 번이다.
+
+중앙차분은 노드별 신규 유저를 정수로 자르지 않고 평가한다. 1e-4 스텝에서는 절사 경계를 넘는지가
+차분을 좌우해 신규 비중 / 총 신규 유저의 미분이 부호까지 틀리기 때문이다. 기준값과 ±스윙은
+대시보드와 같게 자른 값으로 평가한다.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import scenario
+
+# 중앙차분 스텝: max(상대 스텝 × |값|, 절대 스텝)
+REL_STEP = 1e-3
+ABS_STEP = 1e-4
+
+
+@dataclass(frozen=True, eq=False)
+class Sensitivity:
+    """파라미터 × KPI 민감도
+
+    derivative / low / high 는 {kpi: (파라미터 수,) 배열}.
+    low / high 는 파라미터를 (1 ∓ swing) 배 했을 때(범위 안으로 clip)의 KPI 값.
+    """
+    labels: list
+    base_values: np.ndarray
+    base_kpis: dict
+    derivative: dict
+    low: dict
+    high: dict
+    swing: float
+
+    def elasticity(self, kpi):
+        base = self.base_kpis[kpi]
+        if not np.isfinite(base) or base == 0:
+            return np.full(len(self.labels), np.nan)
+        return self.derivative[kpi] * self.base_values / base
+
+    def table(self, kpi):
+        """스윙 폭이 큰 순서로 정렬한 tornado 표"""
+        base = self.base_kpis[kpi]
+        frame = pd.DataFrame({
+            "파라미터": self.labels,
+            "기준값": self.base_values,
+            "미분": self.derivative[kpi],
+            "탄력성": self.elasticity(kpi),
+            "하향 KPI": self.low[kpi],
+            "상향 KPI": self.high[kpi],
+        })
+        frame["하향 변화"] = frame["하향 KPI"] - base
+        frame["상향 변화"] = frame["상향 KPI"] - base
+        frame["스윙"] = (frame["상향 KPI"] - frame["하향 KPI"]).abs()
+        return frame.sort_values("스윙", ascending=False, ignore_index=True)
+
+
+def analyze(space, swing=0.1, kpis=tuple(scenario.KPIS)):
+    """ScenarioSpace 기준점에서 모든 파라미터의 민감도를 한 번의 배치 평가로 계산한다"""
+    x0 = space.base
+    n = len(space)
+    eye = np.eye(n)
+
+    step = np.maximum(REL_STEP * np.abs(x0), ABS_STEP)
+    x_plus = np.minimum(x0 + step, space.upper)
+    x_minus = np.maximum(x0 - step, space.lower)
+
+    swing_low = np.clip(x0 * (1 - swing), space.lower, space.upper)
+    swing_high = np.clip(x0 * (1 + swing), space.lower, space.upper)
+
+    # 행: 기준, 하향 스윙, 상향 스윙 (대시보드와 같은 절사) / +h, -h (절사 없이)
+    values = space.evaluate(np.vstack([
+        x0[None, :],
+        x0 + eye * (swing_low - x0)[:, None],
+        x0 + eye * (swing_high - x0)[:, None],
+    ]), kpis)
+    diffs = space.evaluate(np.vstack([
+        x0 + eye * (x_plus - x0)[:, None],
+        x0 + eye * (x_minus - x0)[:, None],
+    ]), kpis, floor_new_users=False)
+
+    denom = x_plus - x_minus
+    derivative, low, high, base_kpis = {}, {}, {}, {}
+    for kpi, v in values.items():
+        plus, minus = diffs[kpi][:n], diffs[kpi][n:]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            derivative[kpi] = np.where(denom > 0, (plus - minus) / np.where(denom > 0, denom, 1), 0.0)
+        low[kpi] = v[1:n + 1]
+        high[kpi] = v[n + 1:]
+        base_kpis[kpi] = float(v[0])
+
+    return Sensitivity(
+        labels=space.labels,
+        base_values=x0.copy(),
+        base_kpis=base_kpis,
+        derivative=derivative,
+        low=low,
+        high=high,
+        swing=swing,
+    )
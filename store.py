@@ -0,0 +1,218 @@
+"""시나리오 저장소 (SQLite)
+
+이름 붙은 입력(사이드바 상태, batch.py 시나리오와 같은 키)과 계산 결과를 로컬 SQLite 파일에
+저장한다. 결과는 파라미터 해시(ScenarioSpace.model_key)로 보관해 같은 입력은 다시 계산하지
+않고, 비교할 때는 결과가 없는 시나리오만 모아 엔진 배치 호출 한 번으로 계산한다.
+"""
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import batch
+import engine
+import scenario
+
+# 저장 파일 (환경변수 DAU_FUNNEL_DB 로 바꿀 수 있음)
+DEFAULT_PATH = Path(os.environ.get("DAU_FUNNEL_DB", Path(__file__).with_name("scenarios.db")))
+
+# 한 번에 비교할 최대 시나리오 수
+MAX_COMPARE = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    name TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    state TEXT NOT NULL,
+    saved_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    num_cycles INTEGER NOT NULL,
+    steady BLOB NOT NULL,
+    forecast BLOB NOT NULL
+);
+"""
+
+
+def state_key(state):
+    """시나리오 dict 의 파라미터 해시 (예측 사이클 수 제외)"""
+    return scenario.ScenarioSpace.from_state(batch.complete_state(state)).model_key
+
+
+def evaluate_states(states, num_cycles):
+    """시나리오 여러 개를 엔진 배치 호출로 한 번에 계산한다
+
+    반환: (정상상태 (시나리오, len(STEADY_COLUMNS)), 예측 (시나리오, num_cycles, len(FORECAST_COLUMNS)))
+    정상상태가 없는(발산) 시나리오의 정상상태 값은 inf.
+    """
+    params = [batch.build_params(s) for s in states]
+    arrays = engine.stack_forecast_params([f for _, f in params])
+    steady = engine.steady_state_batch(
+        arrays["success_rate"], arrays["re_weight"], arrays["sur_weight"], arrays["risk_conversion"],
+        np.array([funnel.new_users for funnel, _ in params], dtype=float),
+    )
+    forecast = engine.simulate_batch(num_cycles=num_cycles, **arrays)
+    return steady, forecast
+
+
+@dataclass(frozen=True, eq=False)
+class Comparison:
+    """비교 결과 (names 순서)
+
+    steady: (시나리오, STEADY_COLUMNS), forecast: (시나리오, 사이클, FORECAST_COLUMNS),
+    computed: 이번에 새로 계산한 시나리오 수 (나머지는 저장된 결과 재사용).
+    """
+    names: list
+    keys: list
+    steady: np.ndarray
+    forecast: np.ndarray
+    computed: int
+
+    def kpi_table(self, reference=0):
+        """시나리오별 KPI 와 기준 시나리오 대비 차이"""
+        steady = pd.DataFrame(self.steady, columns=list(engine.STEADY_COLUMNS))
+        final = pd.DataFrame(self.forecast[:, -1, :], columns=list(engine.FORECAST_COLUMNS))
+        table = pd.DataFrame({
+            "시나리오": self.names,
+            "정상상태 총활성": steady["총활성"],
+            "정상상태 성공수": steady["성공수"],
+            "React Pool": steady["React Pool"],
+            "Sur Pool": steady["Sur Pool"],
+            "최종 총 유저": final["총 유저"],
+            "최종 활성 유저": final["활성 유저"],
+            "누적 이탈": self.forecast[:, :, engine.FORECAST_COLUMNS.index("이탈 (Dead)")].sum(-1),
+        })
+        kpis = table.columns[1:]
+        for col in kpis:
+            table[f"Δ {col}"] = table[col] - table[col].iloc[reference]
+        return table
+
+
+def _prune(conn):
+    # 저장된 시나리오가 더는 쓰지 않는 결과 삭제 (덮어쓰기/삭제 후)
+    conn.execute("DELETE FROM results WHERE key NOT IN (SELECT key FROM scenarios)")
+
+
+class ScenarioStore:
+    """이름 → 시나리오 입력, 파라미터 해시 → 계산 결과
+
+    연산마다 연결을 새로 열어 Streamlit 세션 스레드끼리 연결을 공유하지 않는다.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            _prune(conn)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ==================== 시나리오 ====================
+    def save(self, name, state):
+        """이름으로 저장(덮어쓰기)하고 결과가 없으면 계산해 둔다. 반환: 파라미터 해시"""
+        name = str(name).strip()
+        if not name:
+            raise ValueError("시나리오 이름이 비어 있습니다")
+        state = batch.complete_state(state)
+        key = state_key(state)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scenarios (name, key, state, saved_at) VALUES (?, ?, ?, ?)",
+                (name, key, json.dumps(state, ensure_ascii=False), time.time()),
+            )
+            _prune(conn)
+        self.compare([name], int(state["num_cycles"]))
+        return key
+
+    def load(self, name):
+        with self._connect() as conn:
+            row = conn.execute("SELECT state FROM scenarios WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return json.loads(row[0])
+
+    def delete(self, name):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM scenarios WHERE name = ?", (name,))
+            _prune(conn)
+
+    def names(self):
+        """저장된 시나리오 이름 (최근 저장 순)"""
+        with self._connect() as conn:
+            return [r[0] for r in conn.execute("SELECT name FROM scenarios ORDER BY saved_at DESC")]
+
+    def table(self):
+        """저장 목록 표 (이름, 저장 시각, 예측 사이클 수, 해시)"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT name, saved_at, state, key FROM scenarios ORDER BY saved_at DESC").fetchall()
+        return pd.DataFrame(
+            [(n, datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M"), json.loads(s)["num_cycles"], k[:10])
+             for n, t, s, k in rows],
+            columns=["이름", "저장 시각", "예측 사이클", "해시"],
+        )
+
+    # ==================== 결과 ====================
+    def _cached(self, keys, num_cycles):
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT key, num_cycles, steady, forecast FROM results WHERE key IN ({','.join('?' * len(keys))})",
+                list(keys),
+            ).fetchall()
+        cached = {}
+        for key, cycles, steady, forecast in rows:
+            if cycles >= num_cycles:
+                cached[key] = (
+                    np.frombuffer(steady, dtype=np.float64),
+                    np.frombuffer(forecast, dtype=np.float64).reshape(cycles, -1)[:num_cycles],
+                )
+        return cached
+
+    def compare(self, names, num_cycles, extra=None):
+        """저장된 시나리오(names)와 extra {이름: 상태} 를 num_cycles 사이클까지 비교한다
+
+        저장된 결과가 num_cycles 이상이면 그대로 쓰고, 나머지는 한 번의 배치 호출로 계산한다.
+        저장된 시나리오의 결과만 저장하고, extra 만의 결과는 저장하지 않는다 (매 설정마다 쌓이지 않도록).
+        """
+        states = [self.load(n) for n in names] + list((extra or {}).values())
+        labels = list(names) + list((extra or {}).keys())
+        if len(states) > MAX_COMPARE:
+            raise ValueError(f"한 번에 최대 {MAX_COMPARE}개까지 비교할 수 있습니다")
+        keys = [state_key(s) for s in states]
+        cached = self._cached(set(keys), num_cycles) if keys else {}
+
+        missing = list(dict.fromkeys(k for k in keys if k not in cached))
+        if missing:
+            first = {k: s for k, s in zip(keys, states)}
+            steady, forecast = evaluate_states([first[k] for k in missing], num_cycles)
+            saved = set(keys[:len(names)])
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO results (key, num_cycles, steady, forecast) VALUES (?, ?, ?, ?)",
+                    [(k, num_cycles, steady[i].tobytes(), forecast[i].tobytes())
+                     for i, k in enumerate(missing) if k in saved],
+                )
+            cached.update({k: (steady[i], forecast[i]) for i, k in enumerate(missing)})
+
+        width = (len(engine.STEADY_COLUMNS), num_cycles, len(engine.FORECAST_COLUMNS))
+        return Comparison(
+            names=labels,
+            keys=keys,
+            steady=np.array([cached[k][0] for k in keys]).reshape(len(keys), width[0]),
+            forecast=np.array([cached[k][1] for k in keys]).reshape(len(keys), *width[1:]),
+            computed=len(missing),
+        )
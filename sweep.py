@@ -0,0 +1,92 @@
+"""2D 파라미터 스윕
+
+ScenarioSpace 의 파라미터 두 개를 격자로 훑어 모든 KPI 를 한꺼번에 계산한다.
+작은 격자는 현재 프로세스에서 배치 평가 한 번(행 chunk 단위)으로 끝내고, 큰 격자나
+벡터화되지 않은 평가 함수는 행 chunk 를 프로세스 풀에 나눠 모든 코어를 쓴다.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+import scenario
+
+# 한 번에 평가할 격자 행 수 (메모리 상한)
+CHUNK_ROWS = 20_000
+
+# 이 이상이면 프로세스 풀로 나눠 계산
+PARALLEL_MIN_ROWS = 250_000
+
+
+@dataclass(frozen=True, eq=False)
+class SweepResult:
+    """격자 좌표와 KPI 별 값 (values[kpi] 는 (len(y), len(x)) 배열)"""
+    x_index: int
+    y_index: int
+    x: np.ndarray
+    y: np.ndarray
+    values: dict
+    workers: int
+
+
+def vectorized_evaluate(space, X, kpis):
+    """기본 평가 함수 (ScenarioSpace 배치 평가)"""
+    return space.evaluate(X, kpis)
+
+
+def default_range(space, index):
+    """스윕 기본 범위: 비율은 [0, 1], 유저 수는 [0, 2 × 현재값]"""
+    lower, upper = space.lower[index], space.upper[index]
+    if np.isfinite(upper):
+        return float(lower), float(upper)
+    return float(lower), float(max(2 * space.base[index], 1.0))
+
+
+def _grid_rows(space, x_index, y_index, x, y):
+    X = np.repeat(space.base[None, :], len(x) * len(y), axis=0)
+    xx, yy = np.meshgrid(x, y)
+    X[:, x_index] = xx.ravel()
+    X[:, y_index] = yy.ravel()
+    return X
+
+
+def _evaluate_rows(space, x_index, y_index, x, y_chunk, kpis, evaluator):
+    # 워커에서 격자 행을 직접 만들어 큰 배열을 피클로 넘기지 않는다
+    values = {k: [] for k in kpis}
+    rows_per_y = max(1, CHUNK_ROWS // max(len(x), 1))
+    for start in range(0, len(y_chunk), rows_per_y):
+        X = _grid_rows(space, x_index, y_index, x, y_chunk[start:start + rows_per_y])
+        out = evaluator(space, X, kpis)
+        for k in kpis:
+            values[k].append(np.asarray(out[k]).reshape(-1, len(x)))
+    return {k: np.concatenate(v) for k, v in values.items()}
+
+
+def run_sweep(space, x_index, y_index, x_range, y_range, size=200,
+              kpis=tuple(scenario.KPIS), evaluator=vectorized_evaluate, workers=None):
+    """두 파라미터를 size × size 격자로 스윕한다
+
+    workers=None 이면 격자가 PARALLEL_MIN_ROWS 이상일 때만 CPU 수만큼 프로세스를 쓴다.
+    evaluator 는 (space, X, kpis) → {kpi: 배열} 인 최상위 함수여야 한다 (피클 가능).
+    """
+    x = np.linspace(*x_range, size)
+    y = np.linspace(*y_range, size)
+
+    if workers is None:
+        workers = (os.cpu_count() or 1) if size * size >= PARALLEL_MIN_ROWS else 1
+    workers = max(1, min(int(workers), size))
+
+    if workers == 1:
+        values = _evaluate_rows(space, x_index, y_index, x, y, kpis, evaluator)
+    else:
+        y_chunks = np.array_split(y, workers * 4)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_evaluate_rows, space, x_index, y_index, x, chunk, kpis, evaluator)
+                for chunk in y_chunks
+            ]
+            parts = [f.result() for f in futures]
+        values = {k: np.concatenate([p[k] for p in parts]) for k in kpis}
+
+    return SweepResult(x_index=x_index, y_index=y_index, x=x, y=y, values=values, workers=workers)